@@ -0,0 +1,99 @@
+# -------------------- #
+#  Abalone Batch Eval  #
+# -------------------- #
+
+"""Vectorized evaluation of many positions at once (requires NumPy).
+
+A batch is an (N, 61) int8 array, row i holding the Board.board values
+(1: empty, 2: red, 3: green) of the 61 cells of position i, in cell
+index order (see Geometry). evaluate_batch gives the same scores as
+Evaluation.evaluate, each term being computed for the whole batch:
+    - material and center: products with per-cell weight vectors
+    - cohesion and edge danger: the pairs of adjacent cells are listed
+      once in index arrays, and a pair term is a sum over the batch
+      columns gathered by those arrays
+"""
+
+import numpy as np
+
+from Evaluation import (CENTER_WEIGHT, COHESION_WEIGHT, EDGE_WEIGHT,
+                        MARBLE_WEIGHT)
+from Geometry import (AXES, CELL_INDEX, CELL_OF_BIT, CELLS, CENTER_DISTANCE,
+                      NEIGHBORS, NUM_CELLS)
+
+# weight of a marble on each cell: material and center terms
+CELL_WEIGHTS = np.array([MARBLE_WEIGHT + CENTER_WEIGHT * (4 - k)
+                         for k in CENTER_DISTANCE], dtype=np.int64)
+# adjacent cells along the 3 axes, each pair once
+PAIRS = np.array([(i, CELL_INDEX[NEIGHBORS[a][r][c]])
+                  for i, (r, c) in enumerate(CELLS) for a in AXES
+                  if NEIGHBORS[a][r][c] in CELL_INDEX],
+                 dtype=np.intp).T
+# (edge cell, cell behind it) for each orientation: the neighbor of the
+# edge cell in that orientation is in the dead zone
+EDGE_PAIRS = np.array([(i, CELL_INDEX[NEIGHBORS[d ^ 1][r][c]])
+                       for d in range(6) for i, (r, c) in enumerate(CELLS)
+                       if NEIGHBORS[d][r][c] not in CELL_INDEX],
+                      dtype=np.intp).T
+
+
+def to_array(positions) -> np.ndarray:
+    """Build a batch from BitBoards.
+
+    Parameter
+    ---------
+    positions: iterable of BitBoards (positional)
+        Positions of the batch
+
+    Return
+    ------
+    batch: np.ndarray
+        (N, 61) int8 array
+    """
+    positions = list(positions)
+    batch = np.ones((len(positions), NUM_CELLS), dtype=np.int8)
+    for i, position in enumerate(positions):
+        for value, bits in ((2, position.red), (3, position.green)):
+            while bits:
+                low = bits & -bits
+                batch[i, CELL_OF_BIT[low.bit_length() - 1]] = value
+                bits ^= low
+    return batch
+
+
+def from_list(board) -> np.ndarray:
+    """Return the (61,) int8 row of an 11x11 nested list (Board.board)."""
+    return np.array([board[r][c] for r, c in CELLS], dtype=np.int8)
+
+
+def evaluate_batch(batch, color=2) -> np.ndarray:
+    """Static evaluation of a batch of positions.
+
+    Parameters
+    ----------
+    batch: np.ndarray (positional)
+        (N, 61) int8 array of positions
+    color: int or np.ndarray
+        Color of the side to move, for the whole batch or as an (N,)
+        array
+
+    Return
+    ------
+    scores: np.ndarray
+        (N,) int64 array, scores being positive if the position is good
+        for color (the values of Evaluation.evaluate)
+    """
+    batch = np.asarray(batch)
+    red = batch == 2
+    green = batch == 3
+    # from red's point of view
+    scores = (red.astype(np.int64) - green) @ CELL_WEIGHTS
+    a, b = PAIRS
+    scores += COHESION_WEIGHT * (
+        np.count_nonzero(red[:, a] & red[:, b], axis=1)
+        - np.count_nonzero(green[:, a] & green[:, b], axis=1))
+    e, b = EDGE_PAIRS
+    scores -= EDGE_WEIGHT * (
+        np.count_nonzero(red[:, e] & green[:, b], axis=1)
+        - np.count_nonzero(green[:, e] & red[:, b], axis=1))
+    return np.where(np.asarray(color) == 3, -scores, scores)
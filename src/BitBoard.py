@@ -0,0 +1,411 @@
+# -------------------- #
+#   Abalone BitBoard   #
+# -------------------- #
+
+from Geometry import (AXES, BITS, CELLS, CELL_OF_BIT, DEAD, PLAYABLE, SHIFTS,
+                      dimension)
+
+
+def shift(bits, s) -> int:
+    """Move every bit of a bitboard by s positions in the padded grid.
+
+    Parameters
+    ----------
+    bits: int (positional)
+        Bitboard to shift
+    s: int (positional)
+        Shift, as given by Geometry.SHIFTS
+
+    Return
+    ------
+    shifted: int
+        The shifted bitboard (not masked)
+    """
+    return bits << s if s > 0 else bits >> -s
+
+
+def popcount(bits) -> int:
+    """Count the marbles of a bitboard."""
+    return bin(bits).count("1")
+
+
+class BitBoard():
+    """
+    A compact, immutable representation of an Abalone position.
+
+    The 61 playable spots are held as two integer bitboards, one per
+    color. Bit r * 11 + c stands for the spot (r, c) of Board.board, so
+    that moving in any orientation is a single shift (see Geometry).
+    Pushes, free moves and ejections are computed with shifts and masks
+    and give the same results as Board.push_move and Board.free_move.
+
+    Attributes
+    ----------
+    red: int
+        Bitboard of the red marbles (2)
+    green: int
+        Bitboard of the green marbles (3)
+
+    Methods
+    -------
+    pieces(color) -> int
+        Bitboard of the given color
+    push(friend, cell, direction) -> BitBoard
+        Push the line of marbles starting at a given cell
+    free(friend, cells, direction) -> BitBoard
+        Freely move a group of marbles in empty spots
+    apply(move, color) -> BitBoard
+        Play an encoded move (see Moves)
+    generate_moves(color) -> list
+        All the legal moves of a given color
+    ejections(color) -> list
+        The pushes of a given color that eject an enemy marble
+    edge_threats(color) -> list
+        The sumitos of a given color that push an enemy onto the edge
+    to_list() -> list
+        Return the position as an 11x11 nested list
+
+    Class Methods
+    -------------
+    from_list(board) -> BitBoard
+        Build a position from an 11x11 nested list
+    from_board(board) -> BitBoard
+        Build a position from a Board instance
+    start() -> BitBoard
+        Standard initial position
+    """
+    __slots__ = ("red", "green")
+
+    def __init__(self, red=0, green=0):
+        """Constructor.
+
+        Parameters
+        ----------
+        red: int
+            Bitboard of the red marbles
+        green: int
+            Bitboard of the green marbles
+        """
+        self.red = red
+        self.green = green
+
+    # class methods
+    # ---------------------------------------------------------------------
+
+    @classmethod
+    def from_list(cls, board):
+        """Build a position from an 11x11 nested list (as Board.board)."""
+        red = green = 0
+        for (r, c), b in zip(CELLS, BITS):
+            value = board[r][c]
+            if value == 2:
+                red |= 1 << b
+            elif value == 3:
+                green |= 1 << b
+        return cls(red, green)
+
+    @classmethod
+    def from_board(cls, board):
+        """Build a position from a Board instance."""
+        return cls.from_list(board.board)
+
+    @classmethod
+    def start(cls):
+        """Return the standard initial position (see Board.__init__)."""
+        from Board import Board
+        return cls.from_board(Board())
+
+    # methods
+    # ---------------------------------------------------------------------
+
+    @property
+    def marbles(self) -> dict:
+        """Number of marbles of each color still on the board."""
+        return {2: popcount(self.red), 3: popcount(self.green)}
+
+    def pieces(self, color) -> int:
+        """Return the bitboard of the given color (2: red, 3: green)."""
+        return self.red if color == 2 else self.green
+
+    def push(self, friend, cell, direction):
+        """Push the line of marbles starting at a given cell.
+
+        Same rules as Board.push_move: at most 3 friendly marbles can
+        be pushed, a sumito needs strictly more friends than enemies,
+        and marbles pushed beyond the edge fall into the dead zone.
+
+        Parameters
+        ----------
+        friend: int
+            Current player's color
+        cell: int
+            Cell index of the first marble
+        direction: int
+            Index of the orientation (see Geometry.DIRECTIONS)
+
+        Return
+        ------
+        position: BitBoard
+            The new position, or None if the move is invalid
+        """
+        if friend == 2:
+            own, other = self.red, self.green
+        else:
+            own, other = self.green, self.red
+        s = SHIFTS[direction]
+        first = 1 << BITS[cell]
+        if not own & first:
+            return None
+
+        # friendly marbles in line (no more than 3)
+        n_friends = 1
+        spot = shift(first, s)
+        while spot & own:
+            n_friends += 1
+            if n_friends > 3:
+                return None
+            spot = shift(spot, s)
+
+        own ^= first
+        if spot & other:
+            # sumito: enemies in line, then a free spot or the dead zone
+            front = spot
+            n_enemies = 0
+            while spot & other:
+                n_enemies += 1
+                if n_enemies >= n_friends:
+                    return None
+                spot = shift(spot, s)
+            if spot & own:
+                return None
+            other ^= front
+            other |= spot & PLAYABLE
+            own |= front
+        else:
+            own |= spot & PLAYABLE
+
+        if friend == 2:
+            return BitBoard(own, other)
+        return BitBoard(other, own)
+
+    def free(self, friend, cells, direction):
+        """Freely move a group of marbles in empty spots.
+
+        Same rules as Board.free_move: each marble has to move into an
+        empty spot (or the dead zone, killing it).
+
+        Parameters
+        ----------
+        friend: int
+            Current player's color
+        cells: tuple
+            Cell indexes of the marbles to move
+        direction: int
+            Index of the orientation (see Geometry.DIRECTIONS)
+
+        Return
+        ------
+        position: BitBoard
+            The new position, or None if the move is invalid
+        """
+        if friend == 2:
+            own, other = self.red, self.green
+        else:
+            own, other = self.green, self.red
+        group = 0
+        for cell in cells:
+            group |= 1 << BITS[cell]
+        targets = shift(group, SHIFTS[direction])
+        if group & ~own or targets & (own | other):
+            return None
+
+        own = (own ^ group) | (targets & PLAYABLE)
+        if friend == 2:
+            return BitBoard(own, other)
+        return BitBoard(other, own)
+
+    def apply(self, move, color):
+        """Play an encoded move (see Moves).
+
+        Parameters
+        ----------
+        move: int
+            Encoded move
+        color: int
+            Current player's color
+
+        Return
+        ------
+        position: BitBoard
+            The new position, or None if the move is invalid
+        """
+        cell, direction = move & 63, move >> 6 & 7
+        size = move >> 9 & 3
+        if size == 1:
+            return self.push(color, cell, direction)
+
+        if color == 2:
+            own, other = self.red, self.green
+        else:
+            own, other = self.green, self.red
+        s = SHIFTS[AXES[move >> 11 & 3]]
+        first = 1 << BITS[cell]
+        group = first | first << s
+        if size == 3:
+            group |= first << 2 * s
+        targets = shift(group, SHIFTS[direction])
+        if group & ~own or targets & (own | other):
+            return None
+
+        own = (own ^ group) | (targets & PLAYABLE)
+        if color == 2:
+            return BitBoard(own, other)
+        return BitBoard(other, own)
+
+    def generate_moves(self, color) -> list:
+        """Return all the legal moves of a given color.
+
+        Moves are found for whole sets of marbles at once: for each
+        orientation, the cells matching a pattern (i.e. two friends,
+        an enemy, then a free spot) are the intersection of the
+        bitboards shifted back along the line.
+
+        Parameter
+        ---------
+        color: int (positional)
+            Current player's color
+
+        Return
+        ------
+        moves: list of ints
+            Encoded moves (see Moves), pushes first
+        """
+        if color == 2:
+            own, other = self.red, self.green
+        else:
+            own, other = self.green, self.red
+        # where the last marble of a line can go: free spot or dead zone
+        out = (PLAYABLE & ~(own | other)) | DEAD
+        moves = []
+
+        # pushes (one marble, in-line groups and sumitos)
+        for d, s in enumerate(SHIFTS):
+            own2 = own & shift(own, -s)
+            own3 = own2 & shift(own, -2 * s)
+            other3 = own3 & shift(other, -3 * s)
+            starts = (
+                (own & shift(out, -s))
+                | (own2 & shift(out, -2 * s))
+                | (own3 & shift(out, -3 * s))
+                | (own2 & shift(other, -2 * s) & shift(out, -3 * s))
+                | (other3 & shift(out, -4 * s))
+                | (other3 & shift(other, -4 * s) & shift(out, -5 * s))
+            )
+            code = d << 6 | 1 << 9
+            while starts:
+                low = starts & -starts
+                moves.append(CELL_OF_BIT[low.bit_length() - 1] | code)
+                starts ^= low
+
+        # broadside moves (groups of 2 or 3 marbles)
+        for axis, a in enumerate(AXES):
+            s_a = SHIFTS[a]
+            pairs = own & (own >> s_a)
+            triples = pairs & (own >> 2 * s_a)
+            for d, s in enumerate(SHIFTS):
+                if d >> 1 == a >> 1:
+                    continue
+                free = shift(out, -s)
+                free2 = free & (free >> s_a)
+                for size, starts in ((2, pairs & free2),
+                                     (3, triples & free2
+                                         & (free >> 2 * s_a))):
+                    code = d << 6 | size << 9 | axis << 11
+                    while starts:
+                        low = starts & -starts
+                        moves.append(CELL_OF_BIT[low.bit_length() - 1]
+                                     | code)
+                        starts ^= low
+
+        return moves
+
+    def ejections(self, color) -> list:
+        """Return the pushes of a given color that eject an enemy marble.
+
+        Same patterns as the sumitos of generate_moves, the spot after
+        the enemies being the dead zone.
+
+        Parameter
+        ---------
+        color: int (positional)
+            Current player's color
+
+        Return
+        ------
+        moves: list of ints
+            Encoded moves (see Moves)
+        """
+        return self._sumitos(color, False)
+
+    def edge_threats(self, color) -> list:
+        """Return the sumitos of a given color that push an enemy marble
+        onto the edge, where a second sumito could eject it.
+
+        Parameter
+        ---------
+        color: int (positional)
+            Current player's color
+
+        Return
+        ------
+        moves: list of ints
+            Encoded moves (see Moves)
+        """
+        return self._sumitos(color, True)
+
+    def _sumitos(self, color, threats) -> list:
+        """Sumitos ending in the dead zone, or on the edge if threats."""
+        if color == 2:
+            own, other = self.red, self.green
+        else:
+            own, other = self.green, self.red
+        free = PLAYABLE & ~(own | other)
+        moves = []
+        for d, s in enumerate(SHIFTS):
+            # where the last enemy marble is pushed to
+            end = free & shift(DEAD, -s) if threats else DEAD
+            own2 = own & shift(own, -s)
+            other3 = own2 & shift(own, -2 * s) & shift(other, -3 * s)
+            starts = (
+                (own2 & shift(other, -2 * s) & shift(end, -3 * s))
+                | (other3 & shift(end, -4 * s))
+                | (other3 & shift(other, -4 * s) & shift(end, -5 * s))
+            )
+            code = d << 6 | 1 << 9
+            while starts:
+                low = starts & -starts
+                moves.append(CELL_OF_BIT[low.bit_length() - 1] | code)
+                starts ^= low
+        return moves
+
+    def to_list(self) -> list:
+        """Return the position as an 11x11 nested list (as Board.board)."""
+        board = [[0] * dimension for _ in range(dimension)]
+        for (r, c), b in zip(CELLS, BITS):
+            if self.red >> b & 1:
+                board[r][c] = 2
+            elif self.green >> b & 1:
+                board[r][c] = 3
+            else:
+                board[r][c] = 1
+        return board
+
+    def __eq__(self, other):
+        return (isinstance(other, BitBoard)
+                and self.red == other.red and self.green == other.green)
+
+    def __hash__(self):
+        return hash((self.red, self.green))
+
+    def __repr__(self):
+        return f"BitBoard(red={self.red:#x}, green={self.green:#x})"
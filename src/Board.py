@@ -5,11 +5,18 @@
 import math
 import re
 import itertools
-import random
 
 from more_itertools import sliced
 from termcolor import colored
-from UserMessages import ask_messages, err_messages, info_messages
+from BitBoard import BitBoard
+from Evaluation import MARBLE_WEIGHT, position_score, spots_score
+import Moves
+import Rules
+from Geometry import (AXES, CELLS, DIRECTION_INDEX, LINES2, LINES3,
+                      NEIGHBORS)
+from Zobrist import KEYS, SIDE, hash_list
+from UserMessages import (ask_messages, err_messages, info_messages,
+                          result_messages)
 
 
 class Board():
@@ -31,7 +38,11 @@ class Board():
         The key represents an orientation (i.e. "E" for East) and
         its associated value is a lambda function using 2 parameters.
         The dictionnary is used to compute new coordinates of a 
-        given sport of the board
+        given sport of the board.
+        The hot paths (next_spot, push_move, free_move,
+        valid_neighborhood) use the precomputed tables of Geometry
+        instead: NEIGHBORS[d][r][c] and RAYS[d][r][c], d being the
+        index of the orientation in Geometry.DIRECTIONS.
     r, g, c, y, w: string
         Define the color red, green, cyan, yellow and white, respectively
     to_color: function
@@ -54,6 +65,16 @@ class Board():
         1: empty spot
         2: red marble
         3: green marble
+    hash: int
+        64-bit Zobrist hash of the position and of the side to move,
+        equal to Zobrist.hash_bitboard (see Zobrist). Kept up to date
+        by update_board, the side to move being flipped at each
+        accepted move.
+    position_score: int
+        Positional terms of the static evaluation, from red's point of
+        view (see Evaluation). Kept up to date by update_board.
+    history: list
+        Undo records of the moves played by make_move
 
     Methods
     -------
@@ -61,6 +82,18 @@ class Board():
         Ask the current player his move
     update_board(user_data, orientation, color) -> bool
         Update the current board if the move is possible
+    apply_new_data(new_data) -> tuple
+        Write a move into the board, marbles counter, hash and score
+    make_move(move) -> tuple
+        Play an encoded move and return its undo record
+    unmake_move(undo)
+        Take back the last move played by make_move
+    compute_hash(color=2) -> int
+        Compute the hash of the current board from scratch
+    compute_position_score() -> int
+        Compute the positional score of the current board from scratch
+    evaluate(color) -> int
+        Static evaluation of the current board for a given color
     check_win() -> bool
         Count the number of marbles still alive
     push_move(friend, user_data, orientation) -> dict
@@ -71,6 +104,8 @@ class Board():
         Returns True if the move is valid
     valid_neighborhood(marble, friend, enemy) -> list
         Computes all valid neighboors where a given marble can move
+    generate_moves(color) -> list
+        Compute all the legal moves of a given color
     debug_board() -> list
         Return a representation of the attribute self.board as a list
     real_board() -> list
@@ -121,15 +156,16 @@ class Board():
     # constructor
     # ---------------------------------------------------------------------
 
-    def __init__(self):
+    def __init__(self, color=2):
         """Constructor. Initializes the board and a marbles counter.
 
         We assume the standard abalone initial configuration commonly 
         used, so the marbles initial position are hard-coded.
 
-        Parameters
-        ----------
-        None
+        Parameter
+        ---------
+        color: int
+            Color moving first, taken into account by the hash
         """
         self.marbles = {2: 14, 3: 14}
 
@@ -146,6 +182,9 @@ class Board():
                       [0, 0, 0, 0, 3, 3, 3, 3, 3, 3, 0],
                       [0, 0, 0, 0, 0, 3, 3, 3, 3, 3, 0],
                       [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]]
+        self.hash = self.compute_hash(color)
+        self.position_score = self.compute_position_score()
+        self.history = []
 
     # methods
     # ---------------------------------------------------------------------
@@ -249,15 +288,176 @@ class Board():
         else:
             new_data = self.push_move(color, user_data, orientation)
 
-        # Updating board if possible
+        # Updating board (and its hash) if possible
         if new_data:
-            for key, value in new_data.items():
-                row, col = key
-                self.board[row][col] = value
+            self.apply_new_data(new_data)
 
-        print("new_data = ", new_data)    
         return new_data
 
+    def apply_new_data(self, new_data) -> tuple:
+        """Write a move into the board.
+
+        The board, the marbles counter, the hash and the positional
+        score are updated from the changed spots only. Marbles that
+        were on a changed spot and are not anymore have been pushed
+        into the dead zone.
+
+        Parameter
+        ---------
+        new_data: dict (positional)
+            dict of key:value pairs tuple:int, as returned by push_move
+            and free_move
+
+        Return
+        ------
+        undo: tuple
+            Undo record (see unmake_move)
+        """
+        h = self.hash
+        score = self.position_score - spots_score(self.board, new_data)
+        lost = [0, 0, 0, 0]
+        changes = []
+        for key, value in new_data.items():
+            row, col = key
+            old_value = self.board[row][col]
+            i = row * Board.dimension + col
+            h ^= KEYS[old_value][i] ^ KEYS[value][i]
+            lost[old_value] += 1
+            lost[value] -= 1
+            changes.append((row, col, old_value))
+            self.board[row][col] = value
+        undo = (self.hash, lost[2], lost[3], tuple(changes),
+                self.position_score)
+        self.hash = h ^ SIDE
+        self.position_score = score + spots_score(self.board, new_data)
+        self.marbles[2] -= lost[2]
+        self.marbles[3] -= lost[3]
+        return undo
+
+    def make_move(self, move) -> tuple:
+        """Play an encoded move (see Moves) and record how to undo it.
+
+        The color playing is the one of the origin marble. The undo
+        record is also pushed on self.history.
+
+        Parameter
+        ---------
+        move: int (positional)
+            Encoded move
+
+        Return
+        ------
+        undo: tuple
+            (hash, red marbles lost, green marbles lost, changes,
+            positional score), changes being the (row, col, old value)
+            of each changed spot. None if the move is invalid, the
+            board being then left untouched.
+        """
+        cell, direction, size, axis = Moves.decode(move)
+        r, c = CELLS[cell]
+        color = self.board[r][c]
+        if color not in (2, 3):
+            return None
+        if size == 1:
+            _, new_data = Rules.push(self.board, color, r, c, direction)
+        else:
+            lines = LINES2 if size == 2 else LINES3
+            spots = lines[AXES[axis]][r][c]
+            if spots is None or any(self.board[s_r][s_c] != color
+                                    for s_r, s_c in spots):
+                return None
+            _, new_data = Rules.free(self.board, color, spots, direction)
+        if not new_data:
+            return None
+
+        undo = self.apply_new_data(new_data)
+        self.history.append(undo)
+        return undo
+
+    def unmake_move(self, undo=None):
+        """Take back the last move played by make_move.
+
+        Only the changed spots are restored, along with the marbles
+        counter, the hash and the positional score.
+
+        Parameter
+        ---------
+        undo: tuple
+            Undo record returned by make_move. Moves have to be taken
+            back in reverse order, so it defaults to the last one.
+
+        Return
+        ------
+        None
+        """
+        last = self.history.pop()
+        if undo is not None and undo is not last:
+            self.history.append(last)
+            raise ValueError("Only the last move can be taken back")
+        old_hash, red_lost, green_lost, changes, old_score = last
+        for row, col, old_value in changes:
+            self.board[row][col] = old_value
+        self.marbles[2] += red_lost
+        self.marbles[3] += green_lost
+        self.hash = old_hash
+        self.position_score = old_score
+
+    def compute_hash(self, color=2) -> int:
+        """Compute the hash of the current board from scratch.
+
+        Only needed when self.board is modified by hand, update_board
+        keeps self.hash up to date incrementally.
+
+        Parameter
+        ---------
+        color: int
+            Color of the side to move
+
+        Return
+        ------
+        hash: int
+            64-bit Zobrist hash of self.board, the SIDE key being set
+            when green is to move (as Zobrist.hash_bitboard)
+        """
+        return hash_list(self.board) ^ (SIDE if color == 3 else 0)
+
+    def compute_position_score(self) -> int:
+        """Compute the positional score of the current board from scratch.
+
+        Only needed when self.board is modified by hand, update_board
+        keeps self.position_score up to date incrementally.
+
+        Parameters
+        ----------
+        None
+
+        Return
+        ------
+        score: int
+            Positional terms of the evaluation, from red's point of view
+        """
+        return position_score(self.board)
+
+    def evaluate(self, color) -> int:
+        """Static evaluation of the current board (see Evaluation).
+
+        No spot is scanned: the material comes from self.marbles and
+        the other terms from self.position_score.
+
+        Parameter
+        ---------
+        color: int (positional)
+            Color of the player the score is given for
+
+        Return
+        ------
+        score: int
+            Positive if the position is good for color
+        """
+        score = (MARBLE_WEIGHT * (self.marbles[2] - self.marbles[3])
+                 + self.position_score)
+        return score if color == 2 else -score
+
     def check_win(self) -> bool:
         """Count the number of marbles still alive. 
 
@@ -275,13 +475,12 @@ class Board():
             True if any color won the game, False otherwise
         """
         game_over = False
-        red_wins = self.marbles[3] == 14 - 6
-        green_wins = self.marbles[2] == 14 - 6
-        if red_wins or green_wins:
-            if red_wins:
+        winner = Rules.winner(self.marbles)
+        if winner:
+            if winner == 2:
                 info_messages("INFO_RED_WINS")
             else:
-                info_messages("INFO_GREEN_WNS")
+                info_messages("INFO_GREEN_WINS")
             game_over = True
         
         return game_over
@@ -295,6 +494,8 @@ class Board():
         a sumito is invalid, it returns False. If the move is valid, it 
         returns True and fill a dictionnary (new_data) with the corresponding
         new positions.
+        The move itself is computed by the silent Rules.push, this method
+        only prints the message matching its result code.
 
         Parameters
         ----------
@@ -311,54 +512,10 @@ class Board():
             dict of key:value pairs tuple:int where the tuples
             represent the new positions or marbles and their new value
         """
-        enemy = self.enemy(friend)
         r, c = self.to_2d_list(user_data[0])
-        new_data = {(r, c): 1}  # the first marble becomes empty
-        colors = [self.board[r][c]]
-
-        while self.board[r][c] != Board.free:
-            n_r, n_c = self.next_spot(r, c, orientation)
-            current_spot = self.board[r][c]
-            next_spot = self.board[n_r][n_c]
-            colors.append(next_spot)
-
-            sumito = enemy in colors
-            too_much_marbles = colors.count(friend) > 3
-            wrong_sumito = colors.count(enemy) >= colors.count(friend)
-
-            # cannot push more than 3 marbles
-            if too_much_marbles:
-                err_messages("ERR_TOO_MUCH")
-                new_data.clear()
-                break
-            # next spot is always friendly, except deadzone
-            if current_spot == friend:
-                if next_spot in (friend, enemy, Board.free):
-                    new_data[(n_r, n_c)] = friend
-                else:
-                    # friend pushed to deadzone
-                    info_messages("INFO_SUICIDE")
-                    self.marbles[friend] -= 1
-                    break
-            # next spot depends on the sumito
-            elif current_spot == enemy:
-                if next_spot in (enemy, Board.free):
-                    new_data[(n_r, n_c)] = enemy if sumito else enemy
-                elif next_spot == friend:
-                    wrong_sumito = True
-                else:
-                    # enemy pushed to deadzone
-                    info_messages("INFO_KILL_ENEMY")
-                    self.marbles[enemy] -= 1
-                    break
-
-            # performing a wrong sumito
-            if wrong_sumito:
-                err_messages("ERR_SUMITO")
-                new_data.clear()
-                break
-
-            r, c = n_r, n_c
+        direction = DIRECTION_INDEX[orientation.upper()]
+        code, new_data = Rules.push(self.board, friend, r, c, direction)
+        result_messages(code)
 
         return new_data
 
@@ -371,6 +528,8 @@ class Board():
         one of the next spot is invalid, it returns False. If the move is valid, it 
         returns True and fill a dictionnary (new_data) with the corresponding
         new positions.
+        The move itself is computed by the silent Rules.free, this method
+        only prints the message matching its result code.
 
         Parameters
         ----------
@@ -387,25 +546,10 @@ class Board():
             dict of key:value pairs tuple:int where the tuples
             represent the new positions or marbles and their new value
         """
-        enemy = self.enemy(friend)
-        new_data = dict()
-
-        for element in user_data:
-            valid_neighbors = self.valid_neighborhood(element, 
-                                                      friend,
-                                                      enemy)
-            r, c = self.to_2d_list(element)
-            n_r, n_c = self.next_spot(r, c, orientation)
-            if (n_r, n_c) not in valid_neighbors:
-                err_messages("ERR_EMPTY_SPOT")
-                new_data.clear()
-                break
-            new_data[(r, c)] = 1
-            if self.board[n_r][n_c] == 1:
-                new_data[(n_r, n_c)] = friend
-            else:
-                info_messages("INFO_SUICIDE")
-                self.marbles[friend] -= 1
+        spots = (self.to_2d_list(element) for element in user_data)
+        direction = DIRECTION_INDEX[orientation.upper()]
+        code, new_data = Rules.free(self.board, friend, spots, direction)
+        result_messages(code)
 
         return new_data
 
@@ -433,13 +577,34 @@ class Board():
         """
         valid_neighborhood = []
         r, c = self.to_2d_list(marble)
-        for fun in Board.disp.values():
-            n_r, n_c = fun(r, c)
+        for neighbors in NEIGHBORS:
+            n_r, n_c = neighbors[r][c]
             if self.board[n_r][n_c] not in (friend, enemy):
                 valid_neighborhood.append((n_r, n_c))
                 
         return valid_neighborhood
 
+    def generate_moves(self, color) -> list:
+        """Compute all the legal moves of a given color.
+
+        Moves are generated on a bitboard copy of the position
+        (see BitBoard.generate_moves). Pushes (one marble, in-line
+        groups and sumitos) and broadside moves of 2 or 3 marbles
+        are all listed, in the compact form described in Moves.
+
+        Parameter
+        ---------
+        color: int (positional)
+            Player's current color
+
+        Return
+        ------
+        moves: list of ints
+            Encoded moves. Moves.to_user_data turns any of them into
+            the inputs expected by update_board.
+        """
+        return BitBoard.from_list(self.board).generate_moves(color)
+
     def debug_board(self) -> list:
         """Return a representation of the attribute self.board as a list
 
@@ -608,7 +773,7 @@ class Board():
         next spot: tuple of ints:
             new coordinates (row, col) in the 2d-list frame
         """
-        next_spot = Board.disp[orientation.upper()](r, c)
+        next_spot = NEIGHBORS[DIRECTION_INDEX[orientation.upper()]][r][c]
         return next_spot
 
     @staticmethod
@@ -697,48 +862,9 @@ class Board():
         )
         return is_horizontal
 
-def play_again() -> bool:
-    """Ask the user if he wants to keep playing.
-
-    Parameters
-    ----------
-    None
-
-    Return
-    ------
-    True if the user wants to play again, False otherwise
-    """
-    while True:
-        play_game = input('Play again (y/n)? : ')
-        if re.search(r'^y|n{1}$', play_game, re.IGNORECASE) is None:
-            print('Please enter \'y\', \'Y\', \'n\' or \'N\'')
-            continue
-        if re.search(r'^y{1}$', play_game, re.IGNORECASE):
-            play_again = True
-        elif re.search(r'^n{1}$', play_game, re.IGNORECASE):
-            play_again = False
-        break
-
-def main() -> None:
-    
-    while True:
-        B = Board()
-        color = random.choice((2, 3))
-        game_over = False
-        while not game_over:
-            user_data, orientation = B.ask_move(color)
-            valid_move = B.update_board(user_data, orientation, color)
-            game_over = B.check_win()
-            if not valid_move:
-                continue
-            color = color
-        if play_again():
-            continue
-        else:
-            print("Bye...")
-            break
 
 if __name__ == "__main__":
-    main()
-
-
+    # the terminal game lives in Play.py, which keeps the engines out of
+    # the modules only needing a Board
+    import runpy
+    runpy.run_module("Play", run_name="__main__")
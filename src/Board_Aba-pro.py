@@ -142,7 +142,6 @@ class Board():
         n_r, n_c: tuple (int)
             Coordinates of the given spot in the 2d-list (self.board)
         """
-        print("coords_hexa=", coords_hexa)
         r, c = coords_hexa.upper()
         n_r = self.char_2_num[r]
         if c in (self.middle, self.middle + 1):
@@ -0,0 +1,569 @@
+# -------------------- #
+#    Abalone Engine    #
+# -------------------- #
+
+import math
+import threading
+import time
+
+import Moves
+from BitBoard import BitBoard, popcount
+from Evaluation import evaluate
+from Rules import LOSING_COUNT
+from TranspositionTable import EXACT, LOWER, UPPER, TranspositionTable
+from Zobrist import hash_bitboard, update_bitboard
+
+WIN = 100000
+INFINITY = WIN + 1
+# scores beyond this bound are wins or losses in a given number of plies
+WIN_BOUND = WIN - 1000
+# killer moves kept per ply
+KILLERS = 2
+# quiescence search: nodes per leaf and plies beyond the nominal depth
+QUIESCENCE_NODES = 64
+QUIESCENCE_DEPTH = 6
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time budget is spent."""
+
+
+class Engine():
+    """
+    A computer player using a negamax alpha-beta search.
+
+    The search is iteratively deepened until the time budget of the
+    move is spent: the best move of the deepest completed iteration is
+    returned. Results are kept in a transposition table. With an opening
+    book, book moves are played without searching.
+
+    Moves are tried in this order (see _ordered_moves): the best move of
+    the previous iteration (from the transposition table), the pushes
+    ejecting a marble, the other pushes, the killer moves of the ply,
+    then the broadside moves ranked by the history heuristic.
+
+    The leaves are not evaluated right away: a quiescence search first
+    plays out the pushes ejecting a marble or pushing one onto the edge,
+    until the position is quiet or the node budget of the leaf is spent
+    (see _quiesce).
+
+    The engine can ponder: once its move is played, it predicts the
+    opponent's reply and searches the resulting position in a background
+    thread while the opponent thinks (a human blocked on input() leaves
+    the CPU idle). If the reply is the predicted one, the next search
+    only waits for the pondering search, whose time budget started when
+    the pondering did; otherwise the pondering search is stopped and its
+    result thrown away.
+
+    Attributes
+    ----------
+    time_limit: float
+        Wall-clock budget per move, in seconds
+    max_depth: int
+        Maximum depth of the iterative deepening
+    tt: TranspositionTable
+        Search results shared between moves
+    book: OpeningBook
+        Opening book consulted before searching, None for no book
+    nodes: int
+        Number of nodes visited by the last search
+    depth: int
+        Depth of the last completed iteration
+    score: int
+        Score of the last completed iteration
+    cutoffs: int
+        Number of beta cutoffs of the last search
+    first_cutoffs: int
+        Number of these cutoffs caused by the first move tried
+    iteration_nodes: list
+        Nodes visited by each completed iteration of the last search
+    qnodes: int
+        Nodes of the last search visited by the quiescence search
+    ponder_move: int
+        Predicted reply of the opponent while pondering, 0 otherwise
+    ponder_hits: int
+        Number of searches answered by the pondering search
+
+    Methods
+    -------
+    get_move(board, color) -> tuple
+        Choose a move for a Board, in the form returned by Board.ask_move
+    search(position, color, first_depth=1) -> int
+        Choose a move for a BitBoard position
+    ponder(position, color) -> int
+        Search the predicted reply of the opponent in the background
+    stop_pondering()
+        Stop the pondering search and throw its result away
+    """
+
+    def __init__(self, time_limit=1.0, max_depth=64, tt_size_mb=16,
+                 book=None, ordering=True, quiescence=True, tt=None):
+        """Constructor.
+
+        Parameters
+        ----------
+        time_limit: float
+            Wall-clock budget per move, in seconds
+        max_depth: int
+            Maximum depth of the iterative deepening
+        tt_size_mb: float
+            Size of the transposition table, in MB
+        book: OpeningBook
+            Opening book consulted before searching
+        ordering: bool
+            False to only try the transposition table move first (the
+            other moves in generation order), for comparisons
+        quiescence: bool
+            False to evaluate the leaves without a quiescence search
+        tt: TranspositionTable
+            Table to use instead of a new one of tt_size_mb MB (e.g. a
+            table shared with other processes, see LazySMP)
+        """
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.tt = TranspositionTable(tt_size_mb) if tt is None else tt
+        self.book = book
+        self.ordering = ordering
+        self.quiescence = quiescence
+        self.nodes = 0
+        self.depth = 0
+        self.score = 0
+        self.deadline = 0.0
+        self.cutoffs = 0
+        self.first_cutoffs = 0
+        self.iteration_nodes = []
+        self.qnodes = 0
+        self._q_budget = 0
+        # history[color][move]: cutoffs caused, weighted by depth
+        self.history = {2: [0] * (1 << 13), 3: [0] * (1 << 13)}
+        self.killers = []
+        self.ponder_move = 0
+        self.ponder_hits = 0
+        self._ponder_thread = None
+        self._ponder_target = None
+        self._ponder_start = 0.0
+        self._ponder_result = 0
+
+    @property
+    def cutoff_rate(self) -> float:
+        """Share of the cutoffs of the last search made by the first move."""
+        return self.first_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    @property
+    def branching_factor(self) -> float:
+        """Effective branching factor of the last iteration of the search."""
+        if len(self.iteration_nodes) < 2 or not self.iteration_nodes[-2]:
+            return 0.0
+        return self.iteration_nodes[-1] / self.iteration_nodes[-2]
+
+    def get_move(self, board, color) -> tuple:
+        """Choose a move for a Board.
+
+        Can be used in place of Board.ask_move.
+
+        Parameters
+        ----------
+        board: Board (positional)
+            Current game
+        color: int (positional)
+            Color of the computer
+
+        Return
+        -------
+        user_data: tuple
+            The marble(s) to move
+        orientation: string
+            The orientation where the marble(s) are being moved
+        """
+        move = self.search(BitBoard.from_board(board), color)
+        return Moves.to_user_data(move)
+
+    def search(self, position, color, first_depth=1) -> int:
+        """Choose a move by iterative deepening within the time budget.
+
+        Parameters
+        ----------
+        position: BitBoard (positional)
+            Current position
+        color: int (positional)
+            Color of the side to move
+        first_depth: int
+            Depth of the first iteration (helpers of a parallel search
+            start deeper than the main thread)
+
+        Return
+        ------
+        move: int
+            Best move found (see Moves), 0 if there is no legal move
+        """
+        if self._ponder_thread is not None:
+            move = self._ponder_hit(position, color)
+            if move:
+                return move
+        self.deadline = time.perf_counter() + self.time_limit
+        return self._iterate(position, color, first_depth)
+
+    def _iterate(self, position, color, first_depth) -> int:
+        """Iterative deepening until self.deadline (see search)."""
+        self.nodes = 0
+        self.depth = 0
+        self.cutoffs = self.first_cutoffs = 0
+        self.iteration_nodes = []
+        self.qnodes = 0
+        if self.book is not None:
+            move = self.book.choose(position, color)
+            if move:
+                return move
+        self.killers = [[0] * KILLERS for _ in range(self.max_depth + 1)]
+        for table in self.history.values():
+            # older cutoffs count less
+            table[:] = [h >> 1 for h in table]
+        self.tt.new_search()
+        key = hash_bitboard(position, color)
+        moves = position.generate_moves(color)
+        if not moves:
+            return 0
+
+        best_move = moves[0]
+        for depth in range(first_depth, self.max_depth + 1):
+            nodes = self.nodes
+            try:
+                score, move = self._search_root(position, key, color,
+                                                moves, depth)
+            except SearchTimeout:
+                break
+            self.iteration_nodes.append(self.nodes - nodes)
+            best_move, self.score, self.depth = move, score, depth
+            # best move first at the next iteration
+            moves.remove(move)
+            moves.insert(0, move)
+            if abs(score) >= WIN_BOUND:
+                break
+        return best_move
+
+    def ponder(self, position, color) -> int:
+        """Search the predicted reply of the opponent in the background.
+
+        The reply is the best move stored in the transposition table for
+        position (the last search went through it), or else the reply
+        with the best static evaluation. The position it leads to is
+        searched in a thread without deadline, until the next call to
+        search or stop_pondering.
+
+        Parameters
+        ----------
+        position: BitBoard (positional)
+            Position after the move of the engine
+        color: int (positional)
+            Color of the opponent, to move
+
+        Return
+        ------
+        move: int
+            Predicted reply (see Moves), 0 if there is nothing to ponder
+            (no legal reply, or a reply ending the game)
+        """
+        self.stop_pondering()
+        moves = position.generate_moves(color)
+        if not moves:
+            return 0
+        entry = self.tt.probe(hash_bitboard(position, color))
+        move = entry[3] if entry is not None else 0
+        if move not in moves:
+            move = max(moves, key=lambda m: evaluate(position.apply(m, color),
+                                                     color))
+        child = position.apply(move, color)
+        if (popcount(child.red) <= LOSING_COUNT
+                or popcount(child.green) <= LOSING_COUNT):
+            return 0
+        self.ponder_move = move
+        self._ponder_target = (child, 5 - color)
+        self._ponder_start = time.perf_counter()
+        # set before the thread starts, so that stopping it cannot be lost
+        self.deadline = math.inf
+        self._ponder_thread = threading.Thread(
+            target=self._ponder_search, args=self._ponder_target, daemon=True)
+        self._ponder_thread.start()
+        return move
+
+    def _ponder_search(self, position, color) -> None:
+        """Body of the pondering thread."""
+        self._ponder_result = self._iterate(position, color, 1)
+
+    def _ponder_hit(self, position, color) -> int:
+        """End the pondering search before searching position.
+
+        If position is the predicted one, the pondering search gets the
+        rest of the time budget started with it, and its move is
+        returned. Otherwise it is stopped right away.
+
+        Return
+        ------
+        move: int
+            Move of the pondering search, 0 if it cannot be used
+        """
+        thread, target = self._ponder_thread, self._ponder_target
+        if target != (position, color):
+            self.stop_pondering()
+            return 0
+        self.deadline = self._ponder_start + self.time_limit
+        thread.join()
+        self._ponder_thread = self._ponder_target = None
+        self.ponder_move = 0
+        if not self.depth:
+            # stopped before its first iteration completed
+            return 0
+        self.ponder_hits += 1
+        return self._ponder_result
+
+    def stop_pondering(self) -> None:
+        """Stop the pondering search and throw its result away.
+
+        Its entries are kept in the transposition table.
+        """
+        if self._ponder_thread is not None:
+            self.deadline = 0.0
+            self._ponder_thread.join()
+        self._ponder_thread = self._ponder_target = None
+        self.ponder_move = 0
+
+    def _search_root(self, position, key, color, moves, depth) -> tuple:
+        """Search every root move to a given depth.
+
+        Return
+        ------
+        score, move: tuple
+            Best score and move
+        """
+        enemy = 5 - color
+        alpha, beta = -INFINITY, INFINITY
+        best_move = moves[0]
+        for move in moves:
+            child = position.apply(move, color)
+            score = self._score_child(position, child, key, color, enemy,
+                                      depth, alpha, beta, 0)
+            if score > alpha:
+                alpha, best_move = score, move
+        self.tt.store(key, depth, alpha, EXACT, best_move)
+        return alpha, best_move
+
+    def _score_child(self, position, child, key, color, enemy,
+                     depth, alpha, beta, ply) -> int:
+        """Score a child position from the point of view of color."""
+        if popcount(child.pieces(enemy)) <= LOSING_COUNT:
+            return WIN - ply - 1
+        if popcount(child.pieces(color)) <= LOSING_COUNT:
+            return -(WIN - ply - 1)
+        child_key = update_bitboard(key, position, child)
+        return -self._negamax(child, child_key, enemy, depth - 1,
+                              -beta, -alpha, ply + 1)
+
+    def _negamax(self, position, key, color, depth, alpha, beta, ply) -> int:
+        """Negamax alpha-beta search.
+
+        Parameters
+        ----------
+        position: BitBoard
+            Current position
+        key: int
+            Zobrist hash of the position, side to move included
+        color: int
+            Color of the side to move
+        depth: int
+            Remaining depth
+        alpha, beta: int
+            Search window
+        ply: int
+            Distance to the root
+
+        Return
+        ------
+        score: int
+            Score of the position from the point of view of color
+        """
+        self.nodes += 1
+        if not self.nodes & 1023 and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+        if depth <= 0:
+            if not self.quiescence:
+                return evaluate(position, color)
+            self._q_budget = QUIESCENCE_NODES
+            return self._quiesce(position, color, alpha, beta, ply,
+                                 QUIESCENCE_DEPTH)
+
+        alpha_orig = alpha
+        tt_move = 0
+        entry = self.tt.probe(key)
+        if entry is not None:
+            tt_depth, tt_score, bound, tt_move = entry
+            if tt_depth >= depth:
+                tt_score = _score_from_tt(tt_score, ply)
+                if (bound == EXACT
+                        or (bound == LOWER and tt_score >= beta)
+                        or (bound == UPPER and tt_score <= alpha)):
+                    return tt_score
+
+        enemy = 5 - color
+        best_score, best_move = -INFINITY, 0
+        for i, (move, child) in enumerate(
+                self._ordered_moves(position, color, tt_move, ply)):
+            score = self._score_child(position, child, key, color, enemy,
+                                      depth, alpha, beta, ply)
+            if score > best_score:
+                best_score, best_move = score, move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        self._cutoff(move, color, depth, ply, i)
+                        break
+        if best_move == 0:
+            # no legal move
+            return evaluate(position, color)
+
+        if best_score <= alpha_orig:
+            bound = UPPER
+        elif best_score >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.tt.store(key, depth, _score_to_tt(best_score, ply), bound,
+                      best_move)
+        return best_score
+
+
+    def _quiesce(self, position, color, alpha, beta, ply, depth) -> int:
+        """Search the ejecting and edge-threatening pushes of a leaf.
+
+        The side to move can also stand pat: the static evaluation is a
+        lower bound of the score. Nodes count against the budget of the
+        leaf, and once it is spent the positions are evaluated.
+
+        Parameters
+        ----------
+        position: BitBoard
+            Current position
+        color: int
+            Color of the side to move
+        alpha, beta: int
+            Search window
+        ply: int
+            Distance to the root
+        depth: int
+            Remaining plies of quiescence
+
+        Return
+        ------
+        score: int
+            Score of the position from the point of view of color
+        """
+        stand_pat = evaluate(position, color)
+        if stand_pat >= beta or depth <= 0 or self._q_budget <= 0:
+            return stand_pat
+        alpha = max(alpha, stand_pat)
+
+        enemy = 5 - color
+        for move in (position.ejections(color)
+                     + position.edge_threats(color)):
+            self._q_budget -= 1
+            self.qnodes += 1
+            self.nodes += 1
+            if not self.nodes & 1023 and time.perf_counter() > self.deadline:
+                raise SearchTimeout()
+            child = position.apply(move, color)
+            if popcount(child.pieces(enemy)) <= LOSING_COUNT:
+                return WIN - ply - 1
+            score = -self._quiesce(child, enemy, -beta, -alpha, ply + 1,
+                                   depth - 1)
+            if score > alpha:
+                alpha = score
+                if alpha >= beta:
+                    break
+        return alpha
+
+    def _ordered_moves(self, position, color, tt_move, ply):
+        """Generate the moves of a position, the most promising first.
+
+        The moves are played lazily: a cutoff on one of the first moves
+        saves the work of the others.
+
+        Parameters
+        ----------
+        position: BitBoard
+            Current position
+        color: int
+            Color of the side to move
+        tt_move: int
+            Best move found for this position by an earlier search
+        ply: int
+            Distance to the root
+
+        Yield
+        -----
+        move, child: tuple
+            A legal move and the position it leads to
+        """
+        moves = position.generate_moves(color)
+        if not self.ordering:
+            if tt_move in moves:
+                moves.remove(tt_move)
+                moves.insert(0, tt_move)
+            for move in moves:
+                yield move, position.apply(move, color)
+            return
+
+        if tt_move in moves:
+            yield tt_move, position.apply(tt_move, color)
+        ejections = position.ejections(color)
+        for move in ejections:
+            if move != tt_move:
+                yield move, position.apply(move, color)
+        tried = set(ejections)
+        tried.add(tt_move)
+        broadsides = []
+        for move in moves:
+            if move in tried:
+                continue
+            if move >> 9 & 3 == 1:
+                yield move, position.apply(move, color)
+            else:
+                broadsides.append(move)
+
+        for killer in self.killers[ply]:
+            if killer and killer != tt_move and killer in broadsides:
+                broadsides.remove(killer)
+                yield killer, position.apply(killer, color)
+        history = self.history[color]
+        broadsides.sort(key=history.__getitem__, reverse=True)
+        for move in broadsides:
+            yield move, position.apply(move, color)
+
+    def _cutoff(self, move, color, depth, ply, i) -> None:
+        """Record a beta cutoff of the i-th move tried at a given ply."""
+        self.cutoffs += 1
+        if i == 0:
+            self.first_cutoffs += 1
+        if move >> 9 & 3 > 1:
+            # broadside moves are ranked by killers and history
+            killers = self.killers[ply]
+            if move != killers[0]:
+                killers.insert(0, move)
+                killers.pop()
+            self.history[color][move] += depth * depth
+
+
+def _score_to_tt(score, ply) -> int:
+    """Make win/loss scores relative to the stored position."""
+    if score >= WIN_BOUND:
+        return score + ply
+    if score <= -WIN_BOUND:
+        return score - ply
+    return score
+
+
+def _score_from_tt(score, ply) -> int:
+    """Make win/loss scores stored in the table relative to the root."""
+    if score >= WIN_BOUND:
+        return score - ply
+    if score <= -WIN_BOUND:
+        return score + ply
+    return score
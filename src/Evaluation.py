@@ -0,0 +1,146 @@
+# -------------------- #
+#  Abalone Evaluation  #
+# -------------------- #
+
+"""Static evaluation of a position.
+
+The score is the sum of four terms, each counted for one color minus the
+other:
+    - material: MARBLE_WEIGHT per marble still on the board
+    - center: CENTER_WEIGHT * (4 - distance to the center) per marble
+    - cohesion: COHESION_WEIGHT per pair of adjacent friendly marbles
+    - edge danger: -EDGE_WEIGHT per marble standing on the edge with an
+      enemy marble right behind it, towards the center (a marble that
+      a sumito could eject)
+
+evaluate computes it from a BitBoard with a few popcounts. Board keeps
+the last three terms up to date instead (see Board.apply_new_data): they
+only depend on the marbles and the pairs of adjacent spots, so a move
+changes the terms of its changed spots only, which spots_score gives.
+"""
+
+from BitBoard import popcount, shift
+from Geometry import (AXES, BITS, CELLS, CENTER_DISTANCE, DEAD, NEIGHBORS,
+                      RINGS, SHIFTS, dimension)
+
+MARBLE_WEIGHT = 1000
+CENTER_WEIGHT = 10
+COHESION_WEIGHT = 5
+EDGE_WEIGHT = 20
+
+# score of a marble on each spot, indexed [r][c]
+CENTER_SCORES = [[0] * dimension for _ in range(dimension)]
+for (_r, _c), _k in zip(CELLS, CENTER_DISTANCE):
+    CENTER_SCORES[_r][_c] = CENTER_WEIGHT * (4 - _k)
+# EDGES[d]: bitboard of the spots whose neighbor in direction d is dead
+EDGES = tuple(sum(1 << b for b in BITS if (1 << b + s) & DEAD)
+              for s in SHIFTS)
+# red counts positively, green negatively
+SIGN = (0, 0, 1, -1)
+
+
+def evaluate(position, color) -> int:
+    """Static evaluation of a position, from the point of view of color.
+
+    Parameters
+    ----------
+    position: BitBoard (positional)
+        Position to evaluate
+    color: int (positional)
+        Color of the side to move
+
+    Return
+    ------
+    score: int
+        Positive if the position is good for color
+    """
+    if color == 2:
+        own, other = position.red, position.green
+    else:
+        own, other = position.green, position.red
+    score = MARBLE_WEIGHT * (popcount(own) - popcount(other))
+    for k, ring in enumerate(RINGS):
+        score += (CENTER_WEIGHT * (4 - k)
+                  * (popcount(own & ring) - popcount(other & ring)))
+    for a in AXES:
+        s = SHIFTS[a]
+        score += COHESION_WEIGHT * (popcount(own & (own >> s))
+                                    - popcount(other & (other >> s)))
+    for d, edge in enumerate(EDGES):
+        # enemy behind the marble, opposite to the dead zone
+        s = SHIFTS[d ^ 1]
+        score -= EDGE_WEIGHT * (popcount(own & edge & shift(other, -s))
+                                - popcount(other & edge & shift(own, -s)))
+    return score
+
+
+def _pair_score(board, r, c, d) -> int:
+    """Terms of the pair made of (r, c) and its neighbor in direction d."""
+    value = board[r][c]
+    n_r, n_c = NEIGHBORS[d][r][c]
+    n_value = board[n_r][n_c]
+    if value < 2 or n_value < 2:
+        return 0
+    if value == n_value:
+        return COHESION_WEIGHT * SIGN[value]
+    score = 0
+    b_r, b_c = NEIGHBORS[d ^ 1][r][c]
+    if board[b_r][b_c] == 0:
+        score -= EDGE_WEIGHT * SIGN[value]
+    b_r, b_c = NEIGHBORS[d][n_r][n_c]
+    if board[b_r][b_c] == 0:
+        score -= EDGE_WEIGHT * SIGN[n_value]
+    return score
+
+
+def spots_score(board, spots) -> int:
+    """Positional terms involving a set of spots, from red's point of view.
+
+    Every term a move can change: the center score of the marbles on
+    the spots, and the pairs with at least one end on the spots (each
+    pair counted once).
+
+    Parameters
+    ----------
+    board: list (positional)
+        Nested list of Board.board values
+    spots: set or dict (positional)
+        Spots (r, c) in the 2d-list frame (i.e. the keys of new_data)
+
+    Return
+    ------
+    score: int
+        Sum of the terms (material excluded)
+    """
+    score = 0
+    for r, c in spots:
+        value = board[r][c]
+        score += CENTER_SCORES[r][c] * SIGN[value]
+        for d in range(6):
+            neighbor = NEIGHBORS[d][r][c]
+            # pairs inside the set are only counted from one end
+            if neighbor in spots and d & 1:
+                continue
+            score += _pair_score(board, r, c, d)
+    return score
+
+
+def position_score(board) -> int:
+    """Positional terms of a whole board, from red's point of view.
+
+    Parameter
+    ---------
+    board: list (positional)
+        Nested list of Board.board values
+
+    Return
+    ------
+    score: int
+        Sum of the terms (material excluded)
+    """
+    score = 0
+    for r, c in CELLS:
+        score += CENTER_SCORES[r][c] * SIGN[board[r][c]]
+        for d in AXES:
+            score += _pair_score(board, r, c, d)
+    return score
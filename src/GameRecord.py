@@ -0,0 +1,211 @@
+# -------------------- #
+# Abalone Game Records #
+# -------------------- #
+
+"""Compact binary game records.
+
+A record file starts with a 5-byte header (the magic b"ABAR" and a
+version byte), followed by the games one after the other. Each game is:
+
+    1 byte    color moving first (2: red, 3: green)
+    1 byte    winner (2, 3, or 0 for a draw / unfinished game)
+    2 bytes   number of moves n
+    2n bytes  moves, encoded as in Moves (13 bits each)
+
+Every integer is little-endian. All games start from the standard
+position, so a game can be replayed from its moves alone. Files are only
+ever appended to, and are read one game at a time: an archive of
+millions of games never has to fit in memory.
+
+    with GameWriter("games.abr") as writer:
+        writer.append(2, moves, winner=3)
+    for first, winner, moves in read_games("games.abr"):
+        ...
+"""
+
+import os
+import struct
+import sys
+from array import array
+
+from BitBoard import BitBoard
+
+MAGIC = b"ABAR"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sB")
+GAME_HEADER = struct.Struct("<BBH")
+MAX_MOVES = 0xFFFF
+
+
+class RecordError(ValueError):
+    """Raised when a file is not a valid game record."""
+
+
+class GameWriter():
+    """
+    Append-only writer of game records.
+
+    The file header is written if the file is new or empty, and each
+    game is written in one call, so an interrupted run at worst loses
+    the game being written.
+
+    Attributes
+    ----------
+    path: string
+        Path of the record file
+    games: int
+        Number of games appended by this writer
+
+    Methods
+    -------
+    append(first, moves, winner=0)
+        Write a game at the end of the file
+    close()
+        Close the file
+    """
+
+    def __init__(self, path):
+        """Constructor.
+
+        Parameter
+        ---------
+        path: string (positional)
+            Path of the record file, created if needed
+        """
+        self.path = path
+        self.games = 0
+        if os.path.exists(path) and os.path.getsize(path):
+            # checked before opening, so that nothing is left open
+            _check_header(path)
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(FILE_HEADER.pack(MAGIC, VERSION))
+
+    def append(self, first, moves, winner=0) -> None:
+        """Write a game at the end of the file.
+
+        Parameters
+        ----------
+        first: int (positional)
+            Color moving first
+        moves: iterable of ints (positional)
+            Encoded moves, in the order they were played
+        winner: int
+            Winning color, 0 for a draw or an unfinished game
+        """
+        moves = array("H", moves)
+        if len(moves) > MAX_MOVES:
+            raise ValueError(f"Too many moves: {len(moves)}")
+        if sys.byteorder == "big":
+            moves.byteswap()
+        self.file.write(GAME_HEADER.pack(first, winner, len(moves))
+                        + moves.tobytes())
+        self.games += 1
+
+    def close(self) -> None:
+        """Flush and close the file."""
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _check_header(path) -> None:
+    """Raise RecordError if a file does not start with a record header."""
+    with open(path, "rb") as f:
+        header = f.read(FILE_HEADER.size)
+    if len(header) < FILE_HEADER.size:
+        raise RecordError(f"{path}: truncated header")
+    magic, version = FILE_HEADER.unpack(header)
+    if magic != MAGIC:
+        raise RecordError(f"{path}: not a game record")
+    if version != VERSION:
+        raise RecordError(f"{path}: unsupported version {version}")
+
+
+def read_games(path):
+    """Iterate over the games of a record file.
+
+    Parameter
+    ---------
+    path: string (positional)
+        Path of the record file
+
+    Yield
+    -----
+    first: int
+        Color moving first
+    winner: int
+        Winning color, 0 for a draw or an unfinished game
+    moves: array
+        Encoded moves (array of unsigned shorts)
+    """
+    _check_header(path)
+    with open(path, "rb") as f:
+        f.seek(FILE_HEADER.size)
+        while True:
+            header = f.read(GAME_HEADER.size)
+            if not header:
+                return
+            if len(header) < GAME_HEADER.size:
+                raise RecordError(f"{path}: truncated game")
+            first, winner, n = GAME_HEADER.unpack(header)
+            data = f.read(2 * n)
+            if len(data) < 2 * n:
+                raise RecordError(f"{path}: truncated game")
+            moves = array("H")
+            moves.frombytes(data)
+            if sys.byteorder == "big":
+                moves.byteswap()
+            yield first, winner, moves
+
+
+def count_games(path) -> int:
+    """Return the number of games of a record file, skipping the moves."""
+    _check_header(path)
+    size = os.path.getsize(path)
+    count = 0
+    with open(path, "rb") as f:
+        offset = FILE_HEADER.size
+        while offset < size:
+            if size - offset < GAME_HEADER.size:
+                raise RecordError(f"{path}: truncated game")
+            f.seek(offset)
+            _, _, n = GAME_HEADER.unpack(f.read(GAME_HEADER.size))
+            offset += GAME_HEADER.size + 2 * n
+            if offset > size:
+                raise RecordError(f"{path}: truncated game")
+            count += 1
+    return count
+
+
+def replay(first, moves):
+    """Replay a game from the standard position.
+
+    Parameters
+    ----------
+    first: int (positional)
+        Color moving first
+    moves: iterable of ints (positional)
+        Encoded moves
+
+    Yield
+    -----
+    position: BitBoard
+        Position before the move
+    color: int
+        Color of the side to move
+    move: int
+        Move played in this position
+    """
+    position = BitBoard.start()
+    color = first
+    for move in moves:
+        yield position, color, move
+        position = position.apply(move, color)
+        if position is None:
+            raise RecordError(f"Illegal move: {move}")
+        color = 5 - color
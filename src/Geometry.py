@@ -0,0 +1,156 @@
+# -------------------- #
+#   Abalone Geometry   #
+# -------------------- #
+
+"""Static description of the hexagonal board.
+
+The 61 playable spots are laid out exactly like Board.board: an 11x11
+nested list whose border (and both corners) is the dead zone. A spot
+(r, c) is playable if 1 <= r, c <= 9 and |r - c| <= 4.
+
+Every playable spot has two other names used throughout the engine:
+    - a cell index (0..60), spots being numbered row by row from A to I
+    - a bit index (r * 11 + c), its position in the padded 11x11 grid.
+      Moving one step in a given orientation is then a constant shift,
+      which is what makes the bitboards of BitBoard.py cheap.
+"""
+
+dimension = 11
+
+# orientations, in the same order as Board.disp
+# the opposite of direction d is always d ^ 1
+DIRECTIONS = ("E", "W", "NE", "SW", "NW", "SE")
+DIRECTION_INDEX = {name: i for i, name in enumerate(DIRECTIONS)}
+OFFSETS = ((0, 1), (0, -1), (-1, 0), (1, 0), (-1, -1), (1, 1))
+SHIFTS = tuple(dr * dimension + dc for dr, dc in OFFSETS)
+
+# the three lines of the board, given by their "positive" direction
+# (E: horizontal, SW: same 2d-list column, SE: same user digit)
+AXES = (DIRECTION_INDEX["E"], DIRECTION_INDEX["SW"], DIRECTION_INDEX["SE"])
+
+CELLS = tuple((r, c)
+              for r in range(1, dimension - 1)
+              for c in range(1, dimension - 1)
+              if abs(r - c) <= 4)
+NUM_CELLS = len(CELLS)
+CELL_INDEX = {spot: i for i, spot in enumerate(CELLS)}
+BITS = tuple(r * dimension + c for r, c in CELLS)
+CELL_OF_BIT = [-1] * (dimension * dimension)
+for _i, _b in enumerate(BITS):
+    CELL_OF_BIT[_b] = _i
+
+# neighbor and line tables over the padded grid, indexed [d][r][c]
+#   NEIGHBORS: next spot in direction d (None outside the grid)
+#   RAYS: every spot ahead in direction d, up to the first dead spot
+#   LINES2, LINES3: the 2 and 3 spots line starting at (r, c) in
+#   direction d, or None if it leaves the board
+NEIGHBORS = tuple(
+    tuple(tuple((r + dr, c + dc)
+                if 0 <= r + dr < dimension and 0 <= c + dc < dimension
+                else None
+                for c in range(dimension))
+          for r in range(dimension))
+    for dr, dc in OFFSETS
+)
+
+
+def _ray(r, c, d) -> tuple:
+    """Spots ahead of (r, c) in direction d, up to the first dead one."""
+    ray = []
+    spot = NEIGHBORS[d][r][c]
+    while spot is not None:
+        ray.append(spot)
+        if spot not in CELL_INDEX:
+            break
+        spot = NEIGHBORS[d][spot[0]][spot[1]]
+    return tuple(ray)
+
+
+def _line(r, c, d, n):
+    """The n spots line starting at (r, c) in direction d, if playable."""
+    dr, dc = OFFSETS[d]
+    line = tuple((r + i * dr, c + i * dc) for i in range(n))
+    return line if all(spot in CELL_INDEX for spot in line) else None
+
+
+RAYS = tuple(
+    tuple(tuple(_ray(r, c, d) for c in range(dimension))
+          for r in range(dimension))
+    for d in range(len(DIRECTIONS))
+)
+LINES2, LINES3 = (
+    tuple(
+        tuple(tuple(_line(r, c, d, n) for c in range(dimension))
+              for r in range(dimension))
+        for d in range(len(DIRECTIONS))
+    )
+    for n in (2, 3)
+)
+
+# masks over the padded grid
+FULL = (1 << (dimension * dimension)) - 1
+PLAYABLE = sum(1 << b for b in BITS)
+DEAD = FULL & ~PLAYABLE
+
+# distance of each cell to the center spot E5 (0..4), and the rings
+# of cells at each distance as masks
+CENTER = (dimension // 2, dimension // 2)
+CENTER_DISTANCE = tuple(max(abs(r - CENTER[0]), abs(c - CENTER[1]),
+                            abs(r - c))
+                        for r, c in CELLS)
+RINGS = tuple(sum(1 << b for b, k in zip(BITS, CENTER_DISTANCE) if k == n)
+              for n in range(5))
+
+
+def opposite(direction) -> int:
+    """Return the index of the direction opposite to the given one.
+
+    Parameter
+    ---------
+    direction: int (positional)
+        Index of a direction in DIRECTIONS
+
+    Return
+    ------
+    opposite: int
+        Index of the opposite direction
+    """
+    return direction ^ 1
+
+
+def to_coords(cell) -> str:
+    """Return the user coordinates (i.e. "G5") of a given cell.
+
+    Parameter
+    ---------
+    cell: int (positional)
+        Cell index (0..60)
+
+    Return
+    ------
+    coords: string
+        Coordinates of the cell on the hexagonal board
+    """
+    r, c = CELLS[cell]
+    return f"{chr(ord('A') + r - 1)}{c - r + 5}"
+
+
+def from_coords(coords) -> int:
+    """Return the cell index of given user coordinates (i.e. "G5").
+
+    This is the inverse of to_coords and follows Board.to_2d_list.
+
+    Parameter
+    ---------
+    coords: string (positional)
+        Coordinates of a spot on the hexagonal board
+
+    Return
+    ------
+    cell: int
+        Cell index (0..60). Raises KeyError if the spot is not playable.
+    """
+    r, c = coords.upper()
+    n_r = ord(r) - ord("A") + 1
+    n_c = int(c) + n_r - 5
+    return CELL_INDEX[(n_r, n_c)]
@@ -0,0 +1,275 @@
+# -------------------- #
+#   Abalone Lazy SMP   #
+# -------------------- #
+
+"""Parallel alpha-beta search sharing one transposition table (Lazy SMP).
+
+Every process runs the ordinary Engine search on the same root position
+for the same time budget. Nothing but the transposition table is
+shared: it lives in a multiprocessing.shared_memory block that each
+process maps, and entries are read and written without any lock (a
+torn entry fails the XOR check of TranspositionTable.probe and is
+treated as a miss). The helpers start their iterative deepening at
+staggered depths (1 to START_DEPTHS), so that they fill the table with
+results the main search reuses and the processes spread over different
+subtrees.
+
+The main search runs in the current process; the result of the deepest
+completed iteration is played, the main search winning ties. The helpers
+are given a deadline HELPER_MARGIN seconds before the main one, counted
+from the request, so that their results are waiting when it returns;
+the results still missing at the main deadline are not waited for, and
+a helper that died is started again.
+
+    with ParallelEngine(time_limit=2.0, workers=4) as engine:
+        move = engine.search(position, color)
+"""
+
+import os
+import time
+from multiprocessing import Pipe, Process
+from multiprocessing.shared_memory import SharedMemory
+
+import Moves
+from BitBoard import BitBoard
+from Engine import Engine
+from TranspositionTable import TranspositionTable, table_bytes
+
+# the helpers stop this long before the main search, in seconds
+HELPER_MARGIN = 0.05
+# first depths of the helpers, in turn (the main search starts at 1)
+START_DEPTHS = 3
+
+
+def _helper(name, tt_size_mb, max_depth, first_depth, conn):
+    """Entry point of a helper process.
+
+    Parameters
+    ----------
+    name: string (positional)
+        Name of the shared memory block holding the table
+    tt_size_mb: float (positional)
+        Size of the table, in MB
+    max_depth: int (positional)
+        Maximum depth of the iterative deepening
+    first_depth: int (positional)
+        Depth of the first iteration
+    conn: Connection (positional)
+        Receives (number, red, green, color, deadline) requests,
+        deadline being a time.time() value, None to stop, and sends
+        back (number, move, depth, score, nodes)
+    """
+    shm = SharedMemory(name)
+    tt = TranspositionTable(tt_size_mb, shm.buf)
+    engine = Engine(max_depth=max_depth, tt=tt)
+    try:
+        while True:
+            request = conn.recv()
+            if request is None:
+                break
+            number, red, green, color, deadline = request
+            # the time spent in the pipe counts
+            engine.time_limit = max(0.0, deadline - time.time())
+            move = engine.search(BitBoard(red, green), color, first_depth)
+            conn.send((number, move, engine.depth, engine.score,
+                       engine.nodes))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        tt.table.release()
+        shm.close()
+        conn.close()
+
+
+class ParallelEngine():
+    """
+    A computer player running the Engine search in several processes.
+
+    The helper processes and the shared table are created at the first
+    search and kept between moves, like the table of Engine.
+
+    Attributes
+    ----------
+    time_limit: float
+        Wall-clock budget per move, in seconds
+    workers: int
+        Number of searching processes, the current one included (1
+        searches in the current process only)
+    tt_size_mb: float
+        Size of the shared transposition table, in MB
+    engine: Engine
+        Main search, run in the current process
+    nodes: int
+        Number of nodes visited by the last search, in every process
+    depth: int
+        Depth of the result played at the last search
+    score: int
+        Score of the result played at the last search
+
+    Methods
+    -------
+    get_move(board, color) -> tuple
+        Choose a move for a Board, in the form returned by Board.ask_move
+    search(position, color) -> int
+        Choose a move for a BitBoard position
+    close()
+        Shut the helper processes down and free the shared table
+    """
+
+    def __init__(self, time_limit=1.0, workers=None, max_depth=64,
+                 tt_size_mb=64):
+        """Constructor.
+
+        Parameters
+        ----------
+        time_limit: float
+            Wall-clock budget per move, in seconds
+        workers: int
+            Number of searching processes, defaults to the number of
+            cores
+        max_depth: int
+            Maximum depth of the iterative deepening
+        tt_size_mb: float
+            Size of the shared transposition table, in MB
+        """
+        self.time_limit = time_limit
+        self.workers = workers or os.cpu_count() or 1
+        self.max_depth = max_depth
+        self.tt_size_mb = tt_size_mb
+        self.engine = None
+        self.shm = None
+        self.helpers = []
+        self.requests = 0
+        self.nodes = 0
+        self.depth = 0
+        self.score = 0
+
+    def _start(self) -> None:
+        """Create the shared table and start the helper processes."""
+        if self.workers == 1:
+            self.engine = Engine(max_depth=self.max_depth,
+                                 tt_size_mb=self.tt_size_mb)
+            return
+        self.shm = SharedMemory(create=True,
+                                size=table_bytes(self.tt_size_mb))
+        tt = TranspositionTable(self.tt_size_mb, self.shm.buf)
+        self.engine = Engine(max_depth=self.max_depth, tt=tt)
+        self.helpers = [self._spawn(i) for i in range(1, self.workers)]
+
+    def _spawn(self, i) -> tuple:
+        """Start the helper process number i (1 to workers - 1)."""
+        conn, child_conn = Pipe()
+        process = Process(target=_helper, daemon=True,
+                          args=(self.shm.name, self.tt_size_mb,
+                                self.max_depth, 1 + i % START_DEPTHS,
+                                child_conn))
+        process.start()
+        child_conn.close()
+        return process, conn
+
+    def _restart(self, i) -> None:
+        """Replace the helper number i, which died."""
+        process, conn = self.helpers[i - 1]
+        conn.close()
+        process.join(1.0)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+        self.helpers[i - 1] = self._spawn(i)
+
+    def _result(self, conn, timeout):
+        """Result of the last request from a helper.
+
+        Results of earlier requests, given up at their deadline, are
+        skipped. None if the result is not there within timeout seconds.
+        """
+        deadline = time.perf_counter() + timeout
+        while conn.poll(max(0.0, deadline - time.perf_counter())):
+            result = conn.recv()
+            if result[0] == self.requests:
+                return result
+        return None
+
+    def get_move(self, board, color) -> tuple:
+        """Choose a move for a Board (see Engine.get_move)."""
+        move = self.search(BitBoard.from_board(board), color)
+        return Moves.to_user_data(move)
+
+    def search(self, position, color) -> int:
+        """Choose a move for a position.
+
+        Parameters
+        ----------
+        position: BitBoard (positional)
+            Current position
+        color: int (positional)
+            Color of the side to move
+
+        Return
+        ------
+        move: int
+            Move of the deepest completed search (see Moves), 0 if there
+            is no legal move
+        """
+        start = time.perf_counter()
+        if self.engine is None:
+            self._start()
+        self.requests += 1
+        # the budget counts from the call, starting the helpers included
+        remaining = start + self.time_limit - time.perf_counter()
+        deadline = time.time() + remaining - HELPER_MARGIN
+        request = (self.requests, position.red, position.green, color,
+                   deadline)
+        dead = set()
+        for i, (_, conn) in enumerate(self.helpers, 1):
+            try:
+                conn.send(request)
+            except OSError:
+                dead.add(i)
+        self.engine.time_limit = max(
+            0.0, start + self.time_limit - time.perf_counter())
+        move = self.engine.search(position, color)
+        best = (self.engine.depth, move, self.engine.score)
+        self.nodes = self.engine.nodes
+        for i, (_, conn) in enumerate(self.helpers, 1):
+            if i in dead:
+                continue
+            try:
+                result = self._result(
+                    conn, start + self.time_limit - time.perf_counter())
+            except (EOFError, OSError):
+                dead.add(i)
+                continue
+            if result is None:
+                continue  # late: the main search does not wait
+            _, h_move, h_depth, h_score, h_nodes = result
+            self.nodes += h_nodes
+            if h_depth > best[0] and h_move:
+                best = (h_depth, h_move, h_score)
+        for i in sorted(dead):
+            self._restart(i)
+        self.depth, move, self.score = best
+        return move
+
+    def close(self) -> None:
+        """Shut the helper processes down and free the shared table."""
+        for process, conn in self.helpers:
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+            process.join()
+            conn.close()
+        self.helpers = []
+        if self.shm is not None:
+            self.engine.tt.table.release()
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+        self.engine = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,280 @@
+# -------------------- #
+#     Abalone MCTS     #
+# -------------------- #
+
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import Moves
+from BitBoard import BitBoard, popcount
+from Evaluation import MARBLE_WEIGHT, evaluate
+from Rules import LOSING_COUNT
+
+EXPLORATION = 1.4
+ROLLOUT_DEPTH = 30
+
+
+class Node():
+    """
+    A node of the search tree.
+
+    Attributes
+    ----------
+    position: BitBoard
+        Position of the node
+    color: int
+        Color of the side to move
+    move: int
+        Move leading to this node (0 for the root)
+    parent: Node
+        Parent node (None for the root)
+    children: list
+        Expanded children
+    untried: list
+        Legal moves not expanded yet
+    visits: int
+        Number of playouts through this node
+    wins: float
+        Sum of the playout results for the player who moved into it
+    """
+    __slots__ = ("position", "color", "move", "parent", "children",
+                 "untried", "visits", "wins")
+
+    def __init__(self, position, color, move=0, parent=None):
+        self.position = position
+        self.color = color
+        self.move = move
+        self.parent = parent
+        self.children = []
+        self.untried = ([] if winner(position) else
+                        position.generate_moves(color))
+        self.visits = 0
+        self.wins = 0.0
+
+    def select(self):
+        """Return the child with the best UCT value."""
+        log_n = math.log(self.visits)
+        return max(self.children,
+                   key=lambda n: n.wins / n.visits
+                   + EXPLORATION * math.sqrt(log_n / n.visits))
+
+
+def winner(position) -> int:
+    """Return the winning color of a position, 0 if the game goes on."""
+    if popcount(position.green) <= LOSING_COUNT:
+        return 2
+    if popcount(position.red) <= LOSING_COUNT:
+        return 3
+    return 0
+
+
+def rollout(position, color, rng) -> float:
+    """Play random moves from a position.
+
+    The playout stops when the game is over or after ROLLOUT_DEPTH
+    plies, in which case the position is scored by the static
+    evaluation squashed into [0, 1].
+
+    Parameters
+    ----------
+    position: BitBoard (positional)
+        Starting position
+    color: int (positional)
+        Color of the side to move
+    rng: random.Random (positional)
+        Random generator of the worker
+
+    Return
+    ------
+    result: float
+        1 if color wins, 0 if it loses
+    """
+    to_move = color
+    for _ in range(ROLLOUT_DEPTH):
+        won = winner(position)
+        if won:
+            return 1.0 if won == color else 0.0
+        moves = position.generate_moves(to_move)
+        if not moves:
+            break
+        position = position.apply(rng.choice(moves), to_move)
+        to_move = 5 - to_move
+
+    won = winner(position)
+    if won:
+        return 1.0 if won == color else 0.0
+    score = evaluate(position, color) / MARBLE_WEIGHT
+    return 1.0 / (1.0 + math.exp(-score))
+
+
+def uct_search(position, color, time_limit, max_playouts=None,
+               seed=None) -> dict:
+    """Grow a UCT tree from a position.
+
+    This is what each worker runs (root parallelism): the trees are
+    independent and only their root statistics are merged.
+
+    Parameters
+    ----------
+    position: BitBoard (positional)
+        Root position
+    color: int (positional)
+        Color of the side to move
+    time_limit: float (positional)
+        Search time, in seconds
+    max_playouts: int
+        Stops earlier after this number of playouts
+    seed: int
+        Seed of the random generator
+
+    Return
+    ------
+    stats: dict
+        dict of key:value pairs move:(visits, wins) for the root moves
+    """
+    rng = random.Random(seed)
+    deadline = time.perf_counter() + time_limit
+    root = Node(position, color)
+    # decisive move: no need to sample a game that is already won
+    for move in root.untried:
+        if winner(position.apply(move, color)) == color:
+            return {move: (1, 1.0)}
+    playouts = 0
+    while max_playouts is None or playouts < max_playouts:
+        if not playouts & 15 and time.perf_counter() > deadline:
+            break
+        playouts += 1
+
+        # selection
+        node = root
+        while not node.untried and node.children:
+            node = node.select()
+        # expansion
+        if node.untried:
+            move = node.untried.pop(rng.randrange(len(node.untried)))
+            child = Node(node.position.apply(move, node.color),
+                         5 - node.color, move, node)
+            node.children.append(child)
+            node = child
+        # simulation, then backpropagation: the result is seen from the
+        # side to move, a node stores it for the player who moved into it
+        result = rollout(node.position, node.color, rng)
+        while node is not None:
+            node.visits += 1
+            node.wins += 1.0 - result
+            result = 1.0 - result
+            node = node.parent
+
+    return {child.move: (child.visits, child.wins)
+            for child in root.children}
+
+
+def _search_worker(red, green, color, time_limit, max_playouts, seed):
+    """Entry point of a worker process (bitboards are sent as ints)."""
+    return uct_search(BitBoard(red, green), color, time_limit,
+                      max_playouts, seed)
+
+
+class MCTSPlayer():
+    """
+    A computer player using Monte Carlo Tree Search.
+
+    Each move, one UCT tree per worker process is grown from the current
+    position for the time budget (root parallelism). The visit counts
+    of the root moves are then summed, and the most visited move is
+    played. The process pool is kept between moves.
+
+    Attributes
+    ----------
+    time_limit: float
+        Wall-clock budget per move, in seconds
+    workers: int
+        Number of worker processes (1 searches in the current process)
+    max_playouts: int
+        Playouts per worker and per move, None for no limit
+    playouts: int
+        Number of playouts of the last search
+
+    Methods
+    -------
+    get_move(board, color) -> tuple
+        Choose a move for a Board, in the form returned by Board.ask_move
+    search(position, color) -> int
+        Choose a move for a BitBoard position
+    close()
+        Shut the worker processes down
+    """
+
+    def __init__(self, time_limit=1.0, workers=None, max_playouts=None,
+                 seed=None):
+        """Constructor.
+
+        Parameters
+        ----------
+        time_limit: float
+            Wall-clock budget per move, in seconds
+        workers: int
+            Number of worker processes, defaults to the number of cores
+        max_playouts: int
+            Playouts per worker and per move, None for no limit
+        seed: int
+            Seed of the random generators, for reproducible searches
+        """
+        self.time_limit = time_limit
+        self.workers = workers or os.cpu_count() or 1
+        self.max_playouts = max_playouts
+        self.rng = random.Random(seed)
+        self.playouts = 0
+        self.pool = None
+
+    def get_move(self, board, color) -> tuple:
+        """Choose a move for a Board (see Engine.get_move)."""
+        move = self.search(BitBoard.from_board(board), color)
+        return Moves.to_user_data(move)
+
+    def search(self, position, color) -> int:
+        """Choose a move for a position.
+
+        Parameters
+        ----------
+        position: BitBoard (positional)
+            Current position
+        color: int (positional)
+            Color of the side to move
+
+        Return
+        ------
+        move: int
+            Most visited root move (see Moves), 0 if there is none
+        """
+        seeds = [self.rng.getrandbits(32) for _ in range(self.workers)]
+        if self.workers == 1:
+            results = [uct_search(position, color, self.time_limit,
+                                  self.max_playouts, seeds[0])]
+        else:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(self.workers)
+            futures = [self.pool.submit(_search_worker,
+                                        position.red, position.green, color,
+                                        self.time_limit, self.max_playouts,
+                                        seed)
+                       for seed in seeds]
+            results = [future.result() for future in futures]
+
+        visits = {}
+        for stats in results:
+            for move, (n, _) in stats.items():
+                visits[move] = visits.get(move, 0) + n
+        self.playouts = sum(visits.values())
+        if not visits:
+            return 0
+        return max(visits, key=visits.get)
+
+    def close(self):
+        """Shut the worker processes down."""
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
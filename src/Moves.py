@@ -0,0 +1,123 @@
+# -------------------- #
+#    Abalone Moves     #
+# -------------------- #
+
+"""Compact move encoding.
+
+A move is a plain int that fits on 13 bits:
+
+    bits 0-5   cell index of the origin marble (0..60)
+    bits 6-8   direction index (see Geometry.DIRECTIONS)
+    bits 9-10  group size
+    bits 11-12 axis index of the group (see Geometry.AXES)
+
+A group size of 1 is a push (Board.push_move): the origin marble pushes
+the whole line ahead of it, sumitos included. A group size of 2 or 3 is
+a broadside move (Board.free_move) of the marbles starting at the origin
+and following the given axis.
+"""
+
+from Geometry import (AXES, CELLS, CELL_INDEX, DIRECTIONS, DIRECTION_INDEX,
+                      OFFSETS, from_coords, to_coords)
+
+
+def encode(cell, direction, size=1, axis=0) -> int:
+    """Pack a move into an int.
+
+    Parameters
+    ----------
+    cell: int
+        Cell index of the origin marble
+    direction: int
+        Index of the orientation
+    size: int
+        1 for a push, 2 or 3 for a broadside move
+    axis: int
+        Index in Geometry.AXES of the line followed by the group
+
+    Return
+    ------
+    move: int
+        The encoded move
+    """
+    return cell | direction << 6 | size << 9 | axis << 11
+
+
+def decode(move) -> tuple:
+    """Unpack a move into (cell, direction, size, axis)."""
+    return move & 63, move >> 6 & 7, move >> 9 & 3, move >> 11 & 3
+
+
+def group_cells(move) -> tuple:
+    """Return the cell indexes of the marbles selected by a move.
+
+    For a push, only the origin marble is returned (as the user would
+    type it), the other marbles of the line being found by the push.
+    """
+    cell, _, size, axis = decode(move)
+    r, c = CELLS[cell]
+    dr, dc = OFFSETS[AXES[axis]]
+    return tuple(CELL_INDEX[(r + i * dr, c + i * dc)] for i in range(size))
+
+
+def to_user_data(move) -> tuple:
+    """Convert a move into the inputs of Board.update_board.
+
+    Parameter
+    ---------
+    move: int (positional)
+        Encoded move
+
+    Return
+    ------
+    user_data: tuple of strings
+        Marbles to move (i.e. ("C5", "C6", "C7"))
+    orientation: string
+        Orientation of the move (i.e. "SE")
+    """
+    user_data = tuple(to_coords(cell) for cell in group_cells(move))
+    return user_data, DIRECTIONS[move >> 6 & 7]
+
+
+def from_user_data(user_data, orientation) -> int:
+    """Convert the inputs of Board.update_board into a move.
+
+    The marbles of a group can be given in any order.
+    Raises KeyError or ValueError if the group is not a line of
+    2 or 3 adjacent spots.
+
+    Parameters
+    ----------
+    user_data: tuple of strings (positional)
+        Marbles to move
+    orientation: string (positional)
+        Orientation of the move
+
+    Return
+    ------
+    move: int
+        Encoded move
+    """
+    direction = DIRECTION_INDEX[orientation.upper()]
+    cells = sorted(from_coords(e) for e in user_data)
+    if len(cells) == 1:
+        return encode(cells[0], direction)
+    if len(cells) > 3:
+        raise ValueError(f"Too many marbles: {user_data}")
+
+    # the origin is the first cell in row-major order, which is also
+    # the first one along any of the three positive axes
+    for axis in range(len(AXES)):
+        move = encode(cells[0], direction, len(cells), axis)
+        try:
+            if sorted(group_cells(move)) == cells:
+                return move
+        except KeyError:
+            continue
+    raise ValueError(f"Not a line of marbles: {user_data}")
+
+
+def to_string(move) -> str:
+    """Return a readable form of a move (i.e. "C5C6C7 SE")."""
+    user_data, orientation = to_user_data(move)
+    return f"{''.join(user_data)} {orientation}"
@@ -0,0 +1,213 @@
+# -------------------- #
+#   Abalone Notation   #
+# -------------------- #
+
+"""Position notation and binary codec.
+
+Text notation (FEN-like): the rows A to I separated by "/", each row
+listed from its lowest to its highest coordinate digit, followed by the
+side to move. "r" and "g" stand for red and green marbles, and a digit
+for a run of empty spots. The standard position is:
+
+    rrrrr/rrrrrr/2rrr2/8/9/8/2ggg2/gggggg/ggggg r
+
+Binary codec: the 61 spots are the digits of a base-3 number (0 empty,
+1 red, 2 green), cell index 0 being the least significant digit. The
+number is doubled, the side to move added (0 red, 1 green), and the
+whole packed little-endian on 13 bytes. The marble counts of
+Board.marbles are the number of marbles on the board, so both forms
+hold the whole state of a game.
+
+Both directions work on BitBoard, which converts from and to
+Board.board (BitBoard.from_list, BitBoard.to_list).
+"""
+
+from functools import lru_cache
+
+from BitBoard import BitBoard
+from Geometry import BITS, CELL_OF_BIT, CELLS, NUM_CELLS, dimension
+
+SIDES = {2: "r", 3: "g"}
+SIDE_COLORS = {"r": 2, "g": 3}
+PACKED_SIZE = 13
+
+# bit index of the spots of each row, from left to right
+ROWS = tuple(tuple(b for (r, _), b in zip(CELLS, BITS) if r == row)
+             for row in range(1, dimension - 1))
+ROW_MASKS = tuple(sum(1 << b for b in bits) for bits in ROWS)
+POW3 = tuple(3 ** i for i in range(NUM_CELLS))
+# cells are decoded by chunks of CHUNK digits
+CHUNK = 5
+_LIMIT = 2 * 3 ** NUM_CELLS
+
+
+def _chunk_tables(k) -> tuple:
+    """Red and green bits of every value of the k-th chunk of digits."""
+    cells = range(k * CHUNK, min((k + 1) * CHUNK, NUM_CELLS))
+    red, green = [], []
+    for value in range(3 ** CHUNK):
+        r_bits = g_bits = 0
+        for cell in cells:
+            value, digit = divmod(value, 3)
+            if digit == 1:
+                r_bits |= 1 << BITS[cell]
+            elif digit == 2:
+                g_bits |= 1 << BITS[cell]
+        red.append(r_bits)
+        green.append(g_bits)
+    return red, green
+
+
+CHUNKS = tuple(_chunk_tables(k) for k in range(-(-NUM_CELLS // CHUNK)))
+
+
+# binary codec
+# -------------------------------------------------------------------------
+
+def pack(position, color) -> bytes:
+    """Pack a position into PACKED_SIZE bytes.
+
+    Parameters
+    ----------
+    position: BitBoard (positional)
+        Position to pack
+    color: int (positional)
+        Color of the side to move
+
+    Return
+    ------
+    data: bytes
+        Packed position
+    """
+    n = 0
+    for bits, digit in ((position.red, 1), (position.green, 2)):
+        while bits:
+            low = bits & -bits
+            n += digit * POW3[CELL_OF_BIT[low.bit_length() - 1]]
+            bits ^= low
+    return (2 * n + (color == 3)).to_bytes(PACKED_SIZE, "little")
+
+
+def unpack(data) -> tuple:
+    """Unpack a position packed by pack.
+
+    Parameter
+    ---------
+    data: bytes (positional)
+        Packed position
+
+    Return
+    ------
+    position: BitBoard
+        Unpacked position
+    color: int
+        Color of the side to move
+    """
+    if len(data) != PACKED_SIZE:
+        raise ValueError(f"Packed positions are {PACKED_SIZE} bytes long")
+    n = int.from_bytes(data, "little")
+    if n >= _LIMIT:
+        raise ValueError("Invalid packed position")
+    n, side = divmod(n, 2)
+    red = green = 0
+    for red_table, green_table in CHUNKS:
+        n, value = divmod(n, 3 ** CHUNK)
+        red |= red_table[value]
+        green |= green_table[value]
+    return BitBoard(red, green), 3 if side else 2
+
+
+# text notation
+# -------------------------------------------------------------------------
+
+@lru_cache(maxsize=1 << 16)
+def _row_to_text(row, red, green) -> str:
+    """Notation of a row, red and green being bitboards of its marbles."""
+    text, empty = [], 0
+    for b in ROWS[row]:
+        if red >> b & 1 or green >> b & 1:
+            if empty:
+                text.append(str(empty))
+                empty = 0
+            text.append("r" if red >> b & 1 else "g")
+        else:
+            empty += 1
+    if empty:
+        text.append(str(empty))
+    return "".join(text)
+
+
+@lru_cache(maxsize=1 << 16)
+def _row_from_text(row, text) -> tuple:
+    """Red and green bitboards of a row given in notation."""
+    red = green = 0
+    bits = iter(ROWS[row])
+    try:
+        for char in text:
+            if char.isdigit():
+                for _ in range(int(char)):
+                    next(bits)
+            elif char == "r":
+                red |= 1 << next(bits)
+            elif char == "g":
+                green |= 1 << next(bits)
+            else:
+                raise ValueError(f"Invalid character in notation: {char}")
+    except StopIteration:
+        raise ValueError(f"Row {'ABCDEFGHI'[row]} is too long") from None
+    if next(bits, None) is not None:
+        raise ValueError(f"Row {'ABCDEFGHI'[row]} is too short")
+    return red, green
+
+
+def to_text(position, color) -> str:
+    """Write a position in text notation.
+
+    Parameters
+    ----------
+    position: BitBoard (positional)
+        Position to write
+    color: int (positional)
+        Color of the side to move
+
+    Return
+    ------
+    text: string
+        Notation of the position (i.e. "rrrrr/.../ggggg r")
+    """
+    rows = []
+    for row, mask in enumerate(ROW_MASKS):
+        rows.append(_row_to_text(row, position.red & mask,
+                                 position.green & mask))
+    return "/".join(rows) + " " + SIDES[color]
+
+
+def from_text(text) -> tuple:
+    """Read a position written in text notation.
+
+    Parameter
+    ---------
+    text: string (positional)
+        Notation of the position
+
+    Return
+    ------
+    position: BitBoard
+        Position read
+    color: int
+        Color of the side to move
+    """
+    try:
+        rows, side = text.split()
+        color = SIDE_COLORS[side]
+    except (ValueError, KeyError):
+        raise ValueError(f"Invalid notation: {text!r}") from None
+    rows = rows.split("/")
+    if len(rows) != len(ROWS):
+        raise ValueError(f"Expected {len(ROWS)} rows: {text!r}")
+    red = green = 0
+    for row, row_text in enumerate(rows):
+        r_bits, g_bits = _row_from_text(row, row_text)
+        red |= r_bits
+        green |= g_bits
+    return BitBoard(red, green), color
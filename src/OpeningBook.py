@@ -0,0 +1,216 @@
+# -------------------- #
+# Abalone Opening Book #
+# -------------------- #
+
+"""Opening book built from recorded games.
+
+The book is a file of fixed-size entries sorted by position key:
+
+    header    magic b"ABOK", version byte, number of entries (uint32)
+    entries   key (uint64), move (uint16), games, wins, draws (uint32)
+
+The key is Symmetry.canonical_key of the position, and the move is given
+in the canonical frame, so the 12 symmetric variants of a position and
+the color swap share their entries. Statistics are seen from the side to
+move. The file is opened with mmap and searched by binary search: a
+lookup copies nothing but the entries it reads, and every process using
+the same book shares its pages.
+
+    python OpeningBook.py games.abr --output book.bin --plies 20
+"""
+
+import argparse
+import mmap
+import random
+import struct
+
+from GameRecord import read_games, replay
+from Symmetry import INVERSE, canonical, map_move
+from Zobrist import hash_bitboard
+
+MAGIC = b"ABOK"
+VERSION = 1
+HEADER = struct.Struct("<4sBI")
+ENTRY = struct.Struct("<QHIII")
+KEY = struct.Struct("<Q")
+
+
+def build(records, output, plies=20, min_games=2) -> int:
+    """Build a book from game records.
+
+    Parameters
+    ----------
+    records: iterable of strings (positional)
+        Paths of the record files (see GameRecord)
+    output: string (positional)
+        Path of the book
+    plies: int
+        Number of moves of each game entered in the book
+    min_games: int
+        Moves played in fewer games are left out
+
+    Return
+    ------
+    entries: int
+        Number of entries written
+    """
+    stats = {}
+    for path in records:
+        for first, winner, moves in read_games(path):
+            for ply, (position, color, move) in enumerate(
+                    replay(first, moves)):
+                if ply >= plies:
+                    break
+                canon, s, _ = canonical(position, color)
+                key = (hash_bitboard(canon, 2), map_move(move, s))
+                games, wins, draws = stats.get(key, (0, 0, 0))
+                stats[key] = (games + 1, wins + (winner == color),
+                              draws + (winner == 0))
+
+    entries = sorted((key, move, *counts)
+                     for (key, move), counts in stats.items()
+                     if counts[0] >= min_games)
+    with open(output, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(entries)))
+        for entry in entries:
+            f.write(ENTRY.pack(*entry))
+    return len(entries)
+
+
+class OpeningBook():
+    """
+    Read-only opening book mapped in memory.
+
+    Attributes
+    ----------
+    path: string
+        Path of the book
+    size: int
+        Number of entries
+
+    Methods
+    -------
+    lookup(position, color) -> list
+        Statistics of the moves of a position
+    choose(position, color) -> int
+        Pick a book move, 0 if the position is not in the book
+    close()
+        Unmap the file
+    """
+
+    def __init__(self, path, min_games=1, temperature=0.0, seed=None):
+        """Constructor.
+
+        Parameters
+        ----------
+        path: string (positional)
+            Path of a book written by build
+        min_games: int
+            choose ignores moves played in fewer games
+        temperature: float
+            0 to always play the best scoring move, otherwise moves are
+            drawn with a probability proportional to games ** (1 / t)
+        seed: int
+            Seed of the random generator used with a temperature
+        """
+        self.path = path
+        self.min_games = min_games
+        self.temperature = temperature
+        self.rng = random.Random(seed)
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.map) < HEADER.size:
+            raise ValueError(f"{path}: not an opening book")
+        magic, version, self.size = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not an opening book")
+        if len(self.map) != HEADER.size + self.size * ENTRY.size:
+            raise ValueError(f"{path}: truncated opening book")
+
+    def _find(self, key) -> int:
+        """Index of the first entry whose key is >= key."""
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if KEY.unpack_from(self.map,
+                               HEADER.size + mid * ENTRY.size)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def lookup(self, position, color) -> list:
+        """Statistics of the book moves of a position.
+
+        Parameters
+        ----------
+        position: BitBoard (positional)
+            Current position
+        color: int (positional)
+            Color of the side to move
+
+        Return
+        ------
+        moves: list
+            (move, games, wins, draws) tuples, the moves being given in
+            the frame of position
+        """
+        canon, s, _ = canonical(position, color)
+        key = hash_bitboard(canon, 2)
+        moves = []
+        i = self._find(key)
+        while i < self.size:
+            entry = ENTRY.unpack_from(self.map, HEADER.size + i * ENTRY.size)
+            if entry[0] != key:
+                break
+            moves.append((map_move(entry[1], INVERSE[s]),) + entry[2:])
+            i += 1
+        return moves
+
+    def choose(self, position, color) -> int:
+        """Pick a book move.
+
+        Moves that are not legal in position (hash collisions) are
+        ignored.
+
+        Return
+        ------
+        move: int
+            Encoded move (see Moves), 0 if the position is not in the book
+        """
+        legal = set(position.generate_moves(color))
+        moves = [m for m in self.lookup(position, color)
+                 if m[1] >= self.min_games and m[0] in legal]
+        if not moves:
+            return 0
+        if self.temperature > 0:
+            weights = [games ** (1 / self.temperature)
+                       for _, games, _, _ in moves]
+            return self.rng.choices(moves, weights)[0][0]
+        return max(moves, key=lambda m: ((m[2] + 0.5 * m[3]) / m[1],
+                                         m[1]))[0]
+
+    def close(self) -> None:
+        """Unmap the file."""
+        self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build an opening book")
+    parser.add_argument("records", nargs="+", help="game record files")
+    parser.add_argument("--output", default="book.bin")
+    parser.add_argument("--plies", type=int, default=20)
+    parser.add_argument("--min-games", type=int, default=2)
+    args = parser.parse_args()
+    n = build(args.records, args.output, args.plies, args.min_games)
+    print(f"{n} entries written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
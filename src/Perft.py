@@ -0,0 +1,172 @@
+# -------------------- #
+#    Abalone Perft     #
+# -------------------- #
+
+"""Move generation benchmark.
+
+perft counts the leaves of the game tree to a given depth. Pinned node
+counts check the move generator and the move application at the same
+time, and the nodes/sec it reports measure the speed of the rules core.
+
+    python Perft.py --depth 3
+    python Perft.py --depth 2 --position belgian_daisy --board
+"""
+
+import argparse
+import time
+
+import Moves
+import Rules
+from BitBoard import BitBoard, popcount
+from Board import Board
+from Geometry import (AXES, BITS, CELLS, DIRECTIONS, LINES2, LINES3,
+                      from_coords)
+
+# tricky positions, given as (red marbles, green marbles, side to move)
+POSITIONS = {
+    "start": None,
+    # a popular tournament opening, with the marbles in contact on both wings
+    "belgian_daisy": (
+        "I1 I2 H1 H2 H3 G2 G3 A8 A9 B7 B8 B9 C7 C8",
+        "I4 I5 H4 H5 H6 G5 G6 A5 A6 B4 B5 B6 C4 C5",
+        2,
+    ),
+    # lines of 2 and 3 marbles facing each other: 2-1, 3-1, 3-2 sumitos,
+    # pushes blocked by a friend behind the enemy, 4 marbles in line
+    "sumito": (
+        "D4 D5 D6 E4 E5 E6 E7 F4 C6 C7 G3 G4 H3 B6",
+        "D7 D8 E3 E8 F5 F6 F7 G5 G6 C8 B8 E2 H4 A9",
+        2,
+    ),
+    # marbles on the edge: ejections and suicides, one marble
+    # away from the end of the game
+    "edge": (
+        "A5 A6 B5 B6 C3 D3 E2 F2 G2",
+        "A7 B4 C4 D2 E1 F1 G1 H1 I1",
+        3,
+    ),
+}
+
+
+def position(name) -> tuple:
+    """Return the BitBoard and the side to move of a named position."""
+    if POSITIONS[name] is None:
+        return BitBoard.start(), 2
+    red, green, color = POSITIONS[name]
+    bits = [sum(1 << BITS[from_coords(e)] for e in marbles.split())
+            for marbles in (red, green)]
+    return BitBoard(*bits), color
+
+
+def perft(position, color, depth) -> int:
+    """Count the leaves of the game tree (BitBoard version).
+
+    Positions where the game is over are leaves, whatever the depth.
+
+    Parameters
+    ----------
+    position: BitBoard (positional)
+        Root position
+    color: int (positional)
+        Color of the side to move
+    depth: int (positional)
+        Depth of the tree
+
+    Return
+    ------
+    nodes: int
+        Number of leaves
+    """
+    moves = position.generate_moves(color)
+    if depth <= 1:
+        return len(moves) if depth == 1 else 1
+    enemy = 5 - color
+    nodes = 0
+    for move in moves:
+        child = position.apply(move, color)
+        if (popcount(child.red) <= Rules.LOSING_COUNT
+                or popcount(child.green) <= Rules.LOSING_COUNT):
+            nodes += 1
+        else:
+            nodes += perft(child, enemy, depth - 1)
+    return nodes
+
+
+def candidate_moves(board, color) -> list:
+    """List the moves worth trying on a Board, legal or not.
+
+    Every push of a friendly marble and every broadside move of a
+    friendly line of 2 or 3 marbles. This does not use the BitBoard
+    generator, so that perft_board checks Board and Rules on their own.
+    """
+    moves = []
+    for cell, (r, c) in enumerate(CELLS):
+        if board.board[r][c] != color:
+            continue
+        for d in range(len(DIRECTIONS)):
+            moves.append(Moves.encode(cell, d))
+        for axis, a in enumerate(AXES):
+            for size, lines in ((2, LINES2), (3, LINES3)):
+                spots = lines[a][r][c]
+                if spots is None or any(board.board[s_r][s_c] != color
+                                        for s_r, s_c in spots):
+                    continue
+                for d in range(len(DIRECTIONS)):
+                    if d >> 1 != a >> 1:
+                        moves.append(Moves.encode(cell, d, size, axis))
+    return moves
+
+
+def perft_board(board, color, depth) -> int:
+    """Count the leaves of the game tree (Board version).
+
+    Same count as perft, walking the tree on a single Board with
+    make_move and unmake_move, the legal moves being the candidates
+    accepted by make_move.
+    """
+    if depth == 0:
+        return 1
+    enemy = board.enemy(color)
+    nodes = 0
+    for move in candidate_moves(board, color):
+        if board.make_move(move) is None:
+            continue
+        if depth == 1 or Rules.winner(board.marbles):
+            nodes += 1
+        else:
+            nodes += perft_board(board, enemy, depth - 1)
+        board.unmake_move()
+    return nodes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Abalone perft")
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--position", choices=tuple(POSITIONS),
+                        help="position to search, all of them by default")
+    parser.add_argument("--board", action="store_true",
+                        help="use Board.make_move instead of BitBoard")
+    args = parser.parse_args()
+
+    names = [args.position] if args.position else list(POSITIONS)
+    for name in names:
+        root, color = position(name)
+        print(name)
+        for depth in range(1, args.depth + 1):
+            start = time.perf_counter()
+            if args.board:
+                tB = Board(color)
+                tB.board = root.to_list()
+                tB.marbles = root.marbles
+                tB.hash = tB.compute_hash(color)
+                tB.position_score = tB.compute_position_score()
+                nodes = perft_board(tB, color, depth)
+            else:
+                nodes = perft(root, color, depth)
+            elapsed = time.perf_counter() - start
+            print(f"  depth {depth}: {nodes:>12} nodes "
+                  f"{elapsed:8.2f} s {nodes / max(elapsed, 1e-9):>12.0f} n/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# -------------------- #
+#     Abalone Play     #
+# -------------------- #
+
+"""Games in the terminal, against a human or a computer.
+
+Board only holds the rules and the display: the engines are chosen and
+loaded here.
+
+    python Play.py --computer green --time 2
+"""
+
+import argparse
+import random
+import re
+
+import Rules
+from BitBoard import BitBoard
+from Board import Board
+from Engine import Engine
+from LazySMP import ParallelEngine
+from MCTS import MCTSPlayer
+from OpeningBook import OpeningBook
+from UserMessages import info_messages
+
+
+def play_again() -> bool:
+    """Ask the user if he wants to keep playing.
+
+    Parameters
+    ----------
+    None
+
+    Return
+    ------
+    True if the user wants to play again, False otherwise
+    """
+    while True:
+        play_game = input('Play again (y/n)? : ')
+        if re.search(r'^[yn]$', play_game, re.IGNORECASE) is None:
+            print('Please enter \'y\', \'Y\', \'n\' or \'N\'')
+            continue
+        if re.search(r'^y{1}$', play_game, re.IGNORECASE):
+            play_again = True
+        elif re.search(r'^n{1}$', play_game, re.IGNORECASE):
+            play_again = False
+        break
+    return play_again
+
+def main(computer=None, time_limit=1.0, engine="alphabeta",
+         book=None, ponder=False, max_plies=None, repetitions=None) -> None:
+    """Play games in the terminal.
+
+    Parameters
+    ----------
+    computer: int
+        Color played by the computer (2: red, 3: green), None for
+        a player versus player game
+    time_limit: float
+        Time budget of the computer per move, in seconds
+    engine: string
+        "alphabeta" (Engine), "smp" (ParallelEngine) or "mcts"
+        (MCTSPlayer), the last two using every core
+    book: string
+        Path of an opening book used by the alpha-beta search
+    ponder: bool
+        True for the alpha-beta search to think on the player's time
+        (see Engine.ponder)
+    max_plies: int
+        A game is a draw after this number of moves, None for no limit
+    repetitions: int
+        A game is a draw when a position occurs this many times, None
+        for no limit
+
+    A human plays every game, so nothing is adjudicated unless asked:
+    the draws by repetition and length are meant for the games between
+    engines (see Tournament).
+    """
+    if not computer:
+        player = None
+    elif engine == "mcts":
+        player = MCTSPlayer(time_limit)
+    elif engine == "smp":
+        player = ParallelEngine(time_limit)
+    else:
+        player = Engine(time_limit,
+                        book=OpeningBook(book) if book else None)
+    # only the alpha-beta search ponders
+    ponder = ponder and isinstance(player, Engine)
+
+    adjudicator = Rules.Adjudicator(max_plies, repetitions)
+    while True:
+        color = random.choice((2, 3))
+        B = Board(color)
+        game_over = False
+        adjudicator.reset(B.hash)
+        while not game_over:
+            if color == computer:
+                print(B)
+                user_data, orientation = player.get_move(B, color)
+                color_word = "Red" if color == 2 else "Green"
+                print(Board.to_color(
+                    f"{color_word} (computer) plays "
+                    f"{''.join(user_data)} {orientation}",
+                    color_word.lower()))
+            else:
+                user_data, orientation = B.ask_move(color)
+            marbles = B.marbles[2] + B.marbles[3]
+            valid_move = B.update_board(user_data, orientation, color)
+            game_over = B.check_win()
+            if not valid_move:
+                continue
+            if not game_over and adjudicator.record(
+                    B.hash, B.marbles[2] + B.marbles[3] < marbles):
+                info_messages("INFO_DRAW")
+                game_over = True
+            color = B.enemy(color)
+            if ponder and color != computer and not game_over:
+                player.ponder(BitBoard.from_board(B), color)
+        if ponder:
+            player.stop_pondering()
+        if play_again():
+            continue
+        else:
+            print("Bye...")
+            break
+    if engine in ("mcts", "smp") and player is not None:
+        player.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Abalone in command line")
+    parser.add_argument("--computer", choices=("red", "green"),
+                        help="color played by the computer")
+    parser.add_argument("--time", type=float, default=1.0,
+                        help="computer time per move, in seconds")
+    parser.add_argument("--engine", choices=("alphabeta", "smp", "mcts"),
+                        default="alphabeta", help="computer search")
+    parser.add_argument("--book", help="opening book (see OpeningBook.py)")
+    parser.add_argument("--ponder", action="store_true",
+                        help="alpha-beta search on the player's time")
+    parser.add_argument("--max-plies", type=int,
+                        help="draw after this number of moves (no limit "
+                             "by default)")
+    parser.add_argument("--repetitions", type=int,
+                        help="draw when a position occurs this many times "
+                             "(no limit by default)")
+    args = parser.parse_args()
+    computer = {"red": 2, "green": 3}.get(args.computer)
+    main(computer, args.time, args.engine, args.book, args.ponder,
+         args.max_plies, args.repetitions)
@@ -0,0 +1,317 @@
+# -------------------- #
+#   Abalone Renderer   #
+# -------------------- #
+
+"""Incremental terminal renderer, to watch games ply after ply.
+
+The board is drawn once, then each move only rewrites the cells that
+changed: the cursor is moved up to each of them with ANSI escape codes,
+the glyph is written, and the cursor goes back below the board. The
+colored glyphs and labels are built once per mode, so a redraw is a few
+escape sequences and cached strings (about 20 bytes per changed cell,
+instead of the whole board).
+
+Nothing else may be printed between two updates, otherwise the cursor
+moves miss their cells: call invalidate to have the next update draw
+the whole board again. When the output is not a terminal, every update
+draws the whole board, without escape codes.
+
+    python Renderer.py --engine-a alphabeta:0.1 --engine-b random
+    python Renderer.py --replay games.abr --game 3 --no-color
+"""
+
+import argparse
+import os
+import sys
+import time
+from functools import lru_cache
+
+from termcolor import colored
+
+import Moves
+import Rules
+from BitBoard import BitBoard
+from Board import Board
+from GameRecord import read_games
+from Geometry import CELLS, dimension
+
+ROWS = dimension - 2
+# frame: the dead-zone line, the rows A to I, then the numbers line
+HEIGHT = ROWS + 2
+# plain glyph of each Board.board value (dead, empty, red, green)
+SYMBOLS = (" ", "o", "#", "x")
+SYMBOL_COLORS = (None, "white", "red", "green")
+
+
+def _indent(row) -> int:
+    """Spaces before the letter of a row (1 to 9), as in Board.__str__."""
+    return 1 + abs(row - (ROWS + 1) // 2)
+
+
+def _layout() -> dict:
+    """Frame line and column of every spot (r, c) of the board."""
+    positions = {}
+    columns = {}
+    for r, c in CELLS:
+        k = columns.get(r, 0)
+        columns[r] = k + 1
+        positions[(r, c)] = (r, _indent(r) + 2 + 2 * k)
+    return positions
+
+
+# (line, column) of each spot in the frame, line 0 being the dead zone
+POSITIONS = _layout()
+
+
+@lru_cache(maxsize=None)
+def glyphs(color) -> tuple:
+    """Strings of the frame, built once per mode.
+
+    Parameter
+    ---------
+    color: bool (positional)
+        False for plain characters
+
+    Return
+    ------
+    marbles: tuple
+        Glyph of each Board.board value
+    letters: tuple
+        Labels of the rows A to I
+    numbers: tuple
+        Labels 1 to 9 of the diagonals
+    """
+    def paint(text, name):
+        if not color or name is None:
+            return text
+        return colored(text, name, attrs=["bold"])
+    marbles = tuple(paint(s, n) for s, n in zip(SYMBOLS, SYMBOL_COLORS))
+    letters = tuple(paint(chr(ord("A") + i), "cyan") for i in range(ROWS))
+    numbers = tuple(paint(str(i + 1), "yellow") for i in range(ROWS))
+    return marbles, letters, numbers
+
+
+class Renderer():
+    """
+    Terminal view of a Board, redrawing the changed cells only.
+
+    Attributes
+    ----------
+    stream: file
+        Output of the renderer
+    color: bool
+        False for plain characters (no color codes)
+    incremental: bool
+        False to draw the whole board at every update (no cursor moves)
+    shown: dict
+        Values of the spots as drawn on the screen, {} before the first
+        draw
+
+    Methods
+    -------
+    draw(board)
+        Draw the whole board
+    update(board, spots=None) -> int
+        Redraw the spots that changed
+    invalidate()
+        Have the next update draw the whole board
+    """
+
+    def __init__(self, stream=None, color=None, incremental=None):
+        """Constructor.
+
+        Parameters
+        ----------
+        stream: file
+            Output, sys.stdout by default
+        color: bool
+            Colored glyphs, by default if the output is a terminal and
+            the NO_COLOR environment variable is not set
+        incremental: bool
+            Redraw the changed cells only, by default if the output is
+            a terminal
+        """
+        self.stream = sys.stdout if stream is None else stream
+        tty = hasattr(self.stream, "isatty") and self.stream.isatty()
+        if color is None:
+            color = tty and "NO_COLOR" not in os.environ
+        self.color = color
+        self.incremental = tty if incremental is None else incremental
+        self.shown = {}
+        self._dead = None
+
+    def _dead_line(self, marbles) -> str:
+        return f"Dead zone  red: {14 - marbles[2]}  green: {14 - marbles[3]}"
+
+    def draw(self, board) -> None:
+        """Draw the whole board below the cursor.
+
+        Parameter
+        ---------
+        board: Board (positional)
+            Game to show
+        """
+        marbles, letters, numbers = glyphs(self.color)
+        lines = [self._dead_line(board.marbles)]
+        for row in range(1, ROWS + 1):
+            cells = " ".join(marbles[v] for v in board.board[row] if v)
+            line = f"{' ' * _indent(row)}{letters[row - 1]} {cells}"
+            if row > (ROWS + 1) // 2:
+                line += f" {numbers[ROWS + (ROWS + 1) // 2 - row]}"
+            lines.append(line)
+        lines.append(" " * (_indent(ROWS) + 2)
+                     + " ".join(numbers[:(ROWS + 1) // 2]))
+        self.stream.write("\n".join(lines) + "\n")
+        self.stream.flush()
+        self.shown = {spot: board.board[spot[0]][spot[1]]
+                      for spot in POSITIONS}
+        self._dead = dict(board.marbles)
+
+    def update(self, board, spots=None) -> int:
+        """Redraw the spots that changed since the last drawing.
+
+        Parameters
+        ----------
+        board: Board (positional)
+            Game shown, after one or more moves
+        spots: iterable
+            Spots (r, c) changed by the moves (i.e. the keys of
+            new_data), None to compare every spot
+
+        Return
+        ------
+        redrawn: int
+            Number of cells rewritten, -1 if the whole board was drawn
+        """
+        if not self.shown or not self.incremental:
+            self.draw(board)
+            return -1
+        marbles = glyphs(self.color)[0]
+        out = []
+        for spot in POSITIONS if spots is None else spots:
+            if spot not in POSITIONS:
+                continue  # dead zone
+            value = board.board[spot[0]][spot[1]]
+            if self.shown[spot] == value:
+                continue
+            self.shown[spot] = value
+            line, column = POSITIONS[spot]
+            up = HEIGHT - line
+            out.append(f"\x1b[{up}A\x1b[{column + 1}G{marbles[value]}"
+                       f"\x1b[{up}B\r")
+        redrawn = len(out)
+        if board.marbles != self._dead:
+            self._dead = dict(board.marbles)
+            out.append(f"\x1b[{HEIGHT}A\r\x1b[2K"
+                       f"{self._dead_line(board.marbles)}\x1b[{HEIGHT}B\r")
+        if out:
+            self.stream.write("".join(out))
+            self.stream.flush()
+        return redrawn
+
+    def invalidate(self) -> None:
+        """Have the next update draw the whole board (below the cursor)."""
+        self.shown = {}
+
+
+def watch(renderer, first, players=None, moves=None, delay=0.0,
+          max_plies=400, repetitions=3) -> int:
+    """Show a game, from engines or from recorded moves.
+
+    Parameters
+    ----------
+    renderer: Renderer (positional)
+        View of the game
+    first: int (positional)
+        Color moving first
+    players: dict
+        Player of each color, with a search(position, color) method
+    moves: iterable of ints
+        Recorded moves, played to their end instead of asking players
+    delay: float
+        Pause after each move, in seconds
+    max_plies, repetitions: int
+        Draw adjudication of the games between players (see
+        Rules.Adjudicator), a record being replayed as it was played
+
+    Return
+    ------
+    winner: int
+        Winning color, 0 for a draw
+
+    Raises ValueError on a move that is not legal for the side to move
+    (i.e. in a corrupt record), the game being shown up to that move.
+    """
+    board = Board(first)
+    position = BitBoard.start()
+    color = first
+    if moves is not None:
+        moves = iter(moves)
+        adjudicator = Rules.Adjudicator(None, None)
+    else:
+        adjudicator = Rules.Adjudicator(max_plies, repetitions)
+    adjudicator.reset(board.hash)
+    renderer.draw(board)
+    while True:
+        if moves is not None:
+            move = next(moves, 0)
+        else:
+            move = players[color].search(position, color)
+        if not move:
+            return 0 if moves is not None else 5 - color
+        # Board.make_move would play the color of the origin marble
+        if move not in position.generate_moves(color):
+            raise ValueError(f"Illegal move after {adjudicator.plies} "
+                             f"plies: {Moves.to_string(move)}")
+        marbles = board.marbles[2] + board.marbles[3]
+        undo = board.make_move(move)
+        board.history.clear()
+        position = position.apply(move, color)
+        renderer.update(board, [(r, c) for r, c, _ in undo[3]])
+        winner = Rules.winner(board.marbles)
+        if winner:
+            return winner
+        if adjudicator.record(board.hash,
+                              board.marbles[2] + board.marbles[3] < marbles):
+            return 0
+        color = 5 - color
+        if delay:
+            time.sleep(delay)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Watch an Abalone game")
+    parser.add_argument("--engine-a", default="alphabeta:0.1",
+                        help="red player (see Tournament.make_player)")
+    parser.add_argument("--engine-b", default="random",
+                        help="green player")
+    parser.add_argument("--replay", help="game record file to replay")
+    parser.add_argument("--game", type=int, default=0,
+                        help="game of the record file to replay")
+    parser.add_argument("--delay", type=float, default=0.0)
+    parser.add_argument("--no-color", action="store_true")
+    args = parser.parse_args()
+
+    renderer = Renderer(color=False if args.no_color else None)
+    if args.replay:
+        for i, (first, recorded, moves) in enumerate(
+                read_games(args.replay)):
+            if i == args.game:
+                break
+        else:
+            parser.error(f"{args.replay}: no game {args.game}")
+        try:
+            winner = (watch(renderer, first, moves=moves, delay=args.delay)
+                      or recorded)
+        except ValueError as error:
+            sys.exit(f"{args.replay}: game {args.game}: {error}")
+    else:
+        from Tournament import make_player
+        players = {2: make_player(args.engine_a),
+                   3: make_player(args.engine_b)}
+        winner = watch(renderer, 2, players, delay=args.delay)
+    print({2: "Red wins", 3: "Green wins"}.get(winner, "Draw"))
+
+
+if __name__ == "__main__":
+    main()
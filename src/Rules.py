@@ -0,0 +1,240 @@
+# -------------------- #
+#    Abalone Rules     #
+# -------------------- #
+
+"""Silent rules core.
+
+Pure functions computing the outcome of a move on an 11x11 nested list
+(as Board.board). Nothing is printed and nothing is modified: each
+function returns a result code and the spots to update (new_data).
+Board turns the codes into messages for the interactive game.
+
+Adjudicator ends the games that would never end on their own (two
+passive players can shuffle their marbles forever): it keeps the hashes
+of the positions seen, and declares a draw when one of them comes back
+too often or when the game is too long.
+"""
+
+from Geometry import NEIGHBORS, RAYS
+
+DEAD, FREE = 0, 1
+
+# result codes: valid moves are >= 0, invalid ones < 0
+OK = 0
+SUICIDE = 1           # a friendly marble went into the dead zone
+EJECTION = 2          # an enemy marble was pushed into the dead zone
+TOO_MANY = -1         # more than 3 friendly marbles pushed
+ILLEGAL_SUMITO = -2   # not enough pushing marbles, or a friend blocking
+NOT_EMPTY = -3        # a free move towards an occupied spot
+
+# a player loses once 6 of his 14 marbles are out
+LOSING_COUNT = 14 - 6
+
+# draw reasons given by Adjudicator
+REPETITION = "repetition"
+MAX_PLIES = "max plies"
+
+
+def push(board, friend, r, c, direction) -> tuple:
+    """Push the line of marbles starting at a given spot.
+
+    At most 3 friendly marbles can be pushed, and a sumito needs
+    strictly more friends than enemies in line.
+
+    Parameters
+    ----------
+    board: list (positional)
+        Nested list of Board.board values
+    friend: int (positional)
+        Current player's color
+    r, c: int (positional)
+        Spot of the first marble in the 2d-list frame
+    direction: int (positional)
+        Index of the orientation (see Geometry.DIRECTIONS)
+
+    Return
+    ------
+    code: int
+        Result code
+    new_data: dict
+        dict of key:value pairs tuple:int where the tuples represent
+        the spots to update and their new value (empty if invalid)
+    """
+    enemy = 5 - friend
+    new_data = {(r, c): FREE}  # the first marble becomes empty
+    current_spot = board[r][c]
+    n_friends = 1 if current_spot == friend else 0
+    n_enemies = 1 if current_spot == enemy else 0
+
+    for n_r, n_c in RAYS[direction][r][c]:
+        if current_spot == FREE:
+            break
+        next_spot = board[n_r][n_c]
+        if next_spot == friend:
+            n_friends += 1
+        elif next_spot == enemy:
+            n_enemies += 1
+
+        if n_friends > 3:
+            return TOO_MANY, {}
+        # next spot is always friendly, except deadzone
+        if current_spot == friend:
+            if next_spot == DEAD:
+                return SUICIDE, new_data
+            new_data[(n_r, n_c)] = friend
+        # enemies can only be pushed into an empty spot or the deadzone
+        elif current_spot == enemy:
+            if next_spot == friend:
+                return ILLEGAL_SUMITO, {}
+            if next_spot == DEAD:
+                return EJECTION, new_data
+            new_data[(n_r, n_c)] = enemy
+        if n_enemies >= n_friends:
+            return ILLEGAL_SUMITO, {}
+
+        current_spot = next_spot
+
+    return OK, new_data
+
+
+def free(board, friend, spots, direction) -> tuple:
+    """Freely move a group of marbles in empty spots.
+
+    Each marble has to move into an empty spot, or into the dead
+    zone (which kills it).
+
+    Parameters
+    ----------
+    board: list (positional)
+        Nested list of Board.board values
+    friend: int (positional)
+        Current player's color
+    spots: iterable (positional)
+        Spots (r, c) of the marbles to move in the 2d-list frame
+    direction: int (positional)
+        Index of the orientation (see Geometry.DIRECTIONS)
+
+    Return
+    ------
+    code: int
+        Result code
+    new_data: dict
+        Spots to update and their new value (empty if invalid)
+    """
+    enemy = 5 - friend
+    neighbors = NEIGHBORS[direction]
+    code = OK
+    new_data = dict()
+
+    for r, c in spots:
+        n_r, n_c = neighbors[r][c]
+        next_spot = board[n_r][n_c]
+        if next_spot in (friend, enemy):
+            return NOT_EMPTY, {}
+        new_data[(r, c)] = FREE
+        if next_spot == FREE:
+            new_data[(n_r, n_c)] = friend
+        else:
+            code = SUICIDE
+
+    return code, new_data
+
+
+def winner(marbles) -> int:
+    """Return the winning color, 0 if the game goes on.
+
+    Parameter
+    ---------
+    marbles: dict (positional)
+        Number of marbles of each color still on the board
+
+    Return
+    ------
+    winner: int
+        2 (red), 3 (green) or 0
+    """
+    if marbles[3] <= LOSING_COUNT:
+        return 2
+    if marbles[2] <= LOSING_COUNT:
+        return 3
+    return 0
+
+
+class Adjudicator():
+    """
+    Draw adjudication of a game by repetition and by length.
+
+    The positions are given by their hash (see Zobrist), which has to
+    tell the side to move apart: Board.hash and the keys of the engines
+    do. A marble pushed off the board can never come back, so the
+    history is emptied after an ejection.
+
+    Attributes
+    ----------
+    max_plies: int
+        The game is a draw after this number of plies, None for no limit
+    repetitions: int
+        The game is a draw when a position occurs this many times, None
+        for no limit
+    plies: int
+        Number of plies recorded
+    history: dict
+        Number of occurrences of each position hash since the last
+        ejection
+
+    Methods
+    -------
+    reset(key=None)
+        Start a new game
+    record(key, ejection=False) -> str
+        Record the position reached by a move, and adjudicate
+    """
+
+    def __init__(self, max_plies=400, repetitions=3):
+        """Constructor.
+
+        Parameters
+        ----------
+        max_plies: int
+            The game is a draw after this number of plies, None for no
+            limit
+        repetitions: int
+            The game is a draw when a position occurs this many times,
+            None for no limit
+        """
+        self.max_plies = max_plies
+        self.repetitions = repetitions
+        self.plies = 0
+        self.history = {}
+
+    def reset(self, key=None) -> None:
+        """Start a new game, from the position of hash key if given."""
+        self.plies = 0
+        self.history = {} if key is None else {key: 1}
+
+    def record(self, key, ejection=False) -> str:
+        """Record the position reached by a move, and adjudicate.
+
+        Parameters
+        ----------
+        key: int (positional)
+            Hash of the position, side to move included
+        ejection: bool
+            True if the move pushed a marble off the board
+
+        Return
+        ------
+        draw: string
+            REPETITION or MAX_PLIES if the game is a draw, None if it
+            goes on
+        """
+        self.plies += 1
+        if ejection:
+            self.history.clear()
+        count = self.history.get(key, 0) + 1
+        self.history[key] = count
+        if self.repetitions and count >= self.repetitions:
+            return REPETITION
+        if self.max_plies and self.plies >= self.max_plies:
+            return MAX_PLIES
+        return None
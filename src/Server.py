@@ -0,0 +1,410 @@
+# -------------------- #
+#    Abalone Server    #
+# -------------------- #
+
+"""Game server hosting many games at once over TCP or a Unix socket.
+
+Every game is a Board driven by the messages of its two players instead
+of ask_move: the whole server is one asyncio event loop, and a game
+costs one Board and a few small objects. Moves are checked and played
+silently (Board.make_move), and games that go round in circles are
+adjudicated (see Rules.Adjudicator).
+
+The protocol is made of text lines, one command per line:
+
+    JOIN <game>              join (or open) the game of that name
+    MOVE <marbles> <orient>  play a move, i.e. "MOVE C5C6 SE" or
+                             "MOVE C5 C6 SE" (marbles A1..I9,
+                             orientations E, W, NE, NW, SE, SW)
+    BOARD                    ask for the position (see Notation)
+    LEAVE                    resign the current game
+    QUIT                     close the connection
+
+and the server answers with:
+
+    WAIT <game>                     waiting for an opponent
+    START <game> <color> <first>    game started: own color, first to move
+    MOVED <color> <marbles> <orient>  a move was played (sent to both)
+    BOARD <notation>                answer to BOARD
+    END <winner|draw> <reason>      end of the game (sent to both)
+    ERR <message>                   invalid command, nothing changed
+
+A client reads its own lines one at a time, so a fast client cannot
+queue unbounded work. The lines sent to a client go through a queue of
+MAX_PENDING lines. The answers to its own commands wait until it reads
+them, but nothing waits on another client: a client whose queue is
+full when its opponent plays has stopped reading, and it is dropped
+(it forfeits its game). A closing connection gets CLOSE_TIMEOUT seconds
+to send its last lines, then it is dropped.
+
+    python Server.py --port 7777
+    python Server.py --unix /tmp/abalone.sock
+"""
+
+import argparse
+import asyncio
+import random
+import re
+
+import Moves
+import Rules
+from BitBoard import BitBoard
+from Board import Board
+from Geometry import CELLS
+from Notation import to_text
+
+COLORS = {2: "red", 3: "green"}
+# lines queued for a client before the senders wait
+MAX_PENDING = 64
+# longest command line accepted, in bytes
+MAX_LINE = 256
+# time given to a closing connection to send its queued lines, in seconds
+CLOSE_TIMEOUT = 1.0
+MARBLES_EXPR = re.compile(r"^([A-I][1-9]){1,3}$", re.IGNORECASE)
+
+
+class Connection():
+    """
+    A connected client.
+
+    Attributes
+    ----------
+    writer: asyncio.StreamWriter
+        Socket of the client
+    queue: asyncio.Queue
+        Lines waiting to be sent, None closing the connection
+    game: Game
+        Game played, None between games
+    color: int
+        Color played in the game
+    closed: bool
+        True once the connection is closing, lines sent being dropped
+    """
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.queue = asyncio.Queue(MAX_PENDING)
+        self.game = None
+        self.color = 0
+        self.closed = False
+
+    async def send(self, line) -> None:
+        """Queue a line, waiting while the queue is full."""
+        if not self.closed:
+            await self.queue.put(line)
+
+    def post(self, line) -> None:
+        """Queue a line without waiting, dropping the client if it is full.
+
+        Used for the lines caused by other clients, which must not wait
+        on this one: the connection is aborted, and its handler then
+        ends its game and closes it.
+        """
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(line)
+        except asyncio.QueueFull:
+            self.closed = True
+            self.writer.transport.abort()
+
+    async def close(self, sender) -> None:
+        """Send the queued lines if the client reads them, then close.
+
+        Parameter
+        ---------
+        sender: asyncio.Task (positional)
+            Task running write_lines
+        """
+        self.closed = True
+        try:
+            self.queue.put_nowait(None)
+            await asyncio.wait_for(sender, CLOSE_TIMEOUT)
+            self.writer.close()
+            return
+        except (asyncio.QueueFull, asyncio.TimeoutError):
+            pass
+        # the client stopped reading: drop it without waiting
+        sender.cancel()
+        while not self.queue.empty():
+            # wakes up the senders waiting on the full queue
+            self.queue.get_nowait()
+        self.writer.transport.abort()
+
+    async def write_lines(self) -> None:
+        """Send the queued lines until None is queued.
+
+        Once the connection is lost, the lines are dropped, so that the
+        senders never wait on a dead client.
+        """
+        lost = False
+        while True:
+            line = await self.queue.get()
+            if line is None:
+                break
+            if lost:
+                continue
+            try:
+                self.writer.write(line.encode() + b"\n")
+                await self.writer.drain()
+            except ConnectionError:
+                lost = True
+
+
+class Game():
+    """
+    A game between two connections.
+
+    Attributes
+    ----------
+    name: string
+        Name given by the players
+    board: Board
+        Current position
+    players: dict
+        Connection of each color, {} until the second player joins
+    waiting: Connection
+        First player, until the second one joins
+    color: int
+        Color of the side to move
+    adjudicator: Rules.Adjudicator
+        Draw adjudication
+    """
+
+    def __init__(self, name, waiting, adjudicator):
+        self.name = name
+        self.board = Board()
+        self.players = {}
+        self.waiting = waiting
+        self.color = 0
+        self.adjudicator = adjudicator
+        self.adjudicator.reset(self.board.hash)
+
+
+class GameServer():
+    """
+    Server hosting the games.
+
+    Attributes
+    ----------
+    games: dict
+        Games waiting for a player or running, by name
+    connections: int
+        Number of clients connected
+    max_plies: int
+        Games are draws after this number of moves
+    repetitions: int
+        Games are draws when a position occurs this many times
+
+    Methods
+    -------
+    start(host="127.0.0.1", port=7777, path=None) -> asyncio.Server
+        Listen on a TCP port, or on a Unix socket if path is given
+    handle(reader, writer)
+        Serve one connection
+    """
+
+    def __init__(self, max_plies=400, repetitions=3, seed=None):
+        """Constructor.
+
+        Parameters
+        ----------
+        max_plies: int
+            Games are draws after this number of moves
+        repetitions: int
+            Games are draws when a position occurs this many times
+        seed: int
+            Seed of the colors draws
+        """
+        self.games = {}
+        self.connections = 0
+        self.max_plies = max_plies
+        self.repetitions = repetitions
+        self.rng = random.Random(seed)
+
+    async def start(self, host="127.0.0.1", port=7777, path=None):
+        """Listen for clients.
+
+        Parameters
+        ----------
+        host: string
+            Address of the TCP socket
+        port: int
+            Port of the TCP socket, 0 for any free port
+        path: string
+            Path of a Unix socket, used instead of TCP if given
+
+        Return
+        ------
+        server: asyncio.Server
+            Listening server (see asyncio.Server.serve_forever)
+        """
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle, path,
+                                                   limit=MAX_LINE)
+        return await asyncio.start_server(self.handle, host, port,
+                                          limit=MAX_LINE)
+
+    async def handle(self, reader, writer) -> None:
+        """Serve one connection until it is closed or sends QUIT."""
+        conn = Connection(writer)
+        sender = asyncio.create_task(conn.write_lines())
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    break  # line too long, or connection lost
+                if not line:
+                    break
+                command = line.decode(errors="replace").strip()
+                if command.upper() == "QUIT":
+                    break
+                await self.command(conn, command)
+        finally:
+            if conn.game is not None:
+                self.leave(conn, "forfeit")
+            await conn.close(sender)
+            self.connections -= 1
+
+    async def command(self, conn, command) -> None:
+        """Run one command of a client."""
+        name, _, args = command.partition(" ")
+        name = name.upper()
+        if name == "JOIN" and args.strip():
+            await self.join(conn, args.strip())
+        elif name == "MOVE":
+            await self.move(conn, args)
+        elif name == "BOARD":
+            game = conn.game
+            if game is None or not game.players:
+                await conn.send("ERR not playing")
+            else:
+                position = BitBoard.from_board(game.board)
+                await conn.send(f"BOARD {to_text(position, game.color)}")
+        elif name == "LEAVE":
+            if conn.game is None:
+                await conn.send("ERR not playing")
+            else:
+                self.leave(conn, "resign")
+        else:
+            await conn.send(f"ERR unknown command: {command[:32]}")
+
+    async def join(self, conn, name) -> None:
+        """Join a game, starting it if a player was waiting."""
+        if conn.game is not None:
+            await conn.send("ERR already in a game")
+            return
+        game = self.games.get(name)
+        if game is None:
+            adjudicator = Rules.Adjudicator(self.max_plies, self.repetitions)
+            self.games[name] = conn.game = Game(name, conn, adjudicator)
+            await conn.send(f"WAIT {name}")
+            return
+        if game.waiting is None:
+            await conn.send(f"ERR game {name} is full")
+            return
+
+        red, green = self.rng.sample((game.waiting, conn), 2)
+        game.players = {2: red, 3: green}
+        game.waiting = None
+        game.color = self.rng.choice((2, 3))
+        game.board = Board(game.color)
+        game.adjudicator.reset(game.board.hash)
+        conn.game = game
+        for color, player in game.players.items():
+            player.color = color
+            player.post(f"START {name} {COLORS[color]} {COLORS[game.color]}")
+
+    async def move(self, conn, args) -> None:
+        """Play a move of a client."""
+        game = conn.game
+        if game is None or not game.players:
+            await conn.send("ERR not playing")
+            return
+        if game.color != conn.color:
+            await conn.send("ERR not your turn")
+            return
+        fields = args.split()
+        marbles = "".join(fields[:-1])
+        if len(fields) < 2 or MARBLES_EXPR.match(marbles) is None:
+            await conn.send("ERR expected: MOVE <marbles> <orientation>")
+            return
+        user_data = tuple(marbles[i:i + 2].upper()
+                          for i in range(0, len(marbles), 2))
+        try:
+            move = Moves.from_user_data(user_data, fields[-1])
+        except (KeyError, ValueError):
+            await conn.send("ERR not a line of marbles or orientation")
+            return
+
+        board = game.board
+        r, c = CELLS[Moves.decode(move)[0]]
+        on_board = board.marbles[2] + board.marbles[3]
+        if board.board[r][c] != conn.color or board.make_move(move) is None:
+            await conn.send("ERR illegal move")
+            return
+        board.history.clear()
+        result = reason = None
+        winner = Rules.winner(board.marbles)
+        if winner:
+            result, reason = COLORS[winner], "ejections"
+        else:
+            reason = game.adjudicator.record(
+                board.hash, board.marbles[2] + board.marbles[3] < on_board)
+            if reason:
+                result = "draw"
+        game.color = 5 - game.color
+
+        for player in game.players.values():
+            player.post(f"MOVED {COLORS[conn.color]} "
+                        f"{Moves.to_string(move)}")
+        if result:
+            self.end(game, result, reason)
+
+    def leave(self, conn, reason) -> None:
+        """Leave the current game, which the opponent wins if started."""
+        game = conn.game
+        if not game.players:
+            # nobody joined yet
+            del self.games[game.name]
+            conn.game = None
+            return
+        self.end(game, COLORS[5 - conn.color], reason)
+
+    def end(self, game, result, reason) -> None:
+        """End a game and tell both players (once)."""
+        if self.games.get(game.name) is not game:
+            return  # already ended
+        del self.games[game.name]
+        for player in game.players.values():
+            if player.game is game:
+                player.game = None
+        for player in game.players.values():
+            player.post(f"END {result} {reason}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Abalone game server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--unix", help="path of a Unix socket to use")
+    parser.add_argument("--max-plies", type=int, default=400)
+    parser.add_argument("--repetitions", type=int, default=3)
+    args = parser.parse_args()
+
+    async def serve():
+        server = await GameServer(args.max_plies, args.repetitions).start(
+            args.host, args.port, args.unix)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
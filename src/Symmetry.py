@@ -0,0 +1,183 @@
+# -------------------- #
+#   Abalone Symmetry   #
+# -------------------- #
+
+"""Symmetries of the hexagonal board.
+
+The board is left unchanged by 12 transformations: the 6 rotations
+around the center spot E5, each followed or not by the reflection
+across the A5-I5 line. Around the center, a spot (r, c) has the offset
+(x, y) = (c - 5, r - 5), and:
+    - the rotation by 60 degrees is (x, y) -> (x - y, x)
+      (E -> SE -> SW -> W -> NW -> NE -> E)
+    - the reflection is (x, y) -> (y, x)  (E <-> SW, W <-> NE)
+Swapping the colors of the marbles along with the side to move is one
+more symmetry of the game.
+
+canonical maps a position to the representative of its class: the side
+to move is made red, then the smallest bitboards over the 12
+transformations are kept. Positions that only differ by a symmetry get
+the same canonical form and the same canonical_key, and map_move
+converts a move between the two frames.
+"""
+
+import Moves
+from BitBoard import BitBoard
+from Geometry import (AXES, BITS, CELL_INDEX, CELLS, NUM_CELLS, OFFSETS,
+                      opposite)
+from Zobrist import hash_bitboard
+
+NUM_SYMMETRIES = 12
+
+
+def _transform_offset(x, y, s) -> tuple:
+    """Apply symmetry s (see CELL_MAP) to an offset from the center."""
+    if s >= 6:
+        x, y = y, x
+    for _ in range(s % 6):
+        x, y = x - y, x
+    return x, y
+
+
+def _transform_spot(r, c, s) -> tuple:
+    """Apply symmetry s to a spot of the 2d-list frame."""
+    x, y = _transform_offset(c - 5, r - 5, s)
+    return y + 5, x + 5
+
+
+# symmetry s is the reflection (if s >= 6) followed by s % 6 rotations
+# CELL_MAP[s][cell]: image of a cell
+CELL_MAP = tuple(tuple(CELL_INDEX[_transform_spot(r, c, s)]
+                       for r, c in CELLS)
+                 for s in range(NUM_SYMMETRIES))
+# DIRECTION_MAP[s][d]: image of a direction
+DIRECTION_MAP = tuple(
+    tuple(OFFSETS.index(_transform_offset(dc, dr, s)[::-1])
+          for dr, dc in OFFSETS)
+    for s in range(NUM_SYMMETRIES))
+# INVERSE[s]: symmetry undoing s
+INVERSE = tuple(next(t for t in range(NUM_SYMMETRIES)
+                     if all(CELL_MAP[t][CELL_MAP[s][i]] == i
+                            for i in range(NUM_CELLS)))
+                for s in range(NUM_SYMMETRIES))
+
+
+def _bit_tables(s) -> tuple:
+    """Images of every byte of a bitboard under symmetry s.
+
+    BIT_TABLES[s][k][byte] is the image of the bits 8k..8k+7 set in
+    byte, so that a bitboard is transformed with one lookup per byte.
+    """
+    image = {b: BITS[CELL_MAP[s][i]] for i, b in enumerate(BITS)}
+    n_bytes = -(-(max(BITS) + 1) // 8)
+    tables = []
+    for k in range(n_bytes):
+        table = []
+        for byte in range(256):
+            bits = 0
+            for j in range(8):
+                if byte >> j & 1 and 8 * k + j in image:
+                    bits |= 1 << image[8 * k + j]
+            table.append(bits)
+        tables.append(tuple(table))
+    return tuple(tables)
+
+
+BIT_TABLES = tuple(_bit_tables(s) for s in range(NUM_SYMMETRIES))
+
+
+def _map_bits(bits, tables) -> int:
+    """Transform a bitboard with the byte tables of a symmetry."""
+    out = 0
+    for table in tables:
+        if not bits:
+            break
+        out |= table[bits & 255]
+        bits >>= 8
+    return out
+
+
+def transform(position, s) -> BitBoard:
+    """Apply a symmetry to a position.
+
+    Parameters
+    ----------
+    position: BitBoard (positional)
+        Position to transform
+    s: int (positional)
+        Index of the symmetry (0..11, 0 being the identity)
+
+    Return
+    ------
+    position: BitBoard
+        Transformed position
+    """
+    tables = BIT_TABLES[s]
+    return BitBoard(_map_bits(position.red, tables),
+                    _map_bits(position.green, tables))
+
+
+def map_move(move, s) -> int:
+    """Apply a symmetry to an encoded move (see Moves).
+
+    Parameters
+    ----------
+    move: int (positional)
+        Encoded move
+    s: int (positional)
+        Index of the symmetry
+
+    Return
+    ------
+    move: int
+        The same move in the transformed position
+    """
+    cell, direction, size, axis = Moves.decode(move)
+    direction = DIRECTION_MAP[s][direction]
+    if size == 1:
+        return Moves.encode(CELL_MAP[s][cell], direction)
+    group = Moves.group_cells(move)
+    line = DIRECTION_MAP[s][AXES[axis]]
+    if line in AXES:
+        origin = group[0]
+    else:
+        # the line now runs backwards: it starts at the other end
+        line, origin = opposite(line), group[-1]
+    return Moves.encode(CELL_MAP[s][origin], direction, size,
+                        AXES.index(line))
+
+
+def canonical(position, color) -> tuple:
+    """Map a position to the representative of its symmetry class.
+
+    Parameters
+    ----------
+    position: BitBoard (positional)
+        Position to map
+    color: int (positional)
+        Color of the side to move
+
+    Return
+    ------
+    position: BitBoard
+        Canonical position, red being the side to move
+    s: int
+        Symmetry applied (moves are mapped with map_move(move, s), and
+        back with map_move(move, INVERSE[s]))
+    swapped: bool
+        True if the colors were swapped (green was to move)
+    """
+    swapped = color == 3
+    red, green = ((position.green, position.red) if swapped
+                  else (position.red, position.green))
+    best, best_s = None, 0
+    for s, tables in enumerate(BIT_TABLES):
+        image = (_map_bits(red, tables), _map_bits(green, tables))
+        if best is None or image < best:
+            best, best_s = image, s
+    return BitBoard(*best), best_s, swapped
+
+
+def canonical_key(position, color) -> int:
+    """Zobrist hash of the canonical form of a position (see Zobrist)."""
+    return hash_bitboard(canonical(position, color)[0], 2)
@@ -0,0 +1,421 @@
+# -------------------- #
+#  Abalone Tournament  #
+# -------------------- #
+
+"""Headless engine-versus-engine tournament.
+
+Games are played by a pool of worker processes, and each finished game
+is appended as one JSON line to the output file as soon as it is known.
+Running the same command again skips the games already in the file, and
+games lost in a worker crash are played again in a fresh pool. The
+moves can also be saved in a binary record file (see GameRecord).
+
+    python Tournament.py --games 1000 --engine-a alphabeta:0.05 \\
+        --engine-b mcts:0.05 --output results.jsonl
+
+An engine is given as "name:seconds per move", name being alphabeta,
+mcts, greedy or random.
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import Rules
+from BitBoard import BitBoard, popcount
+from Board import Board
+from GameRecord import GameWriter
+from Engine import Engine
+from MCTS import MCTSPlayer
+from Zobrist import hash_bitboard, update_bitboard
+
+COLORS = {2: "red", 3: "green"}
+COLOR_CODES = {"red": 2, "green": 3}
+# a game that broke its pool this many times is given up
+MAX_ATTEMPTS = 3
+
+
+class RandomPlayer():
+    """A player choosing its moves at random, used as a baseline."""
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def search(self, position, color) -> int:
+        moves = position.generate_moves(color)
+        return self.rng.choice(moves) if moves else 0
+
+
+class GreedyPlayer():
+    """
+    A player choosing the move of best static evaluation, one ply deep.
+
+    The moves are tried on a Board with make_move and unmake_move, its
+    evaluation being updated from the changed spots only (see
+    Board.evaluate) instead of scanning the board after each move.
+    """
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        self.board = Board()
+
+    def search(self, position, color) -> int:
+        board = self.board
+        board.board = position.to_list()
+        board.marbles = position.marbles
+        board.hash = board.compute_hash(color)
+        board.position_score = board.compute_position_score()
+        best, best_moves = None, []
+        for move in position.generate_moves(color):
+            board.make_move(move)
+            score = board.evaluate(color)
+            board.unmake_move()
+            if best is None or score > best:
+                best, best_moves = score, [move]
+            elif score == best:
+                best_moves.append(move)
+        return self.rng.choice(best_moves) if best_moves else 0
+
+
+def make_player(spec, seed=None):
+    """Build a player from its description (i.e. "alphabeta:0.1").
+
+    Parameters
+    ----------
+    spec: string (positional)
+        "name:seconds per move", name being alphabeta, mcts, greedy
+        or random (the last two ignoring the time)
+    seed: int
+        Seed of the random generators of the player
+
+    Return
+    ------
+    player: object
+        Player with a search(position, color) method
+    """
+    name, _, time_limit = spec.partition(":")
+    time_limit = float(time_limit or 0.1)
+    if name == "alphabeta":
+        return Engine(time_limit, tt_size_mb=4)
+    if name == "mcts":
+        return MCTSPlayer(time_limit, workers=1, seed=seed)
+    if name == "greedy":
+        return GreedyPlayer(seed)
+    if name == "random":
+        return RandomPlayer(seed)
+    raise ValueError(f"Unknown engine: {spec}")
+
+
+def play_game(game, spec_a, spec_b, seed, max_plies=400,
+              repetitions=3) -> dict:
+    """Play one game between two engines.
+
+    Engine A plays red in even games and green in odd ones. The color
+    moving first is drawn at random, as in Play.main.
+
+    Parameters
+    ----------
+    game: int (positional)
+        Number of the game
+    spec_a, spec_b: string (positional)
+        Descriptions of the engines (see make_player)
+    seed: int (positional)
+        Seed of the game
+    max_plies: int
+        The game is a draw after this number of plies
+    repetitions: int
+        The game is a draw when a position occurs this many times
+
+    Return
+    ------
+    result: dict
+        Game record: engines, first color, winner, draw reason (see
+        Rules.Adjudicator), number of plies, marbles ejected, time per
+        move of each color, move ordering of the alpha-beta searches
+        (cutoffs, cutoffs by the first move tried and mean effective
+        branching factor, see Engine) and moves
+    """
+    rng = random.Random(seed)
+    specs = {2: spec_a, 3: spec_b} if game % 2 == 0 else {2: spec_b, 3: spec_a}
+    players = {color: make_player(spec, rng.getrandbits(32))
+               for color, spec in specs.items()}
+    position = BitBoard.start()
+    color = first = rng.choice((2, 3))
+    times = {2: [], 3: []}
+    ordering = {c: {"cutoffs": 0, "first_cutoffs": 0, "branching": []}
+                for c, player in players.items()
+                if isinstance(player, Engine)}
+    moves = []
+    plies = 0
+    winner = 0
+    draw = None
+    key = hash_bitboard(position, color)
+    adjudicator = Rules.Adjudicator(max_plies, repetitions)
+    adjudicator.reset(key)
+
+    while True:
+        start = time.perf_counter()
+        move = players[color].search(position, color)
+        times[color].append(time.perf_counter() - start)
+        if color in ordering:
+            stats, player = ordering[color], players[color]
+            stats["cutoffs"] += player.cutoffs
+            stats["first_cutoffs"] += player.first_cutoffs
+            if player.branching_factor:
+                stats["branching"].append(player.branching_factor)
+        new_position = position.apply(move, color) if move else None
+        if new_position is None:
+            # no legal move: the player loses
+            winner = 5 - color
+            break
+        key = update_bitboard(key, position, new_position)
+        ejection = (popcount(new_position.red | new_position.green)
+                    < popcount(position.red | position.green))
+        position = new_position
+        moves.append(move)
+        plies += 1
+        winner = Rules.winner(position.marbles)
+        if winner:
+            break
+        draw = adjudicator.record(key, ejection)
+        if draw:
+            break
+        color = 5 - color
+
+    marbles = position.marbles
+    return {
+        "game": game,
+        "seed": seed,
+        "red": specs[2],
+        "green": specs[3],
+        "first": COLORS[first],
+        "winner": COLORS.get(winner),
+        "winner_engine": None if not winner
+        else "a" if (winner == 2) == (game % 2 == 0) else "b",
+        "draw": draw,
+        "plies": plies,
+        "ejected": {COLORS[c]: 14 - marbles[c] for c in (2, 3)},
+        "time_per_move": {
+            COLORS[c]: {
+                "mean": sum(times[c]) / len(times[c]) if times[c] else 0.0,
+                "max": max(times[c], default=0.0),
+            }
+            for c in (2, 3)
+        },
+        "ordering": {
+            COLORS[c]: {
+                "cutoffs": stats["cutoffs"],
+                "first_cutoffs": stats["first_cutoffs"],
+                "branching_factor": (sum(stats["branching"])
+                                     / len(stats["branching"])
+                                     if stats["branching"] else 0.0),
+            }
+            for c, stats in ordering.items()
+        },
+        "moves": moves,
+    }
+
+
+def finished_games(output) -> set:
+    """Numbers of the games already written to the output file.
+
+    Games written as errors are not finished: they are played again.
+    """
+    done = set()
+    if os.path.exists(output):
+        with open(output) as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except ValueError:
+                    continue  # line cut by an interrupted run
+                if isinstance(result, dict) and "game" in result \
+                        and "error" not in result:
+                    done.add(result["game"])
+    return done
+
+
+def run(n_games, spec_a, spec_b, output, workers=None, seed=0,
+        max_plies=400, records=None, repetitions=3) -> list:
+    """Play a tournament in a pool of processes.
+
+    At most 2 games per worker are queued at once. If a worker dies,
+    the pool is rebuilt and the games it was running are played again
+    (MAX_ATTEMPTS times at most).
+
+    Parameters
+    ----------
+    n_games: int (positional)
+        Number of games
+    spec_a, spec_b: string (positional)
+        Descriptions of the engines (see make_player)
+    output: string (positional)
+        JSON lines file the results are appended to
+    workers: int
+        Number of worker processes, defaults to the number of cores
+    seed: int
+        Seed of the tournament, game i being played with seed + i
+    max_plies: int
+        The games are draws after this number of plies
+    records: string
+        Binary record file the moves are appended to (see GameRecord)
+    repetitions: int
+        The games are draws when a position occurs this many times
+
+    Return
+    ------
+    results: list
+        Results of the games played by this run
+    """
+    workers = workers or os.cpu_count() or 1
+    todo = [g for g in range(n_games) if g not in finished_games(output)]
+    todo.reverse()
+    attempts = {}
+    results = []
+    writer = GameWriter(records) if records else None
+
+    try:
+        cut = _cut_line(output)
+        with open(output, "a") as f:
+            if cut:
+                f.write("\n")
+            while todo:
+                pending = {}
+                pool = ProcessPoolExecutor(workers)
+                try:
+                    while todo or pending:
+                        while todo and len(pending) < 2 * workers:
+                            game = todo.pop()
+                            attempts[game] = attempts.get(game, 0) + 1
+                            future = pool.submit(
+                                play_game, game, spec_a, spec_b, seed + game,
+                                max_plies, repetitions)
+                            pending[future] = game
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            result = _result(future, pending[future])
+                            del pending[future]
+                            _write(f, result, results, writer)
+                except BrokenProcessPool:
+                    for future, game in pending.items():
+                        if future.done() and not isinstance(
+                                future.exception(), BrokenProcessPool):
+                            _write(f, _result(future, game), results, writer)
+                        elif attempts[game] < MAX_ATTEMPTS:
+                            todo.append(game)
+                        else:
+                            _write(f, {"game": game,
+                                       "error": "worker crashed"}, results)
+                finally:
+                    pool.shutdown(wait=False)
+    finally:
+        if writer is not None:
+            writer.close()
+    return results
+
+
+def _cut_line(output) -> bool:
+    """True if the output file ends with a line cut by an interrupted run."""
+    if not os.path.exists(output) or not os.path.getsize(output):
+        return False
+    with open(output, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) != b"\n"
+
+
+def _result(future, game) -> dict:
+    """Result of a finished game, or an error record if it raised.
+
+    BrokenProcessPool is raised again: the game has to be replayed.
+    """
+    try:
+        return future.result()
+    except BrokenProcessPool:
+        raise
+    except Exception as e:
+        return {"game": game, "error": repr(e)}
+
+
+def _write(f, result, results, writer=None):
+    """Append a result to the output files right away."""
+    moves = result.pop("moves", None)
+    if writer is not None and moves is not None:
+        writer.append(COLOR_CODES[result["first"]], moves,
+                      COLOR_CODES.get(result["winner"], 0))
+    f.write(json.dumps(result) + "\n")
+    f.flush()
+    results.append(result)
+
+
+def summary(results, spec_a, spec_b) -> str:
+    """Return the score of the tournament as a string.
+
+    The move ordering of the alpha-beta engines follows: share of the
+    cutoffs made by the first move tried, and mean effective branching
+    factor (see Engine.cutoff_rate and Engine.branching_factor).
+    """
+    games = [r for r in results if "error" not in r]
+    wins_a = sum(r["winner_engine"] == "a" for r in games)
+    wins_b = sum(r["winner_engine"] == "b" for r in games)
+    draws = sum(r["winner"] is None for r in games)
+    plies = sum(r["plies"] for r in games) / len(games) if games else 0
+    lines = [f"{spec_a}: {wins_a}  {spec_b}: {wins_b}  draws: {draws}  "
+             f"errors: {len(results) - len(games)}  "
+             f"mean length: {plies:.1f} plies"]
+    for engine, spec in (("a", spec_a), ("b", spec_b)):
+        cutoffs = first_cutoffs = 0
+        branching = []
+        for r in games:
+            # engine a plays red in even games
+            color = ("red" if (r["game"] % 2 == 0) == (engine == "a")
+                     else "green")
+            stats = r.get("ordering", {}).get(color)
+            if stats is None:
+                continue
+            cutoffs += stats["cutoffs"]
+            first_cutoffs += stats["first_cutoffs"]
+            if stats["branching_factor"]:
+                branching.append(stats["branching_factor"])
+        if cutoffs:
+            lines.append(
+                f"{spec} ({engine}): first move cutoffs "
+                f"{first_cutoffs / cutoffs:.1%}  branching factor "
+                f"{sum(branching) / len(branching) if branching else 0:.2f}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Abalone tournament")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--engine-a", default="alphabeta:0.1")
+    parser.add_argument("--engine-b", default="mcts:0.1")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--output", default="tournament.jsonl")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-plies", type=int, default=400)
+    parser.add_argument("--records", help="binary file to save the moves")
+    parser.add_argument("--repetitions", type=int, default=3,
+                        help="draw when a position occurs this many times")
+    args = parser.parse_args()
+
+    run(args.games, args.engine_a, args.engine_b, args.output,
+        args.workers, args.seed, args.max_plies, args.records,
+        args.repetitions)
+    results = {}
+    with open(args.output) as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue
+            # the last record of a game replaces its earlier errors
+            results[result["game"]] = result
+    print(summary(list(results.values()), args.engine_a, args.engine_b))
+
+
+if __name__ == "__main__":
+    main()
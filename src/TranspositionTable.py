@@ -0,0 +1,214 @@
+# -------------------- #
+#  Transposition Table #
+# -------------------- #
+
+from array import array
+
+# bound types
+EMPTY, EXACT, LOWER, UPPER = 0, 1, 2, 3
+
+# layout of the 64-bit data word of an entry
+_MOVE_BITS = 16
+_SCORE_BITS = 20
+_DEPTH_BITS = 8
+_BOUND_BITS = 2
+_SCORE_SHIFT = _MOVE_BITS
+_DEPTH_SHIFT = _SCORE_SHIFT + _SCORE_BITS
+_BOUND_SHIFT = _DEPTH_SHIFT + _DEPTH_BITS
+_AGE_SHIFT = _BOUND_SHIFT + _BOUND_BITS
+_SCORE_OFFSET = 1 << (_SCORE_BITS - 1)
+
+# a bucket holds 2 entries of 2 words (key ^ data, data)
+WORDS_PER_BUCKET = 4
+BYTES_PER_BUCKET = 8 * WORDS_PER_BUCKET
+
+MAX_SCORE = _SCORE_OFFSET - 1
+
+
+def pack(depth, score, bound, move, age=0) -> int:
+    """Pack an entry into a 64-bit data word.
+
+    Parameters
+    ----------
+    depth: int
+        Remaining depth of the search (0..255)
+    score: int
+        Score of the position, |score| <= MAX_SCORE
+    bound: int
+        EXACT, LOWER or UPPER
+    move: int
+        Best move found (see Moves), 0 if none
+    age: int
+        Generation of the search that stored the entry
+
+    Return
+    ------
+    data: int
+        The packed entry
+    """
+    return (move
+            | (score + _SCORE_OFFSET) << _SCORE_SHIFT
+            | depth << _DEPTH_SHIFT
+            | bound << _BOUND_SHIFT
+            | (age & 0xFF) << _AGE_SHIFT)
+
+
+def unpack(data) -> tuple:
+    """Unpack a data word into (depth, score, bound, move)."""
+    return (data >> _DEPTH_SHIFT & 0xFF,
+            (data >> _SCORE_SHIFT & 0xFFFFF) - _SCORE_OFFSET,
+            data >> _BOUND_SHIFT & 3,
+            data & 0xFFFF)
+
+
+def table_bytes(size_mb) -> int:
+    """Return the number of bytes used by a table of size_mb MB."""
+    n_buckets = max(1, int(size_mb * 2 ** 20) // BYTES_PER_BUCKET)
+    return BYTES_PER_BUCKET << (n_buckets.bit_length() - 1)
+
+
+class TranspositionTable():
+    """
+    A fixed-size hash table of search results keyed by position hash.
+
+    The whole table is one preallocated array of unsigned 64-bit words,
+    so its memory use never grows. It is split in buckets of two
+    entries: the first one is depth-preferred (only replaced by a
+    deeper search, or by any search once it is stale), the second one
+    is always replaced. An entry is stored as (key ^ data, data): a
+    lookup only succeeds if both words agree, which also detects
+    entries torn by concurrent writers.
+
+    The words can live in a buffer given by the caller, such as a
+    multiprocessing.shared_memory block: processes sharing the buffer
+    then share the table without any lock (see ParallelEngine).
+
+    Attributes
+    ----------
+    size: int
+        Number of buckets (a power of two)
+    table: array or memoryview
+        The 64-bit words of the table
+    age: int
+        Generation of the current search (see new_search)
+    hits, probes, stores: int
+        Usage counters
+
+    Methods
+    -------
+    probe(key) -> tuple
+        Look up a position
+    store(key, depth, score, bound, move)
+        Save the result of a search
+    new_search()
+        Start a new generation, making older entries replaceable
+    clear()
+        Empty the table
+    hashfull() -> float
+        Share of the depth-preferred slots in use
+    """
+
+    def __init__(self, size_mb=16, buffer=None):
+        """Constructor.
+
+        Parameters
+        ----------
+        size_mb: float
+            Memory used by the table, in MB (rounded down to a power of
+            two number of buckets)
+        buffer: writable buffer
+            Memory holding the table, of at least table_bytes(size_mb)
+            bytes. By default the table allocates its own array.
+        """
+        n_bytes = table_bytes(size_mb)
+        self.size = n_bytes // BYTES_PER_BUCKET
+        if buffer is None:
+            self.table = array("Q", bytes(n_bytes))
+        else:
+            view = memoryview(buffer).cast("B")
+            if len(view) < n_bytes:
+                raise ValueError(f"The buffer is smaller than {n_bytes} bytes")
+            self.table = view[:n_bytes].cast("Q")
+        self.age = 0
+        self.hits = self.probes = self.stores = 0
+
+    def probe(self, key):
+        """Look up a position.
+
+        Parameter
+        ---------
+        key: int (positional)
+            64-bit hash of the position
+
+        Return
+        ------
+        entry: tuple
+            (depth, score, bound, move), or None if the position is
+            not in the table
+        """
+        self.probes += 1
+        table = self.table
+        i = (key & (self.size - 1)) * WORDS_PER_BUCKET
+        for j in (i, i + 2):
+            data = table[j + 1]
+            if data and table[j] ^ data == key:
+                self.hits += 1
+                return unpack(data)
+        return None
+
+    def store(self, key, depth, score, bound, move=0):
+        """Save the result of a search.
+
+        The entry goes to the depth-preferred slot if that slot is
+        empty, stale, holds the same position or a shallower search.
+        Otherwise it goes to the always-replace slot.
+
+        Parameters
+        ----------
+        key: int
+            64-bit hash of the position
+        depth: int
+            Remaining depth of the search
+        score: int
+            Score of the position
+        bound: int
+            EXACT, LOWER or UPPER
+        move: int
+            Best move found, 0 if none
+        """
+        self.stores += 1
+        table = self.table
+        i = (key & (self.size - 1)) * WORDS_PER_BUCKET
+        data = pack(min(depth, 255),
+                    max(-MAX_SCORE, min(MAX_SCORE, score)),
+                    bound, move, self.age)
+        old = table[i + 1]
+        if (not old
+                or table[i] ^ old == key
+                or old >> _AGE_SHIFT != self.age & 0xFF
+                or depth >= old >> _DEPTH_SHIFT & 0xFF):
+            if not move and old and table[i] ^ old == key:
+                # keep the best move of a previous search of this position
+                data |= old & 0xFFFF
+            table[i] = key ^ data
+            table[i + 1] = data
+        else:
+            table[i + 2] = key ^ data
+            table[i + 3] = data
+
+    def new_search(self):
+        """Start a new generation: older entries become replaceable."""
+        self.age = (self.age + 1) & 0xFF
+
+    def clear(self):
+        """Empty the table (in place, as it may be shared)."""
+        self.table[:] = array("Q", bytes(BYTES_PER_BUCKET * self.size))
+        self.age = 0
+        self.hits = self.probes = self.stores = 0
+
+    def hashfull(self) -> float:
+        """Share of the depth-preferred slots in use (sampled)."""
+        sample = min(self.size, 1000)
+        used = sum(1 for b in range(sample)
+                   if self.table[b * WORDS_PER_BUCKET + 1])
+        return used / sample
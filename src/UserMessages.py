@@ -3,6 +3,8 @@
 # ---------------------- #
 from termcolor import colored
 
+import Rules
+
 def ask_messages(msg):
     """
     TODO
@@ -124,11 +126,32 @@ def info_messages(msg):
             "Green marbles win the game!",
             msg_color,
             attrs=["bold"]
+        ),
+        "INFO_DRAW": colored(
+            "It's a draw!",
+            msg_color,
+            attrs=["bold"]
         )
     }
     print(info_msgs[msg])
 
 
+def result_messages(code):
+    """Print the message matching a result code of Rules.
+
+    Nothing is printed for a plain valid move.
+    """
+    messages = {
+        Rules.SUICIDE: (info_messages, "INFO_SUICIDE"),
+        Rules.EJECTION: (info_messages, "INFO_KILL_ENEMY"),
+        Rules.TOO_MANY: (err_messages, "ERR_TOO_MUCH"),
+        Rules.ILLEGAL_SUMITO: (err_messages, "ERR_SUMITO"),
+        Rules.NOT_EMPTY: (err_messages, "ERR_EMPTY_SPOT"),
+    }
+    if code in messages:
+        print_message, msg = messages[code]
+        print_message(msg)
+
 
 if __name__ == "__main__":
     pass # test
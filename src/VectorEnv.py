@@ -0,0 +1,391 @@
+# -------------------- #
+#  Abalone Vector Env  #
+# -------------------- #
+
+"""Batched Abalone environments for reinforcement learning (requires NumPy).
+
+K games are held in one (K, 61) int8 array of Board.board values
+(1: empty, 2: red, 3: green, in cell index order), and every step plays
+one move in each of them with array operations only: nothing is asked to
+the user, and no Board is built.
+
+Actions are indexes in ACTIONS, the encoded moves (see Moves) that fit
+on the board: every push (cell, direction), then every broadside move
+of a line of 2 or 3 cells. Each ray, group and target of an action is
+precomputed as an array of cell indexes, cells outside the board being
+the extra column DEAD_COLUMN, which always holds 0 (the dead zone).
+The legal actions of the side to move are given as a (K, N_ACTIONS)
+boolean mask, computed for every game at once on bitboards laid out as
+in BitBoard (bit r * 11 + c for the spot (r, c)), each held in two
+uint64 words: the patterns of BitBoard.generate_moves are a few dozen
+array operations on (2, K) words, instead of gathering every ray.
+
+    env = VectorEnv(1024, seed=0)
+    obs, info = env.reset()
+    while training:
+        actions = policy(obs, info["to_play"], info["action_mask"])
+        obs, rewards, terminated, truncated, info = env.step(actions)
+
+Finished games (a player down to Rules.LOSING_COUNT marbles, or
+max_plies moves played) are reset right away.
+"""
+
+import numpy as np
+
+import Moves
+from Geometry import (AXES, BITS, CELL_INDEX, CELLS, DEAD, DIRECTIONS,
+                      LINES2, LINES3, NEIGHBORS, NUM_CELLS, PLAYABLE, RAYS,
+                      SHIFTS)
+from Rules import LOSING_COUNT
+
+DEAD_COLUMN = NUM_CELLS
+# cells of a push ray that matter: 3 friends, 2 enemies and the spot after
+RAY_LENGTH = 6
+# uint64 words of a bitboard (the padded grid has 121 bits)
+WORDS = 2
+# broadside patterns (size, axis, direction), in the order of ACTIONS
+BROADSIDES = tuple((size, axis, d)
+                   for size in (2, 3)
+                   for axis, a in enumerate(AXES)
+                   for d in range(len(DIRECTIONS))
+                   if d >> 1 != a >> 1)
+
+
+def _cell(spot) -> int:
+    """Cell index of a spot, DEAD_COLUMN for the dead zone."""
+    return CELL_INDEX.get(spot, DEAD_COLUMN)
+
+
+def _actions() -> tuple:
+    """Precompute the actions, with their rays, groups and targets.
+
+    The bit of each action is also given, in the patterns found by
+    legal_mask: the pushes in direction d, then the BROADSIDES, each
+    made of 64 * WORDS bits.
+    """
+    moves, rays, bits = [], [], []
+    for i, (r, c) in enumerate(CELLS):
+        for d in range(len(DIRECTIONS)):
+            ray = [i] + [_cell(spot) for spot in RAYS[d][r][c]]
+            ray += [DEAD_COLUMN] * RAY_LENGTH
+            moves.append(Moves.encode(i, d))
+            rays.append(ray[:RAY_LENGTH])
+            bits.append(d * 64 * WORDS + BITS[i])
+
+    groups, targets = [], []
+    for size, lines in ((2, LINES2), (3, LINES3)):
+        for axis, a in enumerate(AXES):
+            for i, (r, c) in enumerate(CELLS):
+                spots = lines[a][r][c]
+                if spots is None:
+                    continue
+                for d in range(len(DIRECTIONS)):
+                    if d >> 1 == a >> 1:
+                        continue
+                    group = [_cell(s) for s in spots]
+                    target = [_cell(NEIGHBORS[d][s_r][s_c])
+                              for s_r, s_c in spots]
+                    pad = [DEAD_COLUMN] * (3 - size)
+                    pattern = (len(DIRECTIONS)
+                               + BROADSIDES.index((size, axis, d)))
+                    moves.append(Moves.encode(i, d, size, axis))
+                    groups.append(group + pad)
+                    targets.append(target + pad)
+                    bits.append(pattern * 64 * WORDS + BITS[i])
+    return (np.array(moves), np.array(rays, dtype=np.intp),
+            np.array(groups, dtype=np.intp),
+            np.array(targets, dtype=np.intp), np.array(bits, dtype=np.intp))
+
+
+ACTIONS, PUSH_RAYS, GROUPS, TARGETS, ACTION_BITS = _actions()
+N_ACTIONS = len(ACTIONS)
+N_PUSHES = len(PUSH_RAYS)
+ACTION_INDEX = {int(move): i for i, move in enumerate(ACTIONS)}
+
+
+def _words(bits) -> np.ndarray:
+    """(WORDS, 1) uint64 words of a bitboard, to mask a batch."""
+    return np.array([[bits >> 64 * w & (1 << 64) - 1] for w in range(WORDS)],
+                    dtype=np.uint64)
+
+
+PLAYABLE_WORDS = _words(PLAYABLE)
+DEAD_WORDS = _words(DEAD)
+
+
+def _start() -> np.ndarray:
+    """Row of the standard position (see Board.__init__)."""
+    from Board import Board
+    board = Board().board
+    return np.array([board[r][c] for r, c in CELLS] + [0], dtype=np.int8)
+
+
+START = _start()
+
+
+def _push_lengths(vals, me, other) -> tuple:
+    """Friends and enemies in line at the start of push rays.
+
+    Parameters
+    ----------
+    vals: np.ndarray (positional)
+        (..., RAY_LENGTH) values along the rays
+    me, other: np.ndarray (positional)
+        Colors of the side to move and of its opponent, broadcastable
+        to vals[..., 0]
+
+    Return
+    ------
+    friends, enemies: np.ndarray
+        Number of friendly marbles in line from the origin (0 to 4),
+        then number of enemy marbles right after them (0 to 3)
+    """
+    me = me[..., None]
+    friends = np.cumprod(vals[..., :4] == me, axis=-1).sum(axis=-1)
+    k = np.minimum(friends, 3)[..., None]
+    ahead = np.take_along_axis(vals, k + np.arange(3), axis=-1)
+    enemies = np.cumprod(ahead == other[..., None], axis=-1).sum(axis=-1)
+    return friends, enemies
+
+
+def _to_bits(cells) -> np.ndarray:
+    """(WORDS, K) bitboards of a (K, 61) boolean array."""
+    grid = np.zeros((len(cells), 64 * WORDS), dtype=bool)
+    grid[:, BITS] = cells
+    packed = np.packbits(grid, axis=1, bitorder="little")
+    return np.ascontiguousarray(packed.view("<u8").T)
+
+
+def _shift(bits, s) -> np.ndarray:
+    """Shift (WORDS, K) bitboards by s positions (see BitBoard.shift)."""
+    if s > 0:
+        shifted = bits << np.uint64(s)
+        shifted[1:] |= bits[:-1] >> np.uint64(64 - s)
+    else:
+        shifted = bits >> np.uint64(-s)
+        shifted[:-1] |= bits[1:] << np.uint64(64 + s)
+    return shifted
+
+
+def legal_mask(boards, colors) -> np.ndarray:
+    """Legal actions of a batch of positions.
+
+    The legal moves are found as in BitBoard.generate_moves, one
+    pattern of origins per push direction and per broadside, then each
+    action reads its bit (see ACTION_BITS).
+
+    Parameters
+    ----------
+    boards: np.ndarray (positional)
+        (K, 62) int8 array, the last column being DEAD_COLUMN
+    colors: np.ndarray (positional)
+        (K,) colors of the side to move
+
+    Return
+    ------
+    mask: np.ndarray
+        (K, N_ACTIONS) boolean array, True for the legal actions
+    """
+    me = np.asarray(colors, dtype=np.int8)[:, None]
+    cells = boards[:, :NUM_CELLS]
+    own = _to_bits(cells == me)
+    other = _to_bits(cells == 5 - me)
+    # where the last marble of a line can go: free spot or dead zone
+    out = (PLAYABLE_WORDS & ~(own | other)) | DEAD_WORDS
+    patterns = []
+
+    # 1 to 3 friends in line, then fewer enemies and an out spot
+    for s in SHIFTS:
+        own2 = own & _shift(own, -s)
+        own3 = own2 & _shift(own, -2 * s)
+        other3 = own3 & _shift(other, -3 * s)
+        out2, out3, out4 = (_shift(out, -k * s) for k in (2, 3, 4))
+        patterns.append(
+            (own & _shift(out, -s)) | (own2 & out2) | (own3 & out3)
+            | (own2 & _shift(other, -2 * s) & out3) | (other3 & out4)
+            | (other3 & _shift(other, -4 * s) & _shift(out, -5 * s)))
+
+    # a friendly group moving into out spots
+    lines = {}
+    for axis, a in enumerate(AXES):
+        pairs = own & _shift(own, -SHIFTS[a])
+        lines[2, axis] = pairs
+        lines[3, axis] = pairs & _shift(own, -2 * SHIFTS[a])
+    for size, axis, d in BROADSIDES:
+        s_a = SHIFTS[AXES[axis]]
+        free = _shift(out, -SHIFTS[d])
+        starts = lines[size, axis] & free & _shift(free, -s_a)
+        if size == 3:
+            starts &= _shift(free, -2 * s_a)
+        patterns.append(starts)
+
+    # (K, patterns, WORDS) words, read as little-endian bits
+    words = np.ascontiguousarray(np.stack(patterns).transpose(2, 0, 1),
+                                 dtype="<u8")
+    bits = np.unpackbits(words.view(np.uint8).reshape(len(boards), -1),
+                         axis=1, bitorder="little")
+    return np.take(bits, ACTION_BITS, axis=1).view(bool)
+
+
+def apply_actions(boards, colors, actions) -> None:
+    """Play one legal action in each position of a batch, in place.
+
+    Parameters
+    ----------
+    boards: np.ndarray (positional)
+        (K, 62) int8 array, the last column being DEAD_COLUMN
+    colors: np.ndarray (positional)
+        (K,) colors of the side to move
+    actions: np.ndarray (positional)
+        (K,) legal actions
+    """
+    colors = np.asarray(colors, dtype=np.int8)
+    is_push = actions < N_PUSHES
+
+    rows = np.flatnonzero(is_push)
+    if len(rows):
+        # the marbles of the line move one spot forward along the ray
+        rays = PUSH_RAYS[actions[rows]]
+        vals = boards[rows[:, None], rays]
+        friends, enemies = _push_lengths(vals, colors[rows],
+                                            5 - colors[rows])
+        moved = (friends + enemies)[:, None]
+        j = np.arange(RAY_LENGTH)
+        shifted = np.concatenate((np.ones_like(vals[:, :1]), vals[:, :-1]),
+                                 axis=1)
+        boards[rows[:, None], rays] = np.where(j <= moved, shifted, vals)
+
+    rows = np.flatnonzero(~is_push)
+    if len(rows):
+        broadsides = actions[rows] - N_PUSHES
+        boards[rows[:, None], GROUPS[broadsides]] = 1
+        boards[rows[:, None], TARGETS[broadsides]] = colors[rows, None]
+
+    # marbles pushed into the dead zone are lost
+    boards[:, DEAD_COLUMN] = 0
+
+
+class VectorEnv():
+    """
+    K Abalone games stepped together.
+
+    Attributes
+    ----------
+    num_envs: int
+        Number of games
+    max_plies: int
+        Games are truncated (draws) after this number of moves
+    boards: np.ndarray
+        (K, 62) int8 array of the positions, the last column being the
+        dead zone
+    to_play: np.ndarray
+        (K,) colors of the side to move
+    plies: np.ndarray
+        (K,) number of moves played in each game
+    action_mask: np.ndarray
+        (K, N_ACTIONS) legal actions of the side to move
+
+    Methods
+    -------
+    reset(seed=None) -> tuple
+        Start every game again
+    step(actions) -> tuple
+        Play one action in every game
+    """
+
+    def __init__(self, num_envs, max_plies=400, seed=None):
+        """Constructor.
+
+        Parameters
+        ----------
+        num_envs: int (positional)
+            Number of games
+        max_plies: int
+            Games are truncated after this number of moves
+        seed: int
+            Seed of the random choice of the first player
+        """
+        self.num_envs = num_envs
+        self.max_plies = max_plies
+        self.rng = np.random.default_rng(seed)
+        self.boards = np.tile(START, (num_envs, 1))
+        self.to_play = np.full(num_envs, 2, dtype=np.int8)
+        self.plies = np.zeros(num_envs, dtype=np.int32)
+        self.action_mask = np.zeros((num_envs, N_ACTIONS), dtype=bool)
+
+    def _reset_rows(self, rows) -> None:
+        """Put the standard position back in some games."""
+        self.boards[rows] = START
+        self.to_play[rows] = self.rng.choice(np.array([2, 3], np.int8),
+                                             len(rows))
+        self.plies[rows] = 0
+
+    def _info(self) -> dict:
+        self.action_mask = legal_mask(self.boards, self.to_play)
+        return {"to_play": self.to_play.copy(),
+                "action_mask": self.action_mask}
+
+    def reset(self, seed=None) -> tuple:
+        """Start every game from the standard position.
+
+        The color moving first is drawn at random, as in Play.main.
+
+        Return
+        ------
+        obs: np.ndarray
+            (K, 61) int8 positions
+        info: dict
+            "to_play" (K,) colors and "action_mask" (K, N_ACTIONS)
+        """
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self._reset_rows(np.arange(self.num_envs))
+        return self.boards[:, :NUM_CELLS].copy(), self._info()
+
+    def step(self, actions) -> tuple:
+        """Play one action in every game.
+
+        Parameters
+        ----------
+        actions: np.ndarray (positional)
+            (K,) legal actions of the side to move in each game
+
+        Return
+        ------
+        obs: np.ndarray
+            (K, 61) int8 positions, finished games being already reset
+            (their last position is info["final_observation"])
+        rewards: np.ndarray
+            (K,) float32 rewards of the player who moved: 1 for a win,
+            -1 for a loss (pushing one's own marbles off), 0 otherwise
+        terminated: np.ndarray
+            (K,) True where a player is down to LOSING_COUNT marbles
+        truncated: np.ndarray
+            (K,) True where max_plies moves were played
+        info: dict
+            "to_play", "action_mask", "final_observation"
+        """
+        actions = np.asarray(actions, dtype=np.intp)
+        if not self.action_mask[np.arange(self.num_envs), actions].all():
+            raise ValueError("Illegal action")
+        movers = self.to_play.copy()
+        apply_actions(self.boards, movers, actions)
+        self.plies += 1
+
+        cells = self.boards[:, :NUM_CELLS]
+        own = np.count_nonzero(cells == movers[:, None], axis=1)
+        other = np.count_nonzero(cells == (5 - movers)[:, None], axis=1)
+        rewards = ((other <= LOSING_COUNT).astype(np.float32)
+                   - (own <= LOSING_COUNT))
+        terminated = (own <= LOSING_COUNT) | (other <= LOSING_COUNT)
+        truncated = ~terminated & (self.plies >= self.max_plies)
+        final = cells.copy()
+
+        self.to_play = 5 - movers
+        done = np.flatnonzero(terminated | truncated)
+        if len(done):
+            self._reset_rows(done)
+        info = self._info()
+        info["final_observation"] = final
+        return (self.boards[:, :NUM_CELLS].copy(), rewards, terminated,
+                truncated, info)
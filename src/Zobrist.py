@@ -0,0 +1,108 @@
+# -------------------- #
+#   Zobrist Hashing    #
+# -------------------- #
+
+"""64-bit position hashing.
+
+Each (spot, value) pair gets a random 64-bit key, and a position hash is
+the XOR of the keys of its marbles. Spots are indexed by r * 11 + c,
+which is both the flattened Board.board index and the BitBoard bit.
+Empty spots and the dead zone have a null key, so moving a marble only
+costs two XORs. SIDE is XORed in to flip the side to move.
+
+The keys are drawn from a fixed seed: hashes are the same in every
+process, which lets them be stored on disk or shared between workers.
+"""
+
+import random
+
+from Geometry import CELLS, dimension
+
+_rng = random.Random(0xABA10E)
+
+# KEYS[value][r * 11 + c], value being a Board.board value (0..3)
+KEYS = (
+    (0,) * (dimension * dimension),
+    (0,) * (dimension * dimension),
+    tuple(_rng.getrandbits(64) for _ in range(dimension * dimension)),
+    tuple(_rng.getrandbits(64) for _ in range(dimension * dimension)),
+)
+SIDE = _rng.getrandbits(64)
+
+
+def hash_list(board) -> int:
+    """Hash an 11x11 nested list (as Board.board), without side to move.
+
+    Parameter
+    ---------
+    board: list (positional)
+        Nested list of Board.board values
+
+    Return
+    ------
+    key: int
+        64-bit hash
+    """
+    key = 0
+    for r, c in CELLS:
+        key ^= KEYS[board[r][c]][r * dimension + c]
+    return key
+
+
+def hash_bitboard(position, color=2) -> int:
+    """Hash a BitBoard, the side to move being given by color.
+
+    The SIDE key is set when green (3) is to move, so that the result
+    matches hash_list for red to move.
+
+    Parameters
+    ----------
+    position: BitBoard (positional)
+        Position to hash
+    color: int
+        Color of the side to move
+
+    Return
+    ------
+    key: int
+        64-bit hash
+    """
+    key = SIDE if color == 3 else 0
+    for value, bits in ((2, position.red), (3, position.green)):
+        keys = KEYS[value]
+        while bits:
+            low = bits & -bits
+            key ^= keys[low.bit_length() - 1]
+            bits ^= low
+    return key
+
+
+def update_bitboard(key, before, after) -> int:
+    """Update a hash from a position to the next one.
+
+    Only the spots that changed are XORed, and the side to move is
+    flipped.
+
+    Parameters
+    ----------
+    key: int (positional)
+        Hash of the position before the move
+    before: BitBoard (positional)
+        Position before the move
+    after: BitBoard (positional)
+        Position after the move
+
+    Return
+    ------
+    key: int
+        Hash of the position after the move
+    """
+    key ^= SIDE
+    for value, bits in ((2, before.red ^ after.red),
+                        (3, before.green ^ after.green)):
+        keys = KEYS[value]
+        while bits:
+            low = bits & -bits
+            key ^= keys[low.bit_length() - 1]
+            bits ^= low
+    return key
@@ -0,0 +1,62 @@
+"""Helpers shared by the tests, imported once src is on sys.path."""
+
+import random
+
+import Rules
+from BitBoard import BitBoard
+from Board import Board
+
+
+def random_positions(n, seed=0):
+    """Positions reached by random games, with the side to move.
+
+    The games stop when a player wins, so that every position is still
+    being played.
+    """
+    rng = random.Random(seed)
+    positions = []
+    for _ in range(n):
+        position, color = BitBoard.start(), rng.choice((2, 3))
+        for _ in range(rng.randrange(60)):
+            moves = position.generate_moves(color)
+            if not moves:
+                break
+            child = position.apply(rng.choice(moves), color)
+            if Rules.winner(child.marbles):
+                break
+            position = child
+            color = 5 - color
+        positions.append((position, color))
+    return positions
+
+
+def random_game(seed, plies=40):
+    """Return the first color and the moves of a random game."""
+    rng = random.Random(seed)
+    position = BitBoard.start()
+    color = first = rng.choice((2, 3))
+    moves = []
+    for _ in range(plies):
+        if Rules.winner(position.marbles):
+            break
+        move = rng.choice(position.generate_moves(color))
+        moves.append(move)
+        position = position.apply(move, color)
+        color = 5 - color
+    return first, moves
+
+
+def winning_board():
+    """Red can eject a 6th green marble: (6, 4), (7, 4) push (8, 4) SW."""
+    tB = Board()
+    for r in range(7, 10):
+        for c in range(11):
+            if tB.board[r][c] == 3:
+                tB.board[r][c] = 1
+    greens = [(8, 4), (9, 6), (9, 7), (9, 8), (9, 9),
+              (8, 8), (8, 9), (7, 9), (7, 8)]
+    for r, c in greens:
+        tB.board[r][c] = 3
+    tB.board[6][4] = 2
+    tB.board[7][4] = 2
+    return tB
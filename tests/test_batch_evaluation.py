@@ -0,0 +1,45 @@
+import os
+import sys
+
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+np = pytest.importorskip("numpy")
+
+import BatchEvaluation
+from BatchEvaluation import evaluate_batch, from_list, to_array
+from BitBoard import BitBoard
+from Board import Board
+from Evaluation import evaluate
+from helpers import random_positions
+
+
+# testing BatchEvaluation.to_array and BatchEvaluation.from_list
+# -------------------------------------------------------------
+def test_to_array():
+    batch = to_array([BitBoard.start()])
+    assert batch.shape == (1, 61) and batch.dtype == np.int8
+    assert (batch[0] == from_list(Board().board)).all()
+    assert (batch == 2).sum() == (batch == 3).sum() == 14
+
+
+def test_pairs():
+    # 3 axes: 9 rows of n cells have n - 1 pairs each
+    assert BatchEvaluation.PAIRS.shape == (2, 3 * (61 - 9))
+    assert BatchEvaluation.EDGE_PAIRS.shape == (2, 6 * 9)
+
+
+# testing BatchEvaluation.evaluate_batch
+# --------------------------------------
+def test_same_scores():
+    positions = random_positions(200, seed=5)
+    batch = to_array(p for p, _ in positions)
+    colors = np.array([c for _, c in positions])
+    expected = [evaluate(p, c) for p, c in positions]
+    assert evaluate_batch(batch, colors).tolist() == expected
+    assert evaluate_batch(batch, 2).tolist() == \
+        [evaluate(p, 2) for p, _ in positions]
+
+
+def test_empty_batch():
+    assert evaluate_batch(np.ones((0, 61), dtype=np.int8)).shape == (0,)
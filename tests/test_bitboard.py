@@ -0,0 +1,175 @@
+import copy
+import os
+import random
+import sys
+
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from Board import Board
+from BitBoard import BitBoard
+import Moves
+from Geometry import AXES, CELLS, CELL_INDEX, DIRECTIONS, OFFSETS, to_coords
+
+
+def random_board(seed):
+    """Board with marbles scattered at random on the 61 spots."""
+    rng = random.Random(seed)
+    tB = Board()
+    for r, c in CELLS:
+        tB.board[r][c] = rng.choice((1, 1, 2, 3))
+    return tB
+
+
+def apply_new_data(board, new_data):
+    board = copy.deepcopy(board)
+    for (r, c), value in new_data.items():
+        board[r][c] = value
+    return board
+
+
+# testing BitBoard.from_list / to_list
+# ------------------------------------
+def test_round_trip():
+    tB = Board()
+    assert BitBoard.from_board(tB).to_list() == tB.board
+    assert BitBoard.start().marbles == {2: 14, 3: 14}
+
+
+# testing BitBoard.push(friend, cell, direction)
+# ----------------------------------------------
+@pytest.mark.parametrize("seed", range(20))
+def test_push_matches_push_move(seed, capsys):
+    tB = random_board(seed)
+    position = BitBoard.from_board(tB)
+    for friend in (2, 3):
+        for cell, (r, c) in enumerate(CELLS):
+            if tB.board[r][c] != friend:
+                continue
+            for d, orientation in enumerate(DIRECTIONS):
+                new_data = tB.push_move(friend, (to_coords(cell),),
+                                        orientation)
+                result = position.push(friend, cell, d)
+                if not new_data:
+                    assert result is None
+                else:
+                    expected = apply_new_data(tB.board, new_data)
+                    assert result.to_list() == expected
+
+
+# testing BitBoard.free(friend, cells, direction)
+# -----------------------------------------------
+@pytest.mark.parametrize("seed", range(20))
+def test_free_matches_free_move(seed, capsys):
+    tB = random_board(seed)
+    position = BitBoard.from_board(tB)
+    for friend in (2, 3):
+        for (r, c) in CELLS:
+            for axis in AXES:
+                dr, dc = OFFSETS[axis]
+                for size in (2, 3):
+                    group = [(r + i * dr, c + i * dc) for i in range(size)]
+                    if any(tB.board[gr][gc] != friend for gr, gc in group):
+                        continue
+                    cells = tuple(CELL_INDEX[g] for g in group)
+                    user_data = tuple(to_coords(cell) for cell in cells)
+                    for d, orientation in enumerate(DIRECTIONS):
+                        new_data = tB.free_move(friend, user_data,
+                                                orientation)
+                        result = position.free(friend, cells, d)
+                        if not new_data:
+                            assert result is None
+                        else:
+                            expected = apply_new_data(tB.board, new_data)
+                            assert result.to_list() == expected
+
+
+# testing Board.generate_moves(color)
+# -----------------------------------
+def brute_force_moves(tB, color):
+    """Every move accepted by push_move or free_move, the slow way."""
+    moves = set()
+    for cell in range(len(CELLS)):
+        for d in range(len(DIRECTIONS)):
+            for size in (1, 2, 3):
+                for axis in range(len(AXES)):
+                    if size == 1 and axis:
+                        continue
+                    move = Moves.encode(cell, d, size, axis)
+                    try:
+                        user_data, orientation = Moves.to_user_data(move)
+                    except KeyError:
+                        continue
+                    r, c = tB.to_2d_list(user_data[0])
+                    if any(tB.board[r][c] != color for r, c in
+                           (tB.to_2d_list(e) for e in user_data)):
+                        continue
+                    if size == 1:
+                        new_data = tB.push_move(color, user_data,
+                                                orientation)
+                    else:
+                        new_data = tB.free_move(color, user_data,
+                                                orientation)
+                    if new_data:
+                        moves.add(move)
+    return moves
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_generate_moves(seed, capsys):
+    tB = random_board(seed)
+    for color in (2, 3):
+        moves = tB.generate_moves(color)
+        assert len(moves) == len(set(moves))
+        assert set(moves) == brute_force_moves(tB, color)
+
+
+def test_generate_moves_start(capsys):
+    tB = Board()
+    for color in (2, 3):
+        assert set(tB.generate_moves(color)) == brute_force_moves(tB, color)
+
+
+# testing BitBoard.ejections(color)
+# ---------------------------------
+@pytest.mark.parametrize("seed", range(10))
+def test_ejections(seed):
+    position = BitBoard.from_board(random_board(seed))
+    for color in (2, 3):
+        enemy = 5 - color
+        n_enemies = position.marbles[enemy]
+        expected = {move for move in position.generate_moves(color)
+                    if position.apply(move, color).marbles[enemy]
+                    < n_enemies}
+        assert set(position.ejections(color)) == expected
+
+
+# testing Moves.from_user_data(user_data, orientation)
+# ----------------------------------------------------
+@pytest.mark.parametrize("user_data, orientation", [
+    (("G5",), "NW"),
+    (("C5", "C6", "C7"), "SE"),
+    (("C7", "C5", "C6"), "SE"),
+    (("E5", "F5"), "E"),
+    (("D4", "E3", "F2"), "W"),
+])
+def test_from_user_data(user_data, orientation):
+    move = Moves.from_user_data(user_data, orientation)
+    new_user_data, new_orientation = Moves.to_user_data(move)
+    assert sorted(new_user_data) == sorted(user_data)
+    assert new_orientation == orientation
+
+
+# testing BitBoard.edge_threats(color)
+# ------------------------------------
+@pytest.mark.parametrize("seed", range(10))
+def test_edge_threats(seed):
+    position = BitBoard.from_board(random_board(seed))
+    for color in (2, 3):
+        enemy = 5 - color
+        threats = set(position.edge_threats(color))
+        assert threats <= set(position.generate_moves(color))
+        for move in threats:
+            child = position.apply(move, color)
+            assert child.marbles[enemy] == position.marbles[enemy]
+            assert child.pieces(enemy) != position.pieces(enemy)
@@ -1,8 +1,14 @@
+import os
 import pytest
+import random
 import sys
-sys.path.insert(0, "/home/adrian/Desktop/Python/Abalone/src")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
 from Board import Board
+from BitBoard import BitBoard
+import Moves
+import Zobrist
+from Geometry import CELLS, DIRECTION_INDEX, LINES2, NEIGHBORS, RAYS
 
 # testing Board.next_stop(r, c, orientation)
 # ------------------------------------------
@@ -111,4 +117,70 @@ def test_free_move(friend, user_data, orientation, expected_result):
     tB.board[6][5] = 2
     tB.board[5][4] = 3
     msg = f"Error with: {user_data}, {orientation}"
-    assert tB.free_move(friend, user_data, orientation) == expected_result
\ No newline at end of file
+    assert tB.free_move(friend, user_data, orientation) == expected_result
+
+# testing the precomputed tables against Board.disp
+# -------------------------------------------------
+@pytest.mark.parametrize("orientation", list(Board.disp))
+def test_neighbor_tables(orientation):
+    d = DIRECTION_INDEX[orientation]
+    for r, c in CELLS:
+        n_r, n_c = Board.disp[orientation](r, c)
+        assert NEIGHBORS[d][r][c] == (n_r, n_c)
+        assert RAYS[d][r][c][0] == (n_r, n_c)
+        assert RAYS[d][r][c][-1] not in CELLS
+        if (n_r, n_c) in CELLS:
+            assert LINES2[d][r][c] == ((r, c), (n_r, n_c))
+        else:
+            assert LINES2[d][r][c] is None
+
+
+# testing the incremental hash of Board.update_board
+# --------------------------------------------------
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("first", [2, 3])
+def test_incremental_hash(seed, first, capsys):
+    rng = random.Random(seed)
+    tB = Board(first)
+    color = first
+    assert tB.hash == Zobrist.hash_bitboard(BitBoard.from_board(tB), color)
+    for _ in range(40):
+        user_data, orientation = Moves.to_user_data(
+            rng.choice(tB.generate_moves(color)))
+        assert tB.update_board(user_data, orientation, color)
+        color = tB.enemy(color)
+        expected = tB.compute_hash(color)
+        assert tB.hash == expected
+        position = BitBoard.from_board(tB)
+        assert Zobrist.hash_bitboard(position, color) == expected
+
+
+# testing Board.make_move(move) / Board.unmake_move(undo)
+# -------------------------------------------------------
+@pytest.mark.parametrize("seed", range(5))
+def test_make_unmake(seed, capsys):
+    rng = random.Random(seed)
+    tB = Board()
+    color = 2
+    for _ in range(30):
+        board = [row[:] for row in tB.board]
+        marbles, h = dict(tB.marbles), tB.hash
+        for move in tB.generate_moves(color):
+            expected = BitBoard.from_board(tB).apply(move, color)
+            undo = tB.make_move(move)
+            assert undo is tB.history[-1]
+            assert BitBoard.from_board(tB) == expected
+            assert tB.marbles == expected.marbles
+            tB.unmake_move(undo)
+            assert (tB.board, tB.marbles, tB.hash) == (board, marbles, h)
+        tB.make_move(rng.choice(tB.generate_moves(color)))
+        color = tB.enemy(color)
+
+
+def test_rejected_move_keeps_marbles(capsys):
+    tB = Board()
+    # A5 can fall into the dead zone, but B5 is blocked by A5
+    assert tB.update_board(("A5", "B5"), "NW", 2) == {}
+    assert tB.marbles == {2: 14, 3: 14}
+    assert tB.make_move(Moves.from_user_data(("A5", "B5"), "NW")) is None
+    assert tB.marbles == {2: 14, 3: 14}
@@ -0,0 +1,120 @@
+import math
+import os
+import sys
+import time
+
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from BitBoard import BitBoard
+from Engine import (INFINITY, QUIESCENCE_DEPTH, QUIESCENCE_NODES, WIN_BOUND,
+                    Engine, evaluate)
+from helpers import winning_board
+
+
+# testing evaluate(position, color)
+# ---------------------------------
+def test_evaluate_start():
+    position = BitBoard.start()
+    assert evaluate(position, 2) == evaluate(position, 3) == 0
+
+
+# testing Engine.get_move(board, color)
+# -------------------------------------
+@pytest.mark.parametrize("max_depth", [1, 3])
+def test_finds_winning_push(max_depth):
+    engine = Engine(time_limit=5.0, max_depth=max_depth, tt_size_mb=1)
+    user_data, orientation = engine.get_move(winning_board(), 2)
+    assert (user_data, orientation) == (("F3",), "SW")
+    assert engine.score >= WIN_BOUND
+
+
+def test_time_limit():
+    engine = Engine(time_limit=0.2, tt_size_mb=1)
+    move = engine.search(BitBoard.start(), 3)
+    assert move in BitBoard.start().generate_moves(3)
+    assert engine.depth >= 1
+
+
+# testing the move ordering of Engine
+# -----------------------------------
+def test_ordering_same_score():
+    scores = []
+    for ordering in (False, True):
+        engine = Engine(time_limit=60.0, max_depth=3, tt_size_mb=1,
+                        ordering=ordering)
+        engine.search(BitBoard.start(), 2)
+        scores.append(engine.score)
+    assert scores[0] == scores[1]
+
+
+def test_cutoff_counters():
+    engine = Engine(time_limit=60.0, max_depth=3, tt_size_mb=1)
+    engine.search(BitBoard.start(), 3)
+    assert engine.cutoffs > 0
+    assert 0 < engine.cutoff_rate <= 1
+    assert len(engine.iteration_nodes) == 3
+    assert engine.branching_factor > 1
+    assert any(engine.history[3])
+
+
+# testing the quiescence search of Engine
+# ---------------------------------------
+def test_quiescence_sees_ejection():
+    position = BitBoard.from_board(winning_board())
+    engine = Engine(tt_size_mb=1)
+    engine.deadline = math.inf
+    engine._q_budget = QUIESCENCE_NODES
+    assert engine._quiesce(position, 2, -INFINITY, INFINITY, 0,
+                           QUIESCENCE_DEPTH) >= WIN_BOUND
+    assert evaluate(position, 2) < WIN_BOUND
+
+
+def test_quiescence_budget():
+    engine = Engine(time_limit=60.0, max_depth=2, tt_size_mb=1)
+    engine.search(BitBoard.start(), 2)
+    assert engine.qnodes <= engine.nodes
+    engine = Engine(time_limit=60.0, max_depth=2, tt_size_mb=1,
+                    quiescence=False)
+    engine.search(BitBoard.start(), 2)
+    assert engine.qnodes == 0
+
+
+# testing Engine.ponder(position, color)
+# --------------------------------------
+def test_ponder_hit():
+    engine = Engine(time_limit=5.0, max_depth=2, tt_size_mb=1)
+    position = BitBoard.start()
+    position = position.apply(engine.search(position, 2), 2)
+    reply = engine.ponder(position, 3)
+    assert reply in position.generate_moves(3)
+    assert engine.ponder_move == reply
+    child = position.apply(reply, 3)
+    move = engine.search(child, 2)
+    assert move in child.generate_moves(2)
+    assert engine.ponder_hits == 1
+    assert engine.ponder_move == 0
+    assert engine.depth == 2
+
+
+def test_ponder_miss():
+    engine = Engine(time_limit=0.2, tt_size_mb=1)
+    position = BitBoard.start()
+    position = position.apply(engine.search(position, 2), 2)
+    reply = engine.ponder(position, 3)
+    other = next(m for m in position.generate_moves(3) if m != reply)
+    child = position.apply(other, 3)
+    start = time.perf_counter()
+    move = engine.search(child, 2)
+    assert time.perf_counter() - start < 1.0
+    assert move in child.generate_moves(2)
+    assert engine.ponder_hits == 0
+
+
+def test_stop_pondering():
+    engine = Engine(time_limit=0.2, tt_size_mb=1)
+    engine.ponder(BitBoard.start(), 3)
+    thread = engine._ponder_thread
+    engine.stop_pondering()
+    assert not thread.is_alive()
+    assert engine.ponder_move == 0
@@ -0,0 +1,71 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import Evaluation
+from BitBoard import BitBoard
+from Board import Board
+from Evaluation import evaluate, position_score
+from Geometry import BITS, from_coords
+
+
+def bitboard(red, green):
+    """BitBoard from user coordinates (i.e. "A5 A6")."""
+    return BitBoard(*(sum(1 << BITS[from_coords(e)] for e in marbles.split())
+                      for marbles in (red, green)))
+
+
+# testing Evaluation.evaluate
+# ---------------------------
+def test_symmetric_start():
+    start = BitBoard.start()
+    assert evaluate(start, 2) == evaluate(start, 3) == 0
+
+
+def test_edge_danger():
+    # the red marble on A5 has a green marble behind it (towards B5)
+    danger = bitboard("A5", "B5")
+    safe = bitboard("A5", "B7")
+    swap = lambda p: BitBoard(p.green, p.red)
+    assert (evaluate(danger, 2) - evaluate(safe, 2)
+            == -Evaluation.EDGE_WEIGHT)
+    assert evaluate(danger, 2) == -evaluate(danger, 3)
+    assert evaluate(swap(danger), 3) == evaluate(danger, 2)
+
+
+def test_cohesion():
+    pair = bitboard("E4 E5", "")
+    apart = bitboard("E3 E5", "")
+    assert (evaluate(pair, 2) - evaluate(apart, 2)
+            == Evaluation.COHESION_WEIGHT + Evaluation.CENTER_WEIGHT)
+
+
+# testing the incremental score of Board
+# --------------------------------------
+def test_incremental_score():
+    rng = random.Random(0)
+    for _ in range(5):
+        tB = Board()
+        color = rng.choice((2, 3))
+        for _ in range(60):
+            moves = tB.generate_moves(color)
+            if not moves:
+                break
+            move = rng.choice(moves)
+            score = tB.position_score
+            tB.make_move(move)
+            assert tB.position_score == position_score(tB.board)
+            for c in (2, 3):
+                assert tB.evaluate(c) == evaluate(BitBoard.from_board(tB), c)
+            tB.unmake_move()
+            assert tB.position_score == score
+            tB.make_move(move)
+            color = 5 - color
+
+
+def test_update_board_score():
+    tB = Board()
+    assert tB.update_board(("G5", "G6", "G7"), "NW", 3)
+    assert tB.position_score == position_score(tB.board)
@@ -0,0 +1,88 @@
+import os
+import sys
+
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import GameRecord
+from BitBoard import BitBoard
+from GameRecord import GameWriter, RecordError, read_games, replay
+from helpers import random_game
+
+
+# testing GameWriter and read_games
+# ---------------------------------
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "games.abr")
+    games = [random_game(seed) for seed in range(5)]
+    with GameWriter(path) as writer:
+        for i, (first, moves) in enumerate(games):
+            writer.append(first, moves, winner=(0, 2, 3)[i % 3])
+    read = list(read_games(path))
+    assert [(first, list(moves)) for first, _, moves in read] == games
+    assert [winner for _, winner, _ in read] == [0, 2, 3, 0, 2]
+    assert GameRecord.count_games(path) == 5
+
+
+def test_size(tmp_path):
+    path = str(tmp_path / "games.abr")
+    first, moves = random_game(0, plies=80)
+    with GameWriter(path) as writer:
+        writer.append(first, moves)
+    size = (GameRecord.FILE_HEADER.size + GameRecord.GAME_HEADER.size
+            + 2 * len(moves))
+    assert os.path.getsize(path) == size
+
+
+def test_append(tmp_path):
+    path = str(tmp_path / "games.abr")
+    with GameWriter(path) as writer:
+        writer.append(2, [])
+    with GameWriter(path) as writer:
+        writer.append(3, random_game(1)[1])
+    assert [first for first, _, _ in read_games(path)] == [2, 3]
+
+
+def test_invalid_files(tmp_path, monkeypatch):
+    opened = []
+
+    def tracked_open(*args, **kwargs):
+        f = open(*args, **kwargs)
+        opened.append(f)
+        return f
+    monkeypatch.setattr(GameRecord, "open", tracked_open, raising=False)
+    path = str(tmp_path / "games.abr")
+    with open(path, "wb") as f:
+        f.write(b"not a record")
+    with pytest.raises(RecordError):
+        list(read_games(path))
+    with pytest.raises(RecordError):
+        GameWriter(path)
+    assert all(f.closed for f in opened)
+
+    with GameWriter(path + "2") as writer:
+        writer.append(2, random_game(2)[1])
+    with open(path + "2", "rb+") as f:
+        f.truncate(os.path.getsize(path + "2") - 1)
+    with pytest.raises(RecordError):
+        list(read_games(path + "2"))
+    with pytest.raises(RecordError):
+        GameRecord.count_games(path + "2")
+    # a game header cut short
+    with open(path + "2", "rb+") as f:
+        f.truncate(GameRecord.FILE_HEADER.size + 1)
+    with pytest.raises(RecordError):
+        list(read_games(path + "2"))
+    with pytest.raises(RecordError):
+        GameRecord.count_games(path + "2")
+
+
+# testing GameRecord.replay
+# -------------------------
+def test_replay():
+    first, moves = random_game(3)
+    positions = list(replay(first, moves))
+    assert len(positions) == len(moves)
+    assert positions[0][0] == BitBoard.start()
+    assert positions[0][1] == first and positions[1][1] == 5 - first
+    assert [move for _, _, move in positions] == moves
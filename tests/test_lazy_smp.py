@@ -0,0 +1,96 @@
+import os
+import signal
+import sys
+import threading
+import time
+from multiprocessing import Pipe
+from multiprocessing.shared_memory import SharedMemory
+
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from BitBoard import BitBoard
+from Engine import WIN_BOUND
+from LazySMP import ParallelEngine, _helper
+from TranspositionTable import table_bytes
+from helpers import winning_board
+
+
+# testing ParallelEngine
+# ----------------------
+@pytest.mark.parametrize("workers", [1, 3])
+def test_finds_winning_push(workers):
+    with ParallelEngine(time_limit=5.0, workers=workers, max_depth=3,
+                        tt_size_mb=1) as engine:
+        user_data, orientation = engine.get_move(winning_board(), 2)
+        assert (user_data, orientation) == (("F3",), "SW")
+        assert engine.score >= WIN_BOUND
+
+
+def test_shared_table_between_moves():
+    with ParallelEngine(time_limit=0.2, workers=2, tt_size_mb=1) as engine:
+        for color in (2, 3):
+            move = engine.search(BitBoard.start(), color)
+            assert move in BitBoard.start().generate_moves(color)
+            assert engine.depth >= 1
+            assert engine.nodes > engine.engine.nodes
+        helper = engine.helpers[0][0]
+    assert engine.shm is None
+    assert not helper.is_alive()
+
+
+def test_helper_deadline():
+    shm = SharedMemory(create=True, size=table_bytes(1))
+    conn, child_conn = Pipe()
+    helper = threading.Thread(target=_helper,
+                              args=(shm.name, 1, 64, 1, child_conn))
+    helper.start()
+    try:
+        start = BitBoard.start()
+        # the deadline is absolute and passed already: the helper
+        # answers right away instead of searching to max_depth
+        conn.send((1, start.red, start.green, 2, time.time() - 1.0))
+        assert conn.poll(1.0)
+        number, move = conn.recv()[:2]
+        assert number == 1
+        assert move in start.generate_moves(2)
+    finally:
+        conn.send(None)
+        helper.join()
+        shm.close()
+        shm.unlink()
+
+
+def test_dead_helper():
+    with ParallelEngine(time_limit=0.1, workers=3, tt_size_mb=1) as engine:
+        engine.search(BitBoard.start(), 2)
+        process = engine.helpers[0][0]
+        process.kill()
+        process.join()
+        move = engine.search(BitBoard.start(), 3)
+        assert move in BitBoard.start().generate_moves(3)
+        # started again for the next searches
+        assert engine.helpers[0][0] is not process
+        assert engine.helpers[0][0].is_alive()
+        move = engine.search(BitBoard.start(), 2)
+        assert move in BitBoard.start().generate_moves(2)
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGSTOP"), reason="POSIX only")
+def test_late_helper():
+    with ParallelEngine(time_limit=0.2, workers=2, tt_size_mb=1) as engine:
+        engine.search(BitBoard.start(), 2)
+        pid = engine.helpers[0][0].pid
+        os.kill(pid, signal.SIGSTOP)
+        try:
+            start = time.perf_counter()
+            move = engine.search(BitBoard.start(), 3)
+            # the main search does not wait for the stopped helper
+            assert time.perf_counter() - start < 0.2 + 0.15
+            assert move in BitBoard.start().generate_moves(3)
+        finally:
+            os.kill(pid, signal.SIGCONT)
+        # its late result is skipped, not taken for the next one
+        move = engine.search(BitBoard.start(), 2)
+        assert move in BitBoard.start().generate_moves(2)
+        assert engine.nodes > engine.engine.nodes
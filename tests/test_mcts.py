@@ -0,0 +1,40 @@
+import os
+import random
+import sys
+
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from BitBoard import BitBoard
+from MCTS import MCTSPlayer, rollout, uct_search, winner
+from helpers import winning_board
+
+
+# testing rollout(position, color, rng)
+# -------------------------------------
+def test_rollout_is_side_effect_free():
+    position = BitBoard.start()
+    result = rollout(position, 2, random.Random(0))
+    assert 0.0 <= result <= 1.0
+    assert position == BitBoard.start()
+
+
+# testing uct_search / MCTSPlayer
+# -------------------------------
+def test_finds_winning_push():
+    position = BitBoard.from_board(winning_board())
+    stats = uct_search(position, 2, 10.0, max_playouts=100, seed=0)
+    best = max(stats, key=lambda move: stats[move][0])
+    assert winner(position.apply(best, 2)) == 2
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_player(workers):
+    player = MCTSPlayer(time_limit=10.0, workers=workers, max_playouts=50,
+                        seed=0)
+    try:
+        move = player.search(BitBoard.start(), 3)
+    finally:
+        player.close()
+    assert move in BitBoard.start().generate_moves(3)
+    assert player.playouts == 50 * workers
@@ -0,0 +1,68 @@
+import os
+import sys
+
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import Notation
+from BitBoard import BitBoard
+from Board import Board
+from Notation import from_text, pack, to_text, unpack
+from helpers import random_positions
+
+
+# testing Notation.to_text and Notation.from_text
+# -----------------------------------------------
+def test_start_text():
+    text = "rrrrr/rrrrrr/2rrr2/8/9/8/2ggg2/gggggg/ggggg r"
+    assert to_text(BitBoard.start(), 2) == text
+    assert from_text(text) == (BitBoard.start(), 2)
+
+
+def test_text_round_trip():
+    for position, color in random_positions(50):
+        assert from_text(to_text(position, color)) == (position, color)
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "rrrrr/rrrrrr/2rrr2/8/9/8/2ggg2/gggggg/ggggg",
+    "rrrrr/rrrrrr/2rrr2/8/9/8/2ggg2/gggggg/ggggg x",
+    "rrrrr/rrrrrr/2rrr2/8/9/8/2ggg2/gggggg r",
+    "rrrrrr/rrrrrr/2rrr2/8/9/8/2ggg2/gggggg/ggggg r",
+    "rrrr/rrrrrr/2rrr2/8/9/8/2ggg2/gggggg/ggggg r",
+    "rrrrr/rrrrrr/2rxr2/8/9/8/2ggg2/gggggg/ggggg g",
+])
+def test_invalid_text(text):
+    with pytest.raises(ValueError):
+        from_text(text)
+
+
+# testing Notation.pack and Notation.unpack
+# -----------------------------------------
+def test_pack_round_trip():
+    for position, color in random_positions(50, seed=1):
+        data = pack(position, color)
+        assert len(data) == Notation.PACKED_SIZE
+        assert unpack(data) == (position, color)
+
+
+def test_pack_side_to_move():
+    start = BitBoard.start()
+    assert pack(start, 2) != pack(start, 3)
+    assert unpack(pack(start, 3))[1] == 3
+
+
+def test_invalid_packed():
+    with pytest.raises(ValueError):
+        unpack(b"\x00" * 12)
+    with pytest.raises(ValueError):
+        unpack(b"\xff" * Notation.PACKED_SIZE)
+
+
+def test_board_round_trip():
+    B = Board()
+    assert B.make_move(BitBoard.start().generate_moves(3)[0])
+    position, color = unpack(pack(BitBoard.from_board(B), 2))
+    assert position.to_list() == B.board
+    assert position.marbles == B.marbles
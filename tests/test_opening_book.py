@@ -0,0 +1,94 @@
+import os
+import sys
+
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import OpeningBook
+from BitBoard import BitBoard
+from Engine import Engine
+from GameRecord import GameWriter
+from OpeningBook import build
+from Symmetry import map_move, transform
+from helpers import random_game
+
+
+def make_book(tmp_path, games, min_games=1, plies=20):
+    """Write games to a record file and build a book from it."""
+    records = str(tmp_path / "games.abr")
+    if os.path.exists(records):
+        os.remove(records)
+    with GameWriter(records) as writer:
+        for first, moves, winner in games:
+            writer.append(first, moves, winner)
+    path = str(tmp_path / "book.bin")
+    build([records], path, plies, min_games)
+    return path
+
+
+# testing OpeningBook.build and OpeningBook.lookup
+# ------------------------------------------------
+def test_lookup(tmp_path):
+    first, moves = random_game(0)
+    path = make_book(tmp_path, [(first, moves, first),
+                                (first, moves, 5 - first),
+                                (first, moves, 0)])
+    start = BitBoard.start()
+    with OpeningBook.OpeningBook(path) as book:
+        assert book.lookup(start, first) == [(moves[0], 3, 1, 1)]
+        second = start.apply(moves[0], first)
+        assert book.lookup(second, 5 - first) == [(moves[1], 3, 1, 1)]
+        assert book.lookup(start, 5 - first) != []  # color swap
+        assert book.lookup(second, first) == []
+
+
+def test_symmetric_lookup(tmp_path):
+    first, moves = random_game(1)
+    path = make_book(tmp_path, [(first, moves, first)])
+    position = BitBoard.start().apply(moves[0], first)
+    with OpeningBook.OpeningBook(path) as book:
+        for s in range(12):
+            assert book.lookup(transform(position, s), 5 - first) == \
+                [(map_move(moves[1], s), 1, 0, 0)]
+
+
+def test_plies_and_min_games(tmp_path):
+    games = [random_game(seed) + (0,) for seed in range(3)]
+    path = make_book(tmp_path, games, min_games=1, plies=4)
+    with OpeningBook.OpeningBook(path) as book:
+        assert book.size <= 3 * 4
+        size = book.size
+    path = make_book(tmp_path, games, min_games=2, plies=4)
+    with OpeningBook.OpeningBook(path) as book:
+        assert book.size < size
+
+
+def test_invalid_book(tmp_path):
+    path = str(tmp_path / "book.bin")
+    with open(path, "wb") as f:
+        f.write(b"not a book at all")
+    with pytest.raises(ValueError):
+        OpeningBook.OpeningBook(path)
+
+
+# testing OpeningBook.choose and the engine
+# -----------------------------------------
+def test_choose(tmp_path):
+    first, moves = random_game(2)
+    other = random_game(3)[1]
+    games = [(first, moves, first)] * 3 + [(first, other, 5 - first)] * 3
+    path = make_book(tmp_path, games)
+    start = BitBoard.start()
+    with OpeningBook.OpeningBook(path) as book:
+        if moves[0] != other[0]:
+            assert book.choose(start, first) == moves[0]
+        assert book.choose(start.apply(moves[0], first), first) == 0
+
+
+def test_engine_book(tmp_path):
+    first, moves = random_game(4)
+    path = make_book(tmp_path, [(first, moves, first)])
+    with OpeningBook.OpeningBook(path) as book:
+        engine = Engine(time_limit=0.05, book=book)
+        assert engine.search(BitBoard.start(), first) == moves[0]
+        assert engine.nodes == 0
@@ -0,0 +1,40 @@
+import os
+import sys
+
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from Board import Board
+from Perft import perft, perft_board, position
+
+# pinned node counts, depths 1 to 3
+NODES = {
+    "start": (102, 10404, 1021020),
+    "belgian_daisy": (98, 9630, 919842),
+    "sumito": (53, 3992, 243602),
+    "edge": (49, 440, 12389),
+}
+
+
+# testing perft(position, color, depth)
+# -------------------------------------
+@pytest.mark.parametrize("name", list(NODES))
+@pytest.mark.parametrize("depth", [1, 2, 3])
+def test_perft(name, depth):
+    root, color = position(name)
+    assert perft(root, color, depth) == NODES[name][depth - 1]
+
+
+# testing perft_board(board, color, depth)
+# ----------------------------------------
+@pytest.mark.parametrize("name", list(NODES))
+@pytest.mark.parametrize("depth", [1, 2])
+def test_perft_board(name, depth):
+    root, color = position(name)
+    tB = Board()
+    tB.board = root.to_list()
+    tB.marbles = root.marbles
+    tB.hash = tB.compute_hash()
+    assert perft_board(tB, color, depth) == NODES[name][depth - 1]
+    # the tree walk leaves the board as it was
+    assert tB.board == root.to_list() and not tB.history
@@ -0,0 +1,157 @@
+import io
+import os
+import sys
+
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import Moves
+from Board import Board
+from Renderer import HEIGHT, POSITIONS, Renderer, glyphs, watch
+from Tournament import RandomPlayer
+from helpers import random_game
+
+
+def rendered(board, color=False):
+    """Full frame of a board, as a string."""
+    out = io.StringIO()
+    Renderer(out, color=color).draw(board)
+    return out.getvalue()
+
+
+# testing Renderer.draw(board)
+# ----------------------------
+def test_draw():
+    text = rendered(Board())
+    lines = text.splitlines()
+    assert len(lines) == HEIGHT
+    assert "\x1b" not in text
+    assert lines[1] == "     A # # # # #"
+    assert lines[5] == " E o o o o o o o o o"
+    assert lines[9] == "     I x x x x x 6"
+    assert text.count("#") == text.count("x") == 14
+    for (r, c), (line, column) in POSITIONS.items():
+        assert lines[line][column] == "o#x"[Board().board[r][c] - 1]
+
+
+def test_glyphs_cached():
+    assert glyphs(True) is glyphs(True)
+    assert glyphs(False)[0] == (" ", "o", "#", "x")
+
+
+# testing Renderer.update(board, spots)
+# -------------------------------------
+def test_update_changed_cells_only():
+    out = io.StringIO()
+    renderer = Renderer(out, color=False, incremental=True)
+    board = Board()
+    renderer.draw(board)
+    full = len(out.getvalue())
+    out.seek(0)
+    out.truncate()
+
+    undo = board.make_move(Moves.from_user_data(("C5",), "E"))
+    spots = [(r, c) for r, c, _ in undo[3]]
+    assert renderer.update(board, spots) == 2  # C5 emptied, C8 filled
+    assert len(out.getvalue()) < full // 4
+    # nothing changed since
+    assert renderer.update(board) == 0
+
+
+def test_update_not_incremental():
+    out = io.StringIO()
+    renderer = Renderer(out, color=False, incremental=False)
+    board = Board()
+    renderer.draw(board)
+    board.make_move(Moves.from_user_data(("C5",), "E"))
+    assert renderer.update(board) == -1
+    assert out.getvalue().endswith(rendered(board))
+
+    renderer = Renderer(io.StringIO(), color=False, incremental=True)
+    assert renderer.update(board) == -1
+    renderer.invalidate()
+    assert renderer.update(board) == -1
+
+
+# testing watch(renderer, first, players, moves)
+# ----------------------------------------------
+def emulate(text):
+    """Lines of a terminal after printing text (cursor moves included)."""
+    screen, line, column = [[]], 0, 0
+    i = 0
+    while i < len(text):
+        if text.startswith("\x1b[", i):
+            j = i + 2
+            while not text[j].isalpha():
+                j += 1
+            arg, code = text[i + 2:j], text[j]
+            if code == "A":
+                line -= int(arg)
+            elif code == "B":
+                line += int(arg)
+            elif code == "G":
+                column = int(arg) - 1
+            elif code == "K":
+                screen[line] = []
+            i = j + 1
+            continue
+        char, i = text[i], i + 1
+        if char == "\r":
+            column = 0
+        elif char == "\n":
+            line, column = line + 1, 0
+        else:
+            row = screen[line]
+            row.extend(" " * (column + 1 - len(row)))
+            row[column] = char
+            column += 1
+        screen.extend([] for _ in range(line + 1 - len(screen)))
+    return ["".join(row).rstrip() for row in screen if row]
+
+
+def test_watch_screen_matches_board():
+    first, moves = random_game(3, plies=80)
+    out = io.StringIO()
+    renderer = Renderer(out, color=False, incremental=True)
+    watch(renderer, first, moves=moves, max_plies=None, repetitions=None)
+    board = Board()
+    for move in moves:
+        board.make_move(move)
+    assert emulate(out.getvalue()) == rendered(board).splitlines()
+
+
+def test_watch_players():
+    players = {2: RandomPlayer(0), 3: RandomPlayer(1)}
+    winner = watch(Renderer(io.StringIO()), 2, players, max_plies=20)
+    assert winner in (0, 2, 3)
+
+
+def test_watch_replays_to_the_end():
+    """A record is not adjudicated: it is shown to its last move."""
+    first = 2
+    shuffle = [Moves.from_user_data(("C7",), "E"),
+               Moves.from_user_data(("G3",), "W"),
+               Moves.from_user_data(("C8",), "W"),
+               Moves.from_user_data(("G2",), "E")]
+    # 441 plies, the start position coming back 110 times
+    moves = shuffle * 110 + shuffle[:1]
+    out = io.StringIO()
+    assert watch(Renderer(out, color=False, incremental=True), first,
+                 moves=moves) == 0
+    board = Board(first)
+    for move in moves:
+        board.make_move(move)
+    assert board.board != Board().board
+    assert emulate(out.getvalue()) == rendered(board).splitlines()
+
+
+def test_watch_illegal_record():
+    """A move of the wrong color stops the replay before it is drawn."""
+    moves = [Moves.from_user_data(("C7",), "E"),
+             Moves.from_user_data(("C8",), "W")]  # red again
+    out = io.StringIO()
+    with pytest.raises(ValueError):
+        watch(Renderer(out, color=False, incremental=True), 2, moves=moves)
+    board = Board()
+    board.make_move(moves[0])
+    assert emulate(out.getvalue()) == rendered(board).splitlines()
@@ -0,0 +1,115 @@
+import os
+import subprocess
+import sys
+
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import Rules
+from Board import Board
+from Geometry import DIRECTION_INDEX
+
+
+def sample_board():
+    """Same test board as test_board.py."""
+    tB = Board()
+    tB.board[6][4] = 2
+    tB.board[5][3] = 2
+    tB.board[7][4] = 2
+    tB.board[6][3] = 2
+    tB.board[6][5] = 2
+    tB.board[5][4] = 3
+    return tB
+
+
+# testing Rules.push(board, friend, r, c, direction)
+# --------------------------------------------------
+@pytest.mark.parametrize("friend, user_data, orientation, expected_code", [
+    (3, "I1", "NW", Rules.OK),
+    (2, "A7", "E", Rules.SUICIDE),
+    (3, "I3", "NW", Rules.OK),
+    (3, "I2", "NW", Rules.ILLEGAL_SUMITO),
+    (3, "H4", "NW", Rules.ILLEGAL_SUMITO),
+    (3, "I1", "E", Rules.TOO_MANY),
+])
+def test_push(friend, user_data, orientation, expected_code, capsys):
+    tB = sample_board()
+    r, c = tB.to_2d_list(user_data)
+    code, new_data = Rules.push(tB.board, friend, r, c,
+                                DIRECTION_INDEX[orientation])
+    assert code == expected_code
+    assert bool(new_data) == (code >= 0)
+    # silent and side-effect free
+    assert capsys.readouterr().out == ""
+    assert tB.board == sample_board().board
+
+
+def test_ejection():
+    tB = sample_board()
+    r, c = tB.to_2d_list("F3")
+    code, new_data = Rules.push(tB.board, 2, r, c, DIRECTION_INDEX["SW"])
+    assert code == Rules.EJECTION
+    assert new_data == {(6, 4): 1, (7, 4): 2, (8, 4): 2}
+
+
+# testing Rules.free(board, friend, spots, direction)
+# ---------------------------------------------------
+@pytest.mark.parametrize("friend, user_data, orientation, expected_code", [
+    (2, ("C5", "C6", "C7"), "SE", Rules.OK),
+    (3, ("G4", "G5"), "NW", Rules.NOT_EMPTY),
+    (2, ("A5", "B5"), "NW", Rules.NOT_EMPTY),
+    (2, ("A6", "A7"), "NW", Rules.SUICIDE),
+])
+def test_free(friend, user_data, orientation, expected_code):
+    tB = sample_board()
+    spots = [tB.to_2d_list(e) for e in user_data]
+    code, _ = Rules.free(tB.board, friend, spots,
+                         DIRECTION_INDEX[orientation])
+    assert code == expected_code
+
+
+# testing Rules.winner(marbles)
+# -----------------------------
+@pytest.mark.parametrize("marbles, expected_winner", [
+    ({2: 14, 3: 14}, 0),
+    ({2: 9, 3: 8}, 2),
+    ({2: 7, 3: 12}, 3),
+])
+def test_winner(marbles, expected_winner):
+    assert Rules.winner(marbles) == expected_winner
+
+
+# testing Rules.Adjudicator
+# -------------------------
+def test_adjudicator_repetition():
+    adjudicator = Rules.Adjudicator(max_plies=None, repetitions=3)
+    adjudicator.reset(1)
+    assert [adjudicator.record(k) for k in (2, 1, 2)] == [None] * 3
+    assert adjudicator.record(1) == Rules.REPETITION
+
+
+def test_adjudicator_ejection():
+    adjudicator = Rules.Adjudicator(max_plies=None, repetitions=2)
+    adjudicator.reset(1)
+    assert adjudicator.record(2, ejection=True) is None
+    # the position before the ejection cannot come back
+    assert adjudicator.history == {2: 1}
+    assert adjudicator.record(2) == Rules.REPETITION
+
+
+def test_adjudicator_max_plies():
+    adjudicator = Rules.Adjudicator(max_plies=3, repetitions=None)
+    assert [adjudicator.record(0) for _ in range(3)] == \
+        [None, None, Rules.MAX_PLIES]
+
+
+# testing the module dependencies
+# -------------------------------
+def test_board_does_not_load_engines():
+    src = os.path.join(os.path.dirname(__file__), "..", "src")
+    code = ("import sys, Board, Rules; "
+            "print(sorted({'Engine', 'MCTS', 'LazySMP', 'OpeningBook', "
+            "'multiprocessing'} & set(sys.modules)))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=src, check=True,
+                         capture_output=True, text=True).stdout
+    assert out.strip() == "[]"
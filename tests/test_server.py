@@ -0,0 +1,217 @@
+import asyncio
+import os
+import sys
+
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import Rules
+import Server
+from Server import MAX_LINE, MAX_PENDING, Connection, Game, GameServer
+
+
+async def connect(server):
+    """Open a client connection to a listening server."""
+    host, port = server.sockets[0].getsockname()[:2]
+    return await asyncio.open_connection(host, port)
+
+
+async def ask(reader, writer, line):
+    """Send a command and return the next line received."""
+    writer.write(line.encode() + b"\n")
+    await writer.drain()
+    return await receive(reader)
+
+
+async def receive(reader):
+    return (await asyncio.wait_for(reader.readline(), 5)).decode().strip()
+
+
+async def start_game(server):
+    """Two clients joining the same game, by color."""
+    (r1, w1), (r2, w2) = await connect(server), await connect(server)
+    assert await ask(r1, w1, "JOIN g") == "WAIT g"
+    start2 = (await ask(r2, w2, "join g")).split()
+    start1 = (await receive(r1)).split()
+    assert start1[:2] == start2[:2] == ["START", "g"]
+    assert start1[3] == start2[3]
+    clients = {start1[2]: (r1, w1), start2[2]: (r2, w2)}
+    assert set(clients) == {"red", "green"}
+    return clients, start1[3]
+
+
+def run(test):
+    """Run a test coroutine against a server on a free port."""
+    async def main():
+        game_server = GameServer(seed=0)
+        server = await game_server.start(port=0)
+        async with server:
+            await test(game_server, server)
+            # let the server see the clients leave
+            while game_server.connections:
+                await asyncio.sleep(0.01)
+    asyncio.run(main())
+
+
+# testing GameServer
+# ------------------
+def test_join_and_move():
+    async def test(game_server, server):
+        clients, first = await start_game(server)
+        second = "green" if first == "red" else "red"
+        reader, writer = clients[first]
+        move = "MOVE C5 E" if first == "red" else "MOVE g3 e"
+        moved = await ask(reader, writer, move)
+        assert moved.startswith(f"MOVED {first} ")
+        assert await receive(clients[second][0]) == moved
+        # not the turn of first anymore
+        assert await ask(reader, writer, move) == "ERR not your turn"
+        reader, writer = clients[second]
+        assert (await ask(reader, writer, "MOVE E5 E")) == "ERR illegal move"
+        assert (await ask(reader, writer, "MOVE Z9 E")).startswith("ERR")
+        board = await ask(reader, writer, "BOARD")
+        assert board.startswith("BOARD ") and board.endswith(second[0])
+        for _, writer in clients.values():
+            writer.close()
+    run(test)
+
+
+def test_leave_and_disconnect():
+    async def test(game_server, server):
+        clients, _ = await start_game(server)
+        reader, writer = clients["red"]
+        assert await ask(reader, writer, "LEAVE") == "END green resign"
+        assert await receive(clients["green"][0]) == "END green resign"
+        assert game_server.games == {}
+
+        clients, _ = await start_game(server)
+        clients["green"][1].close()
+        assert await receive(clients["red"][0]) == "END red forfeit"
+        for _, writer in clients.values():
+            writer.close()
+    run(test)
+
+
+def test_bad_commands():
+    async def test(game_server, server):
+        reader, writer = await connect(server)
+        assert (await ask(reader, writer, "HELLO")).startswith("ERR")
+        assert await ask(reader, writer, "MOVE A1 E") == "ERR not playing"
+        # lines longer than MAX_LINE close the connection
+        writer.write(b"X" * (2 * MAX_LINE) + b"\n")
+        assert await reader.readline() == b""
+        writer.close()
+    run(test)
+
+
+def test_unix_socket(tmp_path):
+    if not hasattr(asyncio, "start_unix_server"):
+        pytest.skip("no Unix sockets")
+
+    async def main():
+        path = str(tmp_path / "abalone.sock")
+        game_server = GameServer()
+        server = await game_server.start(path=path)
+        async with server:
+            reader, writer = await asyncio.open_unix_connection(path)
+            assert await ask(reader, writer, "JOIN u") == "WAIT u"
+            writer.close()
+            while game_server.connections:
+                await asyncio.sleep(0.01)
+        assert game_server.games == {}
+    asyncio.run(main())
+
+
+def test_many_games():
+    async def test(game_server, server):
+        async def player(name):
+            reader, writer = await connect(server)
+            await ask(reader, writer, f"JOIN {name}")
+            return reader, writer
+        connections = await asyncio.gather(*(player(f"g{i // 2}")
+                                             for i in range(200)))
+        assert len(game_server.games) == 100
+        assert all(game.players for game in game_server.games.values())
+        for _, writer in connections:
+            writer.close()
+    run(test)
+
+
+class StuckWriter():
+    """Writer of a client that stopped reading: drain never returns."""
+
+    def __init__(self):
+        self.aborted = False
+        self.transport = self
+
+    def write(self, data):
+        pass
+
+    async def drain(self):
+        await asyncio.Event().wait()
+
+    def close(self):
+        pass
+
+    def abort(self):
+        self.aborted = True
+
+
+def test_close_stuck_client(monkeypatch):
+    monkeypatch.setattr(Server, "CLOSE_TIMEOUT", 0.05)
+
+    async def main():
+        conn = Connection(StuckWriter())
+        sender = asyncio.create_task(conn.write_lines())
+        for i in range(MAX_PENDING + 1):
+            await conn.send(f"line {i}")
+        # an opponent waiting on the full queue
+        blocked = asyncio.create_task(conn.send("END red forfeit"))
+        await asyncio.sleep(0)
+        await asyncio.wait_for(conn.close(sender), 1)
+        await asyncio.wait_for(blocked, 1)
+        assert conn.writer.aborted and sender.cancelled()
+        # nothing waits on a closed connection
+        await asyncio.wait_for(conn.send("late"), 1)
+    asyncio.run(main())
+
+
+def test_end_once():
+    async def main():
+        game_server = GameServer(seed=0)
+        players = [Connection(StuckWriter()) for _ in range(2)]
+        game = Game("g", None, Rules.Adjudicator())
+        game.players = {2: players[0], 3: players[1]}
+        game_server.games["g"] = game
+        for player in players:
+            player.game = game
+        game_server.end(game, "red", "resign")
+        # a new game of the same name is left alone
+        other = Game("g", players[0], Rules.Adjudicator())
+        game_server.games["g"] = other
+        game_server.end(game, "draw", "repetition")
+        assert game_server.games == {"g": other}
+        assert [p.queue.qsize() for p in players] == [1, 1]
+    asyncio.run(main())
+
+
+def test_move_does_not_wait_on_opponent():
+    async def main():
+        game_server = GameServer(seed=0)
+        red, green = (Connection(StuckWriter()) for _ in range(2))
+        game = Game("g", None, Rules.Adjudicator())
+        game.players = {2: red, 3: green}
+        game.color = 2
+        game_server.games["g"] = game
+        for color, player in game.players.items():
+            player.game, player.color = game, color
+        # green stopped reading
+        for i in range(MAX_PENDING):
+            green.queue.put_nowait(f"line {i}")
+        await asyncio.wait_for(game_server.move(red, "C5 E"), 1)
+        assert red.queue.get_nowait().startswith("MOVED red ")
+        assert green.closed and green.writer.aborted
+        # its handler then ends the game
+        game_server.leave(green, "forfeit")
+        assert red.queue.get_nowait() == "END red forfeit"
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+import os
+import sys
+
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import Symmetry
+from BitBoard import BitBoard
+from Geometry import DIRECTION_INDEX, from_coords
+from Symmetry import (CELL_MAP, INVERSE, NUM_SYMMETRIES, canonical,
+                      canonical_key, map_move, transform)
+from helpers import random_positions
+
+
+# testing the permutation tables
+# ------------------------------
+def test_permutations():
+    assert CELL_MAP[0] == tuple(range(61))
+    for s in range(NUM_SYMMETRIES):
+        assert sorted(CELL_MAP[s]) == list(range(61))
+        assert sorted(Symmetry.DIRECTION_MAP[s]) == list(range(6))
+        assert CELL_MAP[s][from_coords("E5")] == from_coords("E5")
+    assert len(set(CELL_MAP)) == NUM_SYMMETRIES
+
+
+def test_rotation():
+    E, SE = DIRECTION_INDEX["E"], DIRECTION_INDEX["SE"]
+    assert Symmetry.DIRECTION_MAP[1][E] == SE
+    # corners go round the board
+    assert CELL_MAP[1][from_coords("A5")] == from_coords("A9")
+    assert CELL_MAP[1][from_coords("A9")] == from_coords("E9")
+
+
+def test_inverse():
+    for s in range(NUM_SYMMETRIES):
+        position = BitBoard.start()
+        assert transform(transform(position, s), INVERSE[s]) == position
+
+
+# testing Symmetry.map_move
+# -------------------------
+@pytest.mark.parametrize("s", range(NUM_SYMMETRIES))
+def test_map_move(s):
+    for position, color in random_positions(10, seed=s):
+        image = transform(position, s)
+        moves = position.generate_moves(color)
+        assert ({map_move(m, s) for m in moves}
+                == set(image.generate_moves(color)))
+        for move in moves:
+            assert (image.apply(map_move(move, s), color)
+                    == transform(position.apply(move, color), s))
+            assert map_move(map_move(move, s), INVERSE[s]) == move
+
+
+# testing Symmetry.canonical
+# --------------------------
+def test_canonical():
+    for position, color in random_positions(20, seed=3):
+        canon, s, swapped = canonical(position, color)
+        assert swapped == (color == 3)
+        key = canonical_key(position, color)
+        for t in range(NUM_SYMMETRIES):
+            image = transform(position, t)
+            assert canonical(image, color)[0] == canon
+            assert canonical_key(image, color) == key
+        swap = BitBoard(position.green, position.red)
+        assert canonical(swap, 5 - color)[0] == canon
+
+
+def test_canonical_moves():
+    for position, color in random_positions(5, seed=4):
+        canon, s, swapped = canonical(position, color)
+        for move in canon.generate_moves(2)[:20]:
+            back = map_move(move, INVERSE[s])
+            assert back in position.generate_moves(color)
@@ -0,0 +1,159 @@
+import json
+import os
+import sys
+
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import GameRecord
+import Tournament
+from BitBoard import BitBoard
+from Evaluation import evaluate
+from helpers import random_positions, winning_board
+
+
+def crashing_game(game, spec_a, spec_b, seed, max_plies=400, repetitions=3):
+    """Kill the worker the first time game 1 is played."""
+    marker = os.path.join(os.environ["TOURNAMENT_TMP"], f"crash{game}")
+    if game == 1 and not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return {"game": game, "winner": None, "winner_engine": None,
+            "plies": 0}
+
+
+class ShufflePlayer():
+    """Move a marble forth, then back to where it was, forever."""
+
+    def __init__(self):
+        self.previous = None
+
+    def search(self, position, color):
+        moves = position.generate_moves(color)
+        back = [m for m in moves
+                if position.apply(m, color).pieces(color) == self.previous]
+        self.previous = position.pieces(color)
+        return back[0] if back else moves[0]
+
+
+# testing Tournament.GreedyPlayer
+# -------------------------------
+def test_greedy_player():
+    player = Tournament.make_player("greedy", seed=0)
+    for position, color in random_positions(20, seed=3):
+        move = player.search(position, color)
+        scores = [evaluate(position.apply(m, color), color)
+                  for m in position.generate_moves(color)]
+        assert evaluate(position.apply(move, color), color) == max(scores)
+    position = BitBoard.from_board(winning_board())
+    assert position.apply(player.search(position, 2), 2).marbles[3] == 8
+
+
+# testing Tournament.play_game
+# ----------------------------
+def test_play_game():
+    result = Tournament.play_game(0, "random", "random", seed=1,
+                                  max_plies=50)
+    assert result["first"] in ("red", "green")
+    assert result["plies"] <= 50
+    assert result["winner"] in ("red", "green", None)
+    assert set(result["time_per_move"]) == {"red", "green"}
+
+
+def test_ordering_summary():
+    results = [Tournament.play_game(game, "alphabeta:0.02", "random",
+                                    seed=game, max_plies=6)
+               for game in range(2)]
+    for result in results:
+        # only the alpha-beta search counts its cutoffs
+        color = "red" if result["red"] == "alphabeta:0.02" else "green"
+        stats = result["ordering"]
+        assert set(stats) == {color}
+        assert 0 <= stats[color]["first_cutoffs"] <= stats[color]["cutoffs"]
+    lines = Tournament.summary(results, "alphabeta:0.02",
+                               "random").splitlines()
+    assert len(lines) == 2
+    assert lines[1].startswith("alphabeta:0.02 (a): first move cutoffs ")
+    assert "branching factor" in lines[1]
+
+
+@pytest.mark.parametrize("repetitions, max_plies, draw, plies", [
+    (3, 400, "repetition", 12),
+    (None, 30, "max plies", 30),
+])
+def test_play_game_draw(monkeypatch, repetitions, max_plies, draw, plies):
+    monkeypatch.setattr(Tournament, "make_player",
+                        lambda spec, seed=None: ShufflePlayer())
+    result = Tournament.play_game(0, "random", "random", seed=1,
+                                  max_plies=max_plies,
+                                  repetitions=repetitions)
+    assert result["winner"] is None
+    assert result["draw"] == draw
+    assert result["plies"] <= plies
+
+
+# testing Tournament.run
+# ----------------------
+def test_run_and_resume(tmp_path):
+    output = str(tmp_path / "results.jsonl")
+    results = Tournament.run(4, "random", "random", output, workers=2,
+                             max_plies=20)
+    assert sorted(r["game"] for r in results) == [0, 1, 2, 3]
+    # finished games are not played again
+    assert Tournament.run(6, "random", "random", output, workers=2,
+                          max_plies=20)[0]["game"] >= 4
+    with open(output) as f:
+        assert sorted(json.loads(line)["game"] for line in f) == \
+            list(range(6))
+
+
+def test_worker_crash(tmp_path, monkeypatch):
+    monkeypatch.setenv("TOURNAMENT_TMP", str(tmp_path))
+    monkeypatch.setattr(Tournament, "play_game", crashing_game)
+    output = str(tmp_path / "results.jsonl")
+    results = Tournament.run(4, "random", "random", output, workers=2)
+    assert sorted(r["game"] for r in results) == [0, 1, 2, 3]
+    assert all("error" not in r for r in results)
+
+
+def test_records(tmp_path):
+    output = str(tmp_path / "results.jsonl")
+    records = str(tmp_path / "games.abr")
+    results = Tournament.run(2, "random", "random", output, workers=1,
+                             max_plies=10, records=records)
+    games = list(GameRecord.read_games(records))
+    assert len(games) == 2
+    assert sorted(len(moves) for _, _, moves in games) == \
+        sorted(r["plies"] for r in results)
+    assert all("moves" not in r for r in results)
+
+
+def test_errors_are_played_again(tmp_path):
+    output = str(tmp_path / "results.jsonl")
+    with open(output, "w") as f:
+        f.write(json.dumps({"game": 0, "error": "worker crashed"}) + "\n")
+        f.write(json.dumps({"game": 1, "winner": None}) + "\n")
+        f.write('{"game": 2, "win')  # cut by an interrupted run
+    assert Tournament.finished_games(output) == {1}
+    results = Tournament.run(3, "random", "random", output, workers=1,
+                             max_plies=10)
+    assert sorted(r["game"] for r in results) == [0, 2]
+    assert Tournament.finished_games(output) == {0, 1, 2}
+
+
+def test_records_closed_on_error(tmp_path, monkeypatch):
+    closed = []
+
+    class Writer(GameRecord.GameWriter):
+        def close(self):
+            closed.append(True)
+            super().close()
+
+    def failing_wait(*args, **kwargs):
+        raise KeyboardInterrupt
+    monkeypatch.setattr(Tournament, "GameWriter", Writer)
+    monkeypatch.setattr(Tournament, "wait", failing_wait)
+    with pytest.raises(KeyboardInterrupt):
+        Tournament.run(2, "random", "random", str(tmp_path / "r.jsonl"),
+                       workers=1, records=str(tmp_path / "games.abr"))
+    assert closed == [True]
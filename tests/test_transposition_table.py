@@ -0,0 +1,69 @@
+import os
+import sys
+
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from TranspositionTable import (EXACT, LOWER, UPPER, BYTES_PER_BUCKET,
+                                TranspositionTable, pack, table_bytes,
+                                unpack)
+
+
+# testing pack(depth, score, bound, move) / unpack(data)
+# ------------------------------------------------------
+@pytest.mark.parametrize("depth, score, bound, move", [
+    (0, 0, EXACT, 0),
+    (12, -5000, LOWER, 0x1ABC),
+    (255, 100000, UPPER, 0xFFFF),
+])
+def test_pack(depth, score, bound, move):
+    assert unpack(pack(depth, score, bound, move, age=7)) == \
+        (depth, score, bound, move)
+
+
+# testing TranspositionTable
+# --------------------------
+def test_size():
+    tt = TranspositionTable(size_mb=1)
+    assert tt.size * BYTES_PER_BUCKET == 2 ** 20
+    assert len(tt.table) * 8 == 2 ** 20
+
+
+def test_store_probe():
+    tt = TranspositionTable(size_mb=0.01)
+    key = 0xDEADBEEFCAFEF00D
+    assert tt.probe(key) is None
+    tt.store(key, 4, 120, EXACT, 77)
+    assert tt.probe(key) == (4, 120, EXACT, 77)
+    # same bucket, other position
+    assert tt.probe(key ^ (1 << 63)) is None
+
+
+def test_replacement():
+    tt = TranspositionTable(size_mb=0.01)
+    deep, shallow, other = 5, 5 + tt.size, 5 + 2 * tt.size
+    tt.store(deep, 8, 1, EXACT, 1)
+    tt.store(shallow, 2, 2, EXACT, 2)
+    # the deep entry is kept, the shallow one took the other slot
+    assert tt.probe(deep) == (8, 1, EXACT, 1)
+    assert tt.probe(shallow) == (2, 2, EXACT, 2)
+    tt.store(other, 3, 3, EXACT, 3)
+    assert tt.probe(deep) is not None
+    assert tt.probe(shallow) is None
+    # stale entries can be replaced by any search
+    tt.new_search()
+    tt.store(shallow, 1, 4, EXACT, 4)
+    assert tt.probe(deep) is None
+    assert tt.probe(shallow) == (1, 4, EXACT, 4)
+
+
+def test_shared_buffer():
+    buffer = bytearray(table_bytes(0.01) + 100)
+    tt = TranspositionTable(size_mb=0.01, buffer=buffer)
+    other = TranspositionTable(size_mb=0.01, buffer=buffer)
+    tt.store(0xDEADBEEFCAFEF00D, 4, 120, EXACT, 77)
+    assert other.probe(0xDEADBEEFCAFEF00D) == (4, 120, EXACT, 77)
+    other.clear()
+    assert tt.probe(0xDEADBEEFCAFEF00D) is None
+    with pytest.raises(ValueError):
+        TranspositionTable(size_mb=1, buffer=buffer)
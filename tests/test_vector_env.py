@@ -0,0 +1,95 @@
+import os
+import sys
+
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+np = pytest.importorskip("numpy")
+
+import VectorEnv
+from BatchEvaluation import to_array
+from BitBoard import BitBoard
+from Geometry import BITS
+from VectorEnv import ACTIONS, N_ACTIONS, apply_actions, legal_mask
+from helpers import random_positions
+
+
+def padded(positions):
+    """(K, 62) boards of a list of BitBoards."""
+    batch = to_array(positions)
+    return np.concatenate((batch, np.zeros((len(batch), 1), np.int8)),
+                          axis=1)
+
+
+def to_bitboard(row):
+    """BitBoard of a row of VectorEnv.boards."""
+    return BitBoard(*(sum(1 << BITS[i] for i in np.flatnonzero(row[:61] == v))
+                      for v in (2, 3)))
+
+
+# testing the action tables
+# -------------------------
+def test_actions():
+    assert len(set(ACTIONS.tolist())) == N_ACTIONS
+    assert VectorEnv.N_PUSHES == 61 * 6
+    assert VectorEnv.ACTION_INDEX[int(ACTIONS[100])] == 100
+
+
+# testing VectorEnv.legal_mask and VectorEnv.apply_actions
+# --------------------------------------------------------
+def test_legal_mask():
+    positions = random_positions(100, seed=7)
+    boards = padded(p for p, _ in positions)
+    colors = np.array([c for _, c in positions], dtype=np.int8)
+    mask = legal_mask(boards, colors)
+    for (position, color), row in zip(positions, mask):
+        assert set(ACTIONS[row].tolist()) == \
+            set(position.generate_moves(color))
+
+
+def test_apply_actions():
+    rng = np.random.default_rng(0)
+    positions = random_positions(100, seed=8)
+    boards = padded(p for p, _ in positions)
+    colors = np.array([c for _, c in positions], dtype=np.int8)
+    mask = legal_mask(boards, colors)
+    actions = np.array([rng.choice(np.flatnonzero(row)) for row in mask])
+    apply_actions(boards, colors, actions)
+    for (position, color), action, row in zip(positions, actions, boards):
+        assert to_bitboard(row) == position.apply(int(ACTIONS[action]),
+                                                  color)
+    assert not boards[:, -1].any()
+
+
+# testing VectorEnv.VectorEnv
+# ---------------------------
+def test_env_steps():
+    env = VectorEnv.VectorEnv(16, max_plies=50, seed=1)
+    obs, info = env.reset()
+    assert obs.shape == (16, 61) and obs.dtype == np.int8
+    rng = np.random.default_rng(1)
+    finished = 0
+    for _ in range(200):
+        mask = info["action_mask"]
+        actions = np.array([rng.choice(np.flatnonzero(row)) for row in mask])
+        movers = info["to_play"]
+        obs, rewards, terminated, truncated, info = env.step(actions)
+        done = terminated | truncated
+        finished += done.sum()
+        # finished games start again, the others change hands
+        assert (env.plies[done] == 0).all()
+        assert (info["to_play"][~done] == 5 - movers[~done]).all()
+        assert (rewards[~terminated] == 0).all()
+        assert (np.abs(rewards[terminated]) == 1).all()
+        final = info["final_observation"][terminated]
+        assert (np.minimum((final == 2).sum(1), (final == 3).sum(1))
+                <= 8).all()
+    assert finished > 0
+
+
+def test_illegal_action():
+    env = VectorEnv.VectorEnv(2, seed=2)
+    _, info = env.reset()
+    illegal = np.flatnonzero(~info["action_mask"][0])[0]
+    with pytest.raises(ValueError):
+        env.step(np.array([illegal, illegal]))